@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark: recall@k and query latency of the IVF fact index vs. exact search.
+
+Uses synthetic clustered unit vectors (real embeddings cluster by topic;
+uniform random vectors have no structure for any ANN index to exploit).
+At 1M facts the default 128 dimensions keep the matrix at ~0.5 GB; pass
+``--dim 768`` for nomic-sized vectors if the machine has RAM to spare.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.vector_index import ExactIndex, IVFIndex, default_nlist, nearest_centroids, train_centroids
+
+
+def _clustered(count: int, dim: int, rng: np.random.Generator, clusters: int = 1000) -> np.ndarray:
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    return centers[labels] + 0.35 * rng.normal(size=(count, dim)).astype(np.float32)
+
+
+def _latency_ms(index, queries, k: int) -> dict:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, k)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+def _bench_size(count: int, dim: int, nprobes, queries: int, k: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    vectors = _clustered(count, dim, rng)
+    ids = np.arange(count)
+    exact = ExactIndex(dim)
+    exact.add(ids, vectors)
+    query_rows = _clustered(queries, dim, np.random.default_rng(seed + 1))
+    truth = [set(exact.search(query, k)[0].tolist()) for query in query_rows]
+
+    start = time.perf_counter()
+    nlist = default_nlist(count)
+    centroids = train_centroids(exact.matrix, nlist)
+    lists = nearest_centroids(exact.matrix, centroids)
+    ivf = IVFIndex(dim, centroids)
+    ivf.add(ids, exact.matrix, lists=lists.tolist())
+    build_s = round(time.perf_counter() - start, 2)
+
+    result = {
+        "facts": count,
+        "dim": dim,
+        "nlist": nlist,
+        "build_s": build_s,
+        "exact": _latency_ms(exact, query_rows, k),
+        "ivf": {},
+    }
+    for nprobe in nprobes:
+        ivf.nprobe = nprobe
+        found = [set(ivf.search(query, k)[0].tolist()) for query in query_rows]
+        recall = sum(len(a & b) for a, b in zip(truth, found)) / (k * len(truth))
+        result["ivf"][f"nprobe={nprobe}"] = {f"recall@{k}": round(recall, 4), **_latency_ms(ivf, query_rows, k)}
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark IVF fact index recall and latency")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated fact counts")
+    parser.add_argument("--dim", type=int, default=128, help="Vector dimension")
+    parser.add_argument("--nprobe", default="4,16,64", help="Comma-separated nprobe values")
+    parser.add_argument("--queries", type=int, default=100, help="Queries per size")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    nprobes = [int(value) for value in args.nprobe.split(",")]
+    results = [
+        _bench_size(int(size), args.dim, nprobes, args.queries, args.k, args.seed)
+        for size in args.sizes.split(",")
+    ]
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
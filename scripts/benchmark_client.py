@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-call overhead of the pooled Ollama client vs what it replaced.
+
+Runs against a local stub server that answers every request instantly, so
+the numbers isolate client-side cost from model latency. The baseline is
+``litellm.completion`` (the path ``ollama_completion`` used before the
+pooled client) when litellm is installed, and a plain per-call urllib
+request otherwise; both are always reported when available.
+"""
+import argparse
+import json
+import socket
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.ollama_client import OllamaClient
+
+MESSAGES = [{"role": "user", "content": "Say OK."}]
+# Answers both /api/chat and /api/generate (which litellm's ollama provider uses)
+STUB_RESPONSE = json.dumps(
+    {
+        "model": "phi3",
+        "message": {"role": "assistant", "content": "OK"},
+        "response": "OK",
+        "done": True,
+        "prompt_eval_count": 1,
+        "eval_count": 1,
+    }
+).encode("utf-8")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # allow keep-alive
+
+    def setup(self):
+        super().setup()
+        # Go's net/http (Ollama) disables Nagle; match it so keep-alive
+        # requests are not stalled by delayed ACKs.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(STUB_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(STUB_RESPONSE)
+
+    def log_message(self, *_args):
+        pass
+
+
+def _start_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _call_urllib(host: str) -> None:
+    payload = json.dumps({"model": "phi3", "messages": MESSAGES, "stream": False}).encode("utf-8")
+    req = urllib.request.Request(
+        f"{host}/api/chat",
+        data=payload,
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=10) as resp:
+        json.loads(resp.read().decode("utf-8"))
+
+
+def _litellm_call():
+    """``litellm.completion`` as the pre-pool ollama_completion made it, or ``None``."""
+    try:
+        import litellm
+    except ImportError:
+        return None
+
+    def call(host: str) -> None:
+        litellm.completion(model="ollama/phi3", messages=MESSAGES, api_base=host, max_tokens=500, timeout=10)
+
+    return call
+
+
+def _timed(fn, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    return {
+        "mean_us": round(statistics.mean(samples), 1),
+        "p50_us": round(samples[len(samples) // 2], 1),
+        "p95_us": round(samples[int(len(samples) * 0.95) - 1], 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Ollama client connection overhead")
+    parser.add_argument("--iterations", type=int, default=500, help="Calls per mode")
+    args = parser.parse_args()
+
+    server, host = _start_stub()
+    pooled = OllamaClient(host)
+    litellm_call = _litellm_call()
+    modes = {"per_call_urllib": lambda: _call_urllib(host)}
+    if litellm_call:
+        modes["litellm_completion"] = lambda: litellm_call(host)
+    modes["pooled_client"] = lambda: pooled.chat(MESSAGES)
+    try:
+        # Warm up every path so import/JIT effects do not skew the first mode
+        for call in modes.values():
+            call()
+        results = {"iterations": args.iterations}
+        results.update((name, _timed(call, args.iterations)) for name, call in modes.items())
+    finally:
+        pooled.close()
+        server.shutdown()
+
+    baseline = "litellm_completion" if litellm_call else "per_call_urllib"
+    results["baseline"] = baseline
+    if not litellm_call:
+        results["note"] = "litellm is not installed; comparing against plain urllib"
+    # Above 1 the pooled client adds less overhead per call than the baseline
+    pooled_mean = results["pooled_client"]["mean_us"]
+    results["pooled_speedup_vs_baseline"] = round(results[baseline]["mean_us"] / pooled_mean, 2)
+    results["pooled_speedup_vs_urllib"] = round(results["per_call_urllib"]["mean_us"] / pooled_mean, 2)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: SQLite memory operations per council run.
+
+Replays the memory calls one Curator turn plus one council run make and
+compares a fresh connection per operation (rollback journal, the previous
+behaviour) with the thread-local WAL connection used by ``src.memory``.
+With ``--rows N`` it also fills a database with N facts, embeddings and
+messages and times the large-table queries before and after the index
+migration; ``--facts N`` times embedding retrieval over N 768-dim facts
+and keyword (FTS5/BM25) retrieval over N facts; ``--maintenance N`` compares
+the longest write-lock hold of a one-shot prune + VACUUM with the batched,
+incremental maintenance pass. Runs against throwaway
+databases in a temporary directory.
+"""
+import argparse
+import importlib
+import json
+import math
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+FACTS = [f"Fact {i} about local inference on CPU-only hardware" for i in range(5)]
+
+
+def _load_memory(data_dir: str):
+    os.environ["COUNCIL_ENABLE_PERSISTENCE"] = "true"
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["MEMORY_USE_EMBEDDINGS"] = "0"
+    if "src.memory" in sys.modules:
+        sys.modules["src.memory"].close_connection()
+        return importlib.reload(sys.modules["src.memory"])
+    return importlib.import_module("src.memory")
+
+
+def _per_call_connect(memory):
+    @contextmanager
+    def cursor():
+        conn = sqlite3.connect(memory.DB_PATH)
+        try:
+            yield conn.cursor()
+            conn.commit()
+        finally:
+            conn.close()
+    return cursor
+
+
+def _council_run(memory) -> None:
+    # Curator turn
+    memory.get_recent_messages(6)
+    memory.get_all_preferences()
+    memory.add_message("user", "How do I speed up local inference?")
+    memory.add_message("assistant", "Refined query: ...")
+    # Council run
+    memory.get_latest_summary()
+    memory.get_relevant_facts("speed up local inference", limit=5)
+    memory.get_all_preferences()
+    session_id = memory.save_session("prompt", "final answer", "reasoning")
+    memory.add_message("user", "prompt", session_id=session_id)
+    memory.add_message("assistant", "final answer", session_id=session_id)
+    memory.save_summary(session_id, "summary")
+    memory.save_facts(session_id, FACTS)
+
+
+def _fill(memory, rows: int) -> None:
+    from src import embeddings
+
+    conn = memory._connect()
+    vector, _ = embeddings.encode([0.01] * 8)
+    with conn:
+        conn.executemany(
+            "INSERT INTO facts (id, session_id, timestamp, fact) VALUES (?, 1, '2024-01-01T00:00:00', ?)",
+            ((i, f"fact {i}") for i in range(1, rows + 1)),
+        )
+        # Shuffled insert order, as with facts embedded across many sessions
+        conn.executemany(
+            "INSERT INTO embeddings (fact_id, vector) VALUES (?, ?)",
+            ((i, vector) for i in sorted(range(1, rows + 1), key=lambda i: (i * 7919) % rows)),
+        )
+        conn.executemany(
+            "INSERT INTO messages (session_id, timestamp, role, content) VALUES (1, ?, 'user', 'hi')",
+            ((f"2024-01-01T00:{i % 60:02d}:{i % 59:02d}",) for i in range(rows)),
+        )
+
+
+def _large_table_queries(memory, iterations: int) -> dict:
+    return {
+        "get_recent_fact_embeddings": _timed(lambda: memory.get_recent_fact_embeddings(200), iterations),
+        # Nothing is old enough to delete, so this measures the timestamp scan
+        "prune_messages": _timed(lambda: memory.prune_messages(retain_days=36500), iterations),
+    }
+
+
+def _index_benchmark(rows: int, iterations: int) -> dict:
+    from src.migrations import _add_lookup_indexes
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        memory = _load_memory(data_dir)
+        conn = memory._connect()
+        _fill(memory, rows)
+        # Time the queries without the lookup-index migration, then re-apply it
+        indexes = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE name LIKE 'idx_%'")]
+        with conn:
+            for name in indexes:
+                conn.execute(f"DROP INDEX {name}")
+        before = _large_table_queries(memory, iterations)
+        start = time.perf_counter()
+        with conn:
+            _add_lookup_indexes(conn)
+        migration_s = round(time.perf_counter() - start, 2)
+        after = _large_table_queries(memory, iterations)
+        memory.close_connection()
+    return {
+        "rows": rows,
+        "index_migration_s": migration_s,
+        "unindexed": before,
+        "indexed": after,
+    }
+
+
+def _decode_benchmark(iterations: int, count: int = 200, dim: int = 768) -> dict:
+    """Decode cost of ``count`` stored vectors (one retrieval query's worth)."""
+    from src import embeddings
+
+    vector = [((i * 37) % 200 - 100) / 100 for i in range(dim)]
+    as_json = [json.dumps(vector)] * count
+    as_float32 = [embeddings.encode(vector)[0]] * count
+    as_int8 = [embeddings.encode(vector, embeddings.INT8)] * count
+    return {
+        "bytes_per_vector": {
+            "json": len(as_json[0]),
+            "float32": len(as_float32[0]),
+            "int8": len(as_int8[0][0]),
+        },
+        "json": _timed(lambda: [json.loads(text) for text in as_json], iterations),
+        "float32": _timed(lambda: [embeddings.decode(blob) for blob in as_float32], iterations),
+        "int8": _timed(
+            lambda: [embeddings.decode(blob, embeddings.INT8, scale) for blob, scale in as_int8], iterations
+        ),
+    }
+
+
+def _python_cosine(a, b) -> float:
+    # The per-fact loop get_relevant_facts used before vectorized retrieval
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _retrieval_benchmark(facts: int, iterations: int, dim: int = 768) -> dict:
+    """Embedding retrieval: Python loop over the 200 newest facts vs. a vectorized scan of all facts."""
+    rng = random.Random(0)
+    vectors = {text: [rng.uniform(-1, 1) for _ in range(dim)] for text in [f"fact {i}" for i in range(facts)]}
+    query = [rng.uniform(-1, 1) for _ in range(dim)]
+    vectors["query"] = query
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        memory = _load_memory(data_dir)
+        os.environ["MEMORY_USE_EMBEDDINGS"] = "1"
+        memory._embed_texts = lambda texts, model: [vectors.get(text) for text in texts]
+        session_id = memory.save_session("prompt", "answer", "reasoning")
+        memory.save_facts(session_id, [text for text in vectors if text != "query"])
+        memory.get_relevant_facts("query")  # builds the index
+
+        def python_loop():
+            rows = memory.get_recent_fact_embeddings(200)
+            scored = [(_python_cosine(query, vec.tolist()), fact) for _, fact, vec, _ in rows]
+            scored.sort(key=lambda item: item[0], reverse=True)
+            return scored[:5]
+
+        results = {
+            "facts": facts,
+            "dim": dim,
+            "python_loop_recent_200": _timed(python_loop, iterations),
+            "vectorized_all_facts": _timed(lambda: memory.get_relevant_facts("query"), iterations),
+        }
+        os.environ["MEMORY_USE_EMBEDDINGS"] = "0"
+        memory.close_connection()
+    return results
+
+
+def _python_keyword_scan(memory, query: str, limit: int = 5):
+    # The set-intersection scorer get_relevant_facts used before the FTS5 index
+    terms = {t.lower() for t in query.split() if len(t) > 2}
+    scored = []
+    for idx, (_, fact) in enumerate(memory.get_recent_fact_rows(200)):
+        score = len(terms & {w.lower() for w in fact.split() if len(w) > 2})
+        if score > 0:
+            scored.append((score * (1.0 + 1.0 / (idx + 2)), fact))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [fact for _, fact in scored[:limit]]
+
+
+def _keyword_benchmark(facts: int, iterations: int) -> dict:
+    """Keyword retrieval: Python scan of the 200 newest facts vs. BM25 over the FTS5 index."""
+    rng = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(5000)]
+    texts = [" ".join(rng.choices(vocabulary, k=12)) for _ in range(facts)]
+    query = " ".join(rng.choices(vocabulary, k=3))
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        memory = _load_memory(data_dir)
+        session_id = memory.save_session("prompt", "answer", "reasoning")
+        memory.save_facts(session_id, texts)
+        results = {
+            "facts": facts,
+            "python_scan_recent_200": _timed(lambda: _python_keyword_scan(memory, query), iterations),
+            "fts5_bm25_all_facts": _timed(lambda: memory.get_relevant_facts(query), iterations),
+            "fts5_matches_beyond_recent_200": sum(
+                1 for row in memory._keyword_fact_ids(query, facts) if row <= facts - 200
+            ),
+        }
+        memory.close_connection()
+    return results
+
+
+def _maintenance_benchmark(messages: int) -> dict:
+    """Longest single write-lock hold: one-shot prune + VACUUM vs. batched prune + incremental vacuum."""
+    from src import maintenance
+
+    def fill(memory):
+        with memory._cursor() as c:
+            c.executemany(
+                "INSERT INTO messages (session_id, timestamp, role, content) VALUES (1, '2000-01-01', 'user', ?)",
+                (("message text " * 40,) for _ in range(messages)),
+            )
+
+    results = {"messages": messages}
+    with tempfile.TemporaryDirectory() as data_dir:
+        memory = _load_memory(data_dir)
+        fill(memory)
+        start = time.perf_counter()
+        memory.prune_messages(retain_days=1, batch_size=messages)
+        prune_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        memory.vacuum_db()
+        results["one_shot"] = {"prune_ms": round(prune_ms, 1), "vacuum_ms": round((time.perf_counter() - start) * 1000, 1)}
+        memory.close_connection()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        memory = _load_memory(data_dir)
+        fill(memory)
+        steps = []
+        original_prune, original_vacuum = memory.prune_messages, memory.incremental_vacuum
+
+        def timed_step(fn):
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    steps.append((time.perf_counter() - start) * 1000)
+            return wrapper
+
+        memory.prune_messages = timed_step(original_prune)
+        memory.incremental_vacuum = timed_step(original_vacuum)
+        size_before = memory.database_stats()["db_bytes"]
+        stats = maintenance.run_maintenance(budget_s=600, is_busy=lambda: False)
+        results["incremental"] = {
+            "total_ms": round(stats["duration_s"] * 1000, 1),
+            "steps": len(steps),
+            "max_step_ms": round(max(steps), 1),
+            "db_bytes_before": size_before,
+            "db_bytes_after": stats["db_bytes"],
+        }
+        memory.close_connection()
+    return results
+
+
+def _timed(fn, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark memory operations per council run")
+    parser.add_argument("--iterations", type=int, default=200, help="Council runs per mode")
+    parser.add_argument("--rows", type=int, default=0, help="Also benchmark indexes at this table size (e.g. 100000)")
+    parser.add_argument("--facts", type=int, default=0, help="Also benchmark embedding retrieval over this many facts")
+    parser.add_argument("--maintenance", type=int, default=0, help="Also benchmark maintenance over this many old messages")
+    args = parser.parse_args()
+
+    results = {"iterations": args.iterations}
+    with tempfile.TemporaryDirectory() as baseline_dir, tempfile.TemporaryDirectory() as pooled_dir:
+        memory = _load_memory(baseline_dir)
+        memory.close_connection()
+        memory._cursor = _per_call_connect(memory)
+        conn = sqlite3.connect(memory.DB_PATH)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+        _council_run(memory)
+        results["per_call_connect"] = _timed(lambda: _council_run(memory), args.iterations)
+
+        memory = _load_memory(pooled_dir)
+        _council_run(memory)
+        results["thread_local_wal"] = _timed(lambda: _council_run(memory), args.iterations)
+        memory.close_connection()
+
+    baseline = results["per_call_connect"]["mean_ms"]
+    results["speedup"] = round(baseline / results["thread_local_wal"]["mean_ms"], 2)
+    results["embedding_decode"] = _decode_benchmark(max(1, args.iterations // 4))
+    if args.rows:
+        results["indexes"] = _index_benchmark(args.rows, max(1, args.iterations // 20))
+    if args.facts:
+        results["retrieval"] = _retrieval_benchmark(args.facts, max(1, args.iterations // 4))
+        results["keyword_retrieval"] = _keyword_benchmark(args.facts, max(1, args.iterations // 4))
+    if args.maintenance:
+        results["maintenance"] = _maintenance_benchmark(args.maintenance)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -35,6 +35,9 @@ def _memory_check() -> int:
     conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
 
+    cur.execute("PRAGMA user_version")
+    print(f"schema_version: {cur.fetchone()[0]}")
+
     tables = ["sessions", "messages", "summaries", "facts", "preferences"]
     for table in tables:
         try:
@@ -0,0 +1,163 @@
+"""Admission control for deliberations served by the API.
+
+Every Curator turn or council run is a full model generation, so running
+them all at once on a CPU-only host multiplies RAM use and slows each one
+down. Requests take a :class:`Ticket` from the :class:`AdmissionController`:
+at most ``COUNCIL_MAX_DELIBERATIONS`` run at a time, the rest wait in a
+priority queue bounded by ``COUNCIL_QUEUE_SIZE``, and submissions beyond
+that raise :class:`QueueFull` (served as HTTP 429).
+
+The controller is used from the API event loop only and is not thread-safe.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from src.telemetry import ADMISSION_REJECTED, QUEUE_DEPTH
+
+# Lower value is served first
+INTERACTIVE = 0
+BATCH = 1
+
+# Weight of the newest run in the moving average used for ETAs
+_EWMA_WEIGHT = 0.3
+
+
+def max_deliberations() -> int:
+    return max(1, int(os.getenv("COUNCIL_MAX_DELIBERATIONS", "1")))
+
+
+def queue_size() -> int:
+    return max(0, int(os.getenv("COUNCIL_QUEUE_SIZE", "8")))
+
+
+class QueueFull(RuntimeError):
+    """The wait queue is at capacity; ``retry_after`` is a suggested delay in seconds."""
+
+    def __init__(self, retry_after: Optional[float] = None) -> None:
+        super().__init__("Server busy: deliberation queue is full")
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A request's place in line; ordered by priority, then arrival."""
+
+    def __init__(self, priority: int, seq: int) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.enqueued = time.monotonic()
+        self.started: Optional[float] = None
+        self.admitted = asyncio.Event()
+        self.changed = asyncio.Event()
+
+    def __lt__(self, other: "Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdmissionController:
+    """Bounded priority queue in front of at most ``max_active`` deliberations."""
+
+    def __init__(
+        self,
+        max_active: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        estimate_s: Optional[float] = None,
+    ) -> None:
+        self.max_active = max_active if max_active is not None else max_deliberations()
+        self.max_queue = max_queue if max_queue is not None else queue_size()
+        # Moving average of run duration; None until the first run finishes
+        self.estimate_s = estimate_s
+        self._waiting: List[Ticket] = []
+        self._active: Set[Ticket] = set()
+        self._seq = itertools.count()
+
+    @property
+    def active(self) -> int:
+        return len(self._active)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiting)
+
+    def submit(self, priority: int = BATCH) -> Ticket:
+        """Admit immediately if a slot is free, otherwise queue; raises :class:`QueueFull`."""
+        ticket = Ticket(priority, next(self._seq))
+        if not self._waiting and len(self._active) < self.max_active:
+            self._admit(ticket)
+            return ticket
+        if len(self._waiting) >= self.max_queue:
+            ADMISSION_REJECTED.inc()
+            raise QueueFull(self.eta(len(self._waiting) + 1))
+        heapq.heappush(self._waiting, ticket)
+        self._changed()
+        return ticket
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based place in the queue; 0 once admitted."""
+        if ticket.admitted.is_set():
+            return 0
+        return 1 + sum(1 for other in self._waiting if other < ticket)
+
+    def eta(self, position: int) -> Optional[float]:
+        """Rough seconds until ``position`` is admitted, assuming runs of average length."""
+        if position <= 0:
+            return 0.0
+        if self.estimate_s is None:
+            return None
+        return round(math.ceil(position / self.max_active) * self.estimate_s, 1)
+
+    def status(self, ticket: Ticket) -> Dict[str, Optional[float]]:
+        position = self.position(ticket)
+        return {"type": "queued", "position": position, "eta_s": self.eta(position)}
+
+    async def wait(self, ticket: Ticket) -> AsyncIterator[Dict[str, Optional[float]]]:
+        """Yield a status event whenever the ticket's position changes, until admitted."""
+        while not ticket.admitted.is_set():
+            ticket.changed.clear()
+            yield self.status(ticket)
+            await ticket.changed.wait()
+
+    def release(self, ticket: Ticket) -> None:
+        """Free the ticket's slot (or leave the queue) and admit whoever is next."""
+        if ticket in self._active:
+            self._active.discard(ticket)
+            duration = time.monotonic() - ticket.started
+            if self.estimate_s is None:
+                self.estimate_s = duration
+            else:
+                self.estimate_s = (1 - _EWMA_WEIGHT) * self.estimate_s + _EWMA_WEIGHT * duration
+        elif ticket in self._waiting:
+            self._waiting.remove(ticket)
+            heapq.heapify(self._waiting)
+        else:
+            return
+        while self._waiting and len(self._active) < self.max_active:
+            self._admit(heapq.heappop(self._waiting))
+        self._changed()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = BATCH):
+        """Hold a slot for the duration of the block, waiting in line if needed."""
+        ticket = self.submit(priority)
+        try:
+            async for _ in self.wait(ticket):
+                pass
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def _admit(self, ticket: Ticket) -> None:
+        ticket.started = time.monotonic()
+        self._active.add(ticket)
+        ticket.admitted.set()
+        ticket.changed.set()
+
+    def _changed(self) -> None:
+        QUEUE_DEPTH.set(len(self._waiting))
+        for waiting in self._waiting:
+            waiting.changed.set()
@@ -1,12 +1,13 @@
 from crewai import Agent
-from src.config.settings import llm
+from src.config.settings import llm, llm_for
+from src.model_router import CRITIC, JUDGE, PLANNER, RESEARCHER
 
 researcher = Agent(
     role="Researcher",
     goal="Gather information and explore options for the given prompt",
     backstory="You are a thorough researcher who gathers facts, explores ideas, and provides comprehensive insights.",
     verbose=True,
-    llm=llm,
+    llm=llm_for(RESEARCHER),
     allow_delegation=False
 )
 
@@ -24,7 +25,7 @@ critic = Agent(
     goal="Evaluate and point out weaknesses in the researcher's proposal",
     backstory="You are a sharp critic who identifies flaws, risks, and improvements in ideas.",
     verbose=True,
-    llm=llm,
+    llm=llm_for(CRITIC),
     allow_delegation=False
 )
 
@@ -33,7 +34,7 @@ planner = Agent(
     goal="Turn ideas into structured steps or plans",
     backstory="You are an organized planner who creates clear, actionable steps from concepts.",
     verbose=True,
-    llm=llm,
+    llm=llm_for(PLANNER),
     allow_delegation=False
 )
 
@@ -42,6 +43,6 @@ judge = Agent(
     goal="Synthesize responses from other agents into a final answer with rationale",
     backstory="You are a wise judge who combines inputs, resolves conflicts, and produces a coherent final output.",
     verbose=True,
-    llm=llm,
+    llm=llm_for(JUDGE),
     allow_delegation=False
 )
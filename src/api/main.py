@@ -1,13 +1,67 @@
-from fastapi import FastAPI, HTTPException, Query
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, StreamingResponse, HTMLResponse
+from fastapi.responses import FileResponse, StreamingResponse, HTMLResponse, Response
 from pydantic import BaseModel
-from src.council import run_council_sync, run_curator_only
-from src.memory import get_recent_messages, get_latest_summary, get_recent_facts, get_all_preferences
+from starlette.background import BackgroundTask
+from src.admission import BATCH, INTERACTIVE, AdmissionController, QueueFull, Ticket
+from src.council import astream_council, astream_curator_only
+from src import maintenance, memory_worker
+from src.runs import QUEUED, SUCCEEDED, RunRegistry
+from src.memory import (
+    ENABLE_PERSISTENCE,
+    database_stats,
+    get_all_preferences,
+    get_latest_summary,
+    get_recent_facts,
+    get_recent_messages,
+)
+from src.ollama_client import aclose_async_clients
+from src.telemetry import CONTENT_TYPE, HTTP_LATENCY, HTTP_REQUESTS, REGISTRY
 import os
+import json
+import math
+import time
 import asyncio
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(_app):
+    # Resume memory jobs a previous process queued but did not finish
+    if ENABLE_PERSISTENCE and memory_worker.worker_enabled():
+        memory_worker.get_worker()
+    if ENABLE_PERSISTENCE:
+        maintenance_scheduler.start()
+    yield
+    maintenance_scheduler.stop(timeout=5)
+    await runs.cancel_all()
+    await aclose_async_clients()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Caps concurrent deliberations (COUNCIL_MAX_DELIBERATIONS) behind a bounded queue
+admission = AdmissionController()
+# Prunes and reclaims memory DB space while no deliberation is running
+maintenance_scheduler = maintenance.MaintenanceScheduler()
+# Deliberations started with POST /runs, addressable by ID
+runs = RunRegistry(admission, lambda prompt: astream_council(prompt))
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep label cardinality bounded
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        HTTP_REQUESTS.labels(method=request.method, route=route_path, status=status).inc()
+        HTTP_LATENCY.labels(route=route_path).observe(time.perf_counter() - start)
 
 # Serve UI static files - path relative to project root
 ui_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "ui")
@@ -26,14 +80,31 @@ async def root():
     raise HTTPException(status_code=404, detail="UI not found")
 
 
-async def council_stream(prompt: str):
-    """Stream council deliberation via SSE"""
-    import asyncio
-    loop = asyncio.get_event_loop()
-    
+def _sse(payload: dict) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def _busy(exc: QueueFull) -> HTTPException:
+    headers = {"Retry-After": str(math.ceil(exc.retry_after))} if exc.retry_after else None
+    return HTTPException(status_code=429, detail=str(exc), headers=headers)
+
+
+def _sse_event(event: dict) -> str:
+    """Translate a pipeline event into the SSE payload the UI consumes."""
+    if event["type"] == "content":
+        return _sse({"type": "content", "agent": event["agent"], "content": event["content"]})
+    return _sse({"type": event["type"], "agent": event["agent"]})
+
+
+async def council_stream(prompt: str, ticket: Ticket):
+    """Stream council deliberation via SSE, forwarding tokens as they are generated"""
     try:
+        # Report queue position/ETA until a deliberation slot frees up
+        async for status in admission.wait(ticket):
+            yield _sse(status)
+
         # Load persistent memory
-        history = get_recent_messages(12)
+        history = await asyncio.to_thread(get_recent_messages, 12)
         
         # Check if self-improvement mode (bypass curator refinement)
         is_self_improve = "self-improvement mode" in prompt.lower() or "self-improve" in prompt.lower()
@@ -53,20 +124,19 @@ async def council_stream(prompt: str):
                     break
             prompt = refined_query
         
-        # Run Curator first (fast) - pass history for context
-        curator_result = await loop.run_in_executor(None, run_curator_only, prompt, history)
+        # Run Curator first (fast) - pass history for context, tokens go straight to the client
+        curator_result = {}
+        async for event in astream_curator_only(prompt, history):
+            if event["type"] == "result":
+                curator_result = event["result"]
+            else:
+                yield _sse_event(event)
         
         if "error" in curator_result:
-            yield f"data: {json.dumps({'type': 'error', 'content': curator_result['error']})}\n\n"
-            yield f"data: {json.dumps({'done': True})}\n\n"
+            yield _sse({'type': 'error', 'content': curator_result['error']})
+            yield _sse({'done': True})
             return
         
-        # Yield Curator response
-        yield f"data: {json.dumps({'type': 'agent', 'agent': 'Curator'})}\n\n"
-        curator_output = curator_result.get('output', '')
-        # Yield full curator output at once (it's already fast)
-        yield f"data: {json.dumps({'type': 'content', 'content': curator_output})}\n\n"
-        
         # CRITICAL: Only run full council if:
         # 1. Self-improvement mode was triggered, OR
         # 2. User explicitly said "yes" to confirmation
@@ -74,40 +144,32 @@ async def council_stream(prompt: str):
         
         if not should_run_full_council:
             # Stay in Curator-only mode - just return, input will be re-enabled
-            yield f"data: {json.dumps({'done': True})}\n\n"
+            yield _sse({'done': True})
             return
         
         # Only reach here if we should run full council
         # Run full council (either on "yes" confirmation or self-improve mode)
-        result = await loop.run_in_executor(None, run_council_sync, prompt, None, is_self_improve)
-        
-        if "error" in result:
-            yield f"data: {json.dumps({'type': 'error', 'content': result['error']})}\n\n"
-            yield f"data: {json.dumps({'done': True})}\n\n"
-            return
-        
-        # Stream each agent's output
-        agents = result.get('agents', [])
-        agent_names = ['Curator', 'Researcher', 'Critic', 'Planner', 'Judge']
-        
-        for idx, agent_name in enumerate(agent_names):
-            if idx < len(agents) and agents[idx].get('output'):
-                yield f"data: {json.dumps({'type': 'agent', 'agent': agent_name})}\n\n"
-                agent_output = agents[idx]['output']
-                # Yield full agent output (agents complete sequentially, so we can send full output)
-                yield f"data: {json.dumps({'type': 'content', 'content': agent_output})}\n\n"
+        async for event in astream_council(prompt, None, is_self_improve):
+            if event["type"] != "result":
+                yield _sse_event(event)
+                continue
+            result = event["result"]
+            if "error" in result:
+                yield _sse({'type': 'error', 'content': result['error']})
+                yield _sse({'done': True})
+                return
+            # Stream final answer
+            if result.get('final_answer'):
+                yield _sse({'type': 'agent', 'agent': 'Final'})
+                yield _sse({'type': 'content', 'agent': 'Final', 'content': result['final_answer']})
         
-        # Stream final answer
-        if result.get('final_answer'):
-            yield f"data: {json.dumps({'type': 'agent', 'agent': 'Final'})}\n\n"
-            final_output = result['final_answer']
-            yield f"data: {json.dumps({'type': 'content', 'content': final_output})}\n\n"
-        
-        yield f"data: {json.dumps({'done': True})}\n\n"
+        yield _sse({'done': True})
         
     except Exception as e:
-        yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
-        yield f"data: {json.dumps({'done': True})}\n\n"
+        yield _sse({'type': 'error', 'content': str(e)})
+        yield _sse({'done': True})
+    finally:
+        admission.release(ticket)
 
 @app.get("/memory")
 async def get_memory():
@@ -119,25 +181,105 @@ async def get_memory():
         "preferences": get_all_preferences()
     }
 
+@app.get("/memory/maintenance")
+async def get_memory_maintenance():
+    """Last maintenance pass and current database size"""
+    return {
+        "last_run": await asyncio.to_thread(maintenance.last_run),
+        "database": await asyncio.to_thread(database_stats),
+    }
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text exposition of request, agent, token, cache and SQLite metrics"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
 @app.get("/chat")
 async def chat_endpoint(message: str = Query(...)):
     """Streaming SSE endpoint for chat"""
+    try:
+        ticket = admission.submit(INTERACTIVE)
+    except QueueFull as e:
+        raise _busy(e)
     return StreamingResponse(
-        council_stream(message),
+        council_stream(message, ticket),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no"
-        }
+        },
+        # Frees the slot even if the client disconnects before the stream starts
+        background=BackgroundTask(admission.release, ticket),
     )
 
 @app.post("/council")
-async def council_endpoint(request: PromptRequest):
+async def council_endpoint(request: PromptRequest, http_request: Request):
     try:
-        result = await asyncio.get_event_loop().run_in_executor(None, run_council_sync, request.prompt)
-        if "error" in result:
-            raise HTTPException(status_code=500, detail=result["error"])
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        run = runs.create(request.prompt, BATCH)
+    except QueueFull as e:
+        raise _busy(e)
+    # Cancel the run (and its Ollama stream) if the client goes away
+    while not run.finished:
+        await asyncio.wait({run.task}, timeout=1)
+        if not run.finished and await http_request.is_disconnected():
+            runs.cancel(run.id)
+            await asyncio.wait({run.task})
+    if run.status != SUCCEEDED:
+        raise HTTPException(status_code=500, detail=run.error or run.status)
+    return run.result
+
+
+def _get_run(run_id: str):
+    run = runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Unknown run {run_id}")
+    return run
+
+
+@app.post("/runs", status_code=202)
+async def create_run(request: PromptRequest):
+    """Start a council run in the background; poll or stream it by ID"""
+    try:
+        run = runs.create(request.prompt, BATCH)
+    except QueueFull as e:
+        raise _busy(e)
+    return {**run.snapshot(), "events_url": f"/runs/{run.id}/events"}
+
+
+@app.get("/runs/{run_id}")
+async def get_run(run_id: str):
+    run = _get_run(run_id)
+    snapshot = run.snapshot()
+    if run.status == QUEUED and run.events:
+        snapshot["queue"] = run.events[-1]
+    return snapshot
+
+
+@app.get("/runs/{run_id}/events")
+async def run_events(run_id: str, request: Request, last_event_id: int = Query(0)):
+    """SSE stream of a run's events; reconnect with Last-Event-ID to resume"""
+    run = _get_run(run_id)
+    header = request.headers.get("last-event-id", "")
+    after = int(header) if header.isdigit() else last_event_id
+
+    async def stream():
+        async for event in run.follow(after):
+            event_id = event.pop("id")
+            yield f"id: {event_id}\n{_sse(event)}"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.delete("/runs/{run_id}")
+async def cancel_run(run_id: str):
+    """Cancel a queued or running run; its Ollama generation is aborted"""
+    run = _get_run(run_id)
+    if not run.finished:
+        runs.cancel(run_id)
+        await asyncio.wait({run.task})
+    return run.snapshot()
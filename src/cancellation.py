@@ -0,0 +1,86 @@
+"""Cooperative cancellation and deadline budgets for council runs.
+
+A :class:`CancellationToken` is shared by every stage of one run. Stages
+check it between streamed chunks and cap their Ollama request timeout at the
+time left, so a stuck or slow generation cannot outlive the run's budget.
+
+The budget has two edges. Ordinary stages stop ``reserve_s`` seconds before
+the deadline; stages declared ``final`` (the Judge) may use that reserve to
+synthesize whatever the earlier stages produced. An explicit :meth:`cancel`
+stops every stage at once.
+"""
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+CANCELLED = "cancelled"
+DEADLINE = "deadline"
+
+# Never send a request with less time than this; the deadline check ends it
+_MIN_TIMEOUT_S = 1.0
+
+
+def deadline_seconds() -> Optional[float]:
+    """Per-run budget from ``COUNCIL_DEADLINE_S`` (unset or ``0``: no deadline)."""
+    seconds = float(os.getenv("COUNCIL_DEADLINE_S", "0") or 0)
+    return seconds if seconds > 0 else None
+
+
+def final_reserve_seconds() -> float:
+    return max(0.0, float(os.getenv("COUNCIL_FINAL_RESERVE_S", "300")))
+
+
+class CancellationToken:
+    """Thread-safe stop signal with an optional deadline ``budget_s`` seconds from now."""
+
+    def __init__(
+        self,
+        budget_s: Optional[float] = None,
+        reserve_s: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self.deadline = clock() + budget_s if budget_s is not None else None
+        # The reserve never swallows the whole budget
+        self.reserve_s = min(reserve_s, budget_s / 2) if budget_s is not None else 0.0
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def from_env(cls) -> "CancellationToken":
+        """Token for one council run (``COUNCIL_DEADLINE_S`` / ``COUNCIL_FINAL_RESERVE_S``)."""
+        return cls(deadline_seconds(), final_reserve_seconds())
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def remaining(self, final: bool = False) -> Optional[float]:
+        """Seconds a stage may still run (``None`` without a deadline)."""
+        if self.deadline is None:
+            return None
+        end = self.deadline if final else self.deadline - self.reserve_s
+        return end - self._clock()
+
+    def stop_reason(self, final: bool = False) -> Optional[str]:
+        """``"cancelled"``, ``"deadline"`` or ``None`` if the stage may continue."""
+        if self.cancelled:
+            return CANCELLED
+        remaining = self.remaining(final)
+        if remaining is not None and remaining <= 0:
+            return DEADLINE
+        return None
+
+    def should_stop(self, final: bool = False) -> bool:
+        return self.stop_reason(final) is not None
+
+    def timeout(self, timeout: Optional[float], final: bool = False) -> Optional[float]:
+        """``timeout`` capped at the time left (``None`` keeps the caller's default)."""
+        remaining = self.remaining(final)
+        if remaining is None:
+            return timeout
+        remaining = max(remaining, _MIN_TIMEOUT_S)
+        return remaining if timeout is None else min(timeout, remaining)
@@ -0,0 +1,117 @@
+"""Extractive compaction of agent outputs before they are passed downstream.
+
+The Planner prompt embeds the Researcher and Critic outputs and the Judge
+prompt embeds all three, so prompt evaluation grows with every stage and
+long outputs can overflow the model's context. With ``COUNCIL_COMPACTION=1``
+each upstream output is reduced to at most ``COUNCIL_COMPACT_CHARS``
+characters before a later stage sees it. The reduction is extractive and
+deterministic, with no extra model call: lines and sentences are picked
+greedily by how many of the text's key terms they add (headings and list
+items weigh double), then kept in their original order. The full outputs
+are still returned in the result.
+
+:func:`report` estimates the prompt tokens and evaluation time saved from
+the run's measured tokens-per-character and prompt evaluation rate.
+"""
+import functools
+import math
+import os
+import re
+import statistics
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+_STRUCTURAL = re.compile(r"^\s*(?:\d+[.)]|[-*•]|#+|[A-Z][A-Za-z /&-]{1,40}:)")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z][a-z0-9'-]{3,}")
+_STOPWORDS = frozenset(
+    "this that with from have will would could should their there these those which while into about "
+    "than then them they been being also more most such what when where your ours very each other".split()
+)
+
+
+def compaction_enabled() -> bool:
+    return os.getenv("COUNCIL_COMPACTION", "0").lower() in {"1", "true", "yes"}
+
+
+def max_chars() -> int:
+    return max(200, int(os.getenv("COUNCIL_COMPACT_CHARS", "1500")))
+
+
+def _units(text: str) -> List[str]:
+    """Lines, with long prose lines split into sentences."""
+    units = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) > 200 and not _STRUCTURAL.match(line):
+            units.extend(part for part in _SENTENCE_END.split(line) if part)
+        else:
+            units.append(line)
+    return units
+
+
+def compact(text: str, limit: Optional[int] = None) -> str:
+    """Key points of ``text`` in at most ``limit`` characters (``text`` itself if it fits)."""
+    limit = limit or max_chars()
+    if len(text) <= limit:
+        return text
+    units = _units(text)
+    frequencies = Counter(word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS)
+    unit_words = [{word for word in _WORD.findall(unit.lower()) if word not in _STOPWORDS} for unit in units]
+
+    def weight(index: int) -> float:
+        # Structure carries the argument; the opening usually states the thesis
+        return (2.0 if _STRUCTURAL.match(units[index]) else 1.0) * (1.5 if index == 0 else 1.0)
+
+    marker = f"[compacted from {len(text)} chars]"
+    budget = limit - len(marker) - 1
+    chosen = set()
+    covered = set()
+    # Greedy coverage: each key term counts once, so repeated points add nothing
+    while True:
+        best, best_gain = None, 0.0
+        for index, words in enumerate(unit_words):
+            if index in chosen or len(units[index]) + 1 > budget:
+                continue
+            gain = sum(frequencies[word] for word in words - covered) / math.sqrt(len(words) + 1) * weight(index)
+            if gain > best_gain:
+                best, best_gain = index, gain
+        if best is None:
+            break
+        chosen.add(best)
+        covered |= unit_words[best]
+        budget -= len(units[best]) + 1
+    if not chosen:
+        return text[: limit - len(marker) - 1].rstrip() + "\n" + marker
+    return "\n".join(units[index] for index in sorted(chosen)) + "\n" + marker
+
+
+def compactor() -> Optional[Callable[[str], str]]:
+    """The configured compaction function, or ``None`` when disabled."""
+    if not compaction_enabled():
+        return None
+    return functools.partial(compact, limit=max_chars())
+
+
+def report(stats: Dict[str, float], usage: List[Dict[str, Any]], stages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Chars removed from downstream prompts, with estimated tokens and seconds saved.
+
+    ``stats`` is a run's compaction counters (see ``PipelineRun.compaction``);
+    ``usage`` and ``stages`` are its Ollama usage and stage metrics.
+    """
+    saved_chars = stats.get("chars_in", 0) - stats.get("chars_out", 0)
+    measured = [record for record in usage if record.get("prompt_chars") and not record.get("cached")]
+    chars = sum(record["prompt_chars"] for record in measured)
+    tokens_per_char = sum(record["prompt_eval_count"] for record in measured) / chars if chars else 0.25
+    tokens_saved = int(saved_chars * tokens_per_char)
+    rates = [stage["prompt_tokens_per_sec"] for stage in stages if stage.get("prompt_tokens_per_sec")]
+    return {
+        "inputs_compacted": int(stats.get("uses", 0)),
+        "chars_in": int(stats.get("chars_in", 0)),
+        "chars_out": int(stats.get("chars_out", 0)),
+        "compaction_s": round(stats.get("seconds", 0.0), 4),
+        "prompt_tokens_saved_est": tokens_saved,
+        "prompt_eval_s_saved_est": round(tokens_saved / statistics.median(rates), 2) if rates else None,
+    }
@@ -1,15 +1,39 @@
 import os
+from typing import Optional, Set
+
 from dotenv import load_dotenv
 from langchain_community.chat_models import ChatOllama
 
+from src.model_router import ModelRouter
+from src.ollama_client import DEFAULT_HOST
+
 load_dotenv()
 
-# CrewAI 0.30.11 accepts LangChain LLM objects directly
-# Add timeout and request_timeout to prevent hangs
-llm = ChatOllama(
-    model="phi3",
-    base_url="http://localhost:11434",
-    temperature=float(os.getenv("LLM_TEMPERATURE", 0.7)),
-    timeout=600,  # 10 minutes for model loading and generation
-    request_timeout=600,  # 10 minutes per request
-)
+
+def _chat_fields() -> Set[str]:
+    # model_fields on pydantic 2 models, __fields__ on pydantic 1
+    return set(getattr(ChatOllama, "model_fields", None) or ChatOllama.__fields__)
+
+
+def llm_for(role: Optional[str] = None) -> ChatOllama:
+    """LangChain LLM for a role's routed model (see src/model_router.py); the default model if None."""
+    router = ModelRouter.from_env()
+    route = router.route(role) if role else None
+    # CrewAI 0.30.11 accepts LangChain LLM objects directly
+    # Add timeout and request_timeout to prevent hangs
+    kwargs = {
+        "model": router.default,
+        "base_url": os.getenv("OLLAMA_HOST", DEFAULT_HOST),
+        "temperature": os.getenv("LLM_TEMPERATURE", 0.7),
+        "timeout": 600,  # 10 minutes for model loading and generation
+        "request_timeout": 600,  # 10 minutes per request
+    }
+    if route:
+        # Role options override the defaults above; keys ChatOllama has no
+        # field for (e.g. num_batch) would fail validation and are dropped
+        kwargs = route.client_kwargs(kwargs, _chat_fields())
+    kwargs["temperature"] = float(kwargs["temperature"])
+    return ChatOllama(**kwargs)
+
+
+llm = llm_for()
@@ -1,9 +1,16 @@
 import asyncio
+import dataclasses
 import re
-import subprocess
 import os
-from concurrent.futures import ThreadPoolExecutor
-from src.ollama_llm import ollama_completion
+import time
+from src import compaction, memory_worker, model_router, token_budget
+from src.cancellation import CancellationToken
+from src.metrics import StageClock, record_run, run_metrics
+from src.ollama_llm import ollama_completion, ollama_completion_async
+from src.prompts import agent_messages, prefix_reuse_report, shared_prefix
+from src.pipeline import Pipeline, PipelineRun, StageError, StageSpec
+from src.scheduler import PARALLEL, execution_mode, max_concurrency
+from src.telemetry import track_in_flight
 from src.memory import (
     save_session,
     add_message,
@@ -17,9 +24,8 @@ from src.memory import (
     ENABLE_PERSISTENCE
 )
 
-def generate_memory_snapshot(prompt, final_answer, reasoning_summary):
-    """Generate a compact summary and durable facts using the LLM."""
-    snapshot_prompt = f"""You are summarizing a completed Council session for durable memory.
+def _memory_snapshot_prompt(prompt, final_answer, reasoning_summary):
+    return f"""You are summarizing a completed Council session for durable memory.
 Return a concise summary and 3-7 durable facts.
 
 Format exactly:
@@ -34,15 +40,24 @@ Session prompt: {prompt}
 Final answer: {final_answer}
 Reasoning summary: {reasoning_summary}
 """
+
+def _role_kwargs(role, **defaults):
+    """``defaults`` overlaid with the model and Ollama options configured for ``role``."""
+    return {**defaults, **model_router.ModelRouter.from_env().route(role).completion_kwargs()}
+
+def generate_memory_snapshot(prompt, final_answer, reasoning_summary):
+    """Generate a compact summary and durable facts using the LLM."""
+    snapshot_prompt = _memory_snapshot_prompt(prompt, final_answer, reasoning_summary)
     try:
         text = ollama_completion(
             [{"role": "user", "content": snapshot_prompt}],
-            max_tokens=350,
-            temperature=0.2
+            **_role_kwargs(model_router.MEMORY_SNAPSHOT, max_tokens=350, temperature=0.2)
         )
     except Exception:
         return "", []
+    return _parse_memory_snapshot(text)
 
+def _parse_memory_snapshot(text):
     if _is_unreliable_text(text):
         return "", []
 
@@ -86,20 +101,14 @@ def _is_unreliable_text(text):
     ]
     return any(phrase in lowered for phrase in blocked)
 
-def run_curator_only(prompt: str, conversation_history: list = None, stream: bool = False) -> dict:
-    """
-    Run only the Curator agent for fast, conversational query refinement.
-    Returns Curator output and whether it's asking for confirmation.
-    """
-    # Load persistent memory if no history provided
-    if conversation_history is None:
-        conversation_history = get_recent_messages(6)
-    
-    is_first_message = not conversation_history or len(conversation_history) == 0
-    preferences = get_all_preferences()
-    preferences_block = "\n".join(
+def _preferences_block(preferences):
+    return "\n".join(
         f"- {key}: {value}" for key, value in preferences.items()
     ) if preferences else "(No preferences set.)"
+
+def _curator_only_prompt(prompt, conversation_history, preferences):
+    is_first_message = not conversation_history or len(conversation_history) == 0
+    preferences_block = _preferences_block(preferences)
     
     # Build context from conversation history (only actual history, not fabricated)
     history_summary = ""
@@ -124,14 +133,13 @@ To make the most of that time, let's refine your idea first.
 When ready, I'll ask for confirmation before starting the full council.
 
 How can I help today?"""
-        curator_prompt = f"""You are the Curator — a fast, friendly, and strictly truthful assistant for The Council.
+        return f"""You are the Curator — a fast, friendly, and strictly truthful assistant for The Council.
 
 On the first message, respond with this exact greeting:
 {greeting}
 
 Then wait for the user's response."""
-    else:
-        curator_prompt = f"""You are the Curator — a fast, friendly, and strictly truthful assistant for The Council.
+    return f"""You are the Curator — a fast, friendly, and strictly truthful assistant for The Council.
 CORE RULES:
 - NEVER invent context, previous conversations, or details that don't exist.
 - ONLY use information from the current message and actual session history.
@@ -149,6 +157,83 @@ Preferences:
 
 Current message: {prompt}
 History: {history_summary}"""
+
+def _clean_curator_output(curator_output):
+    # Clean output - remove any model prefixes, artifacts, or leaked lines
+    curator_output = curator_output.strip()
+    # Remove common prefixes that models sometimes add
+    prefixes_to_remove = ["### Assistant:", "Assistant:", "Curator:", "### Curator:", "### User:", "User:"]
+    for prefix in prefixes_to_remove:
+        if curator_output.startswith(prefix):
+            curator_output = curator_output[len(prefix):].strip()
+    
+    # Remove leaked lines like "Press Enter...", "### User:", etc.
+    lines_to_remove = ["Press Enter", "press enter", "### User", "### Assistant", "---", "==="]
+    cleaned_lines = []
+    for line in curator_output.split('\n'):
+        line_stripped = line.strip()
+        if not any(to_remove.lower() in line_stripped.lower() for to_remove in lines_to_remove):
+            cleaned_lines.append(line)
+    return '\n'.join(cleaned_lines).strip()
+
+def _curator_result(prompt, conversation_history, curator_output):
+    curator_output = _clean_curator_output(curator_output)
+    
+    # Check if Curator is asking for confirmation
+    # Only mark as asking if there's a substantive, refined query (not first message, not vague)
+    is_greeting_only = len(prompt.strip()) < 30 and any(
+        word in prompt.lower() for word in ['hi', 'hello', 'hey', 'greeting', 'who are you', 'what are you']
+    )
+    is_first_message = not conversation_history or len(conversation_history) == 0
+    
+    # Only ask for confirmation if:
+    # - Not a greeting
+    # - Not the very first message (need at least one refinement turn)
+    # - Output contains confirmation language AND has a refined query
+    has_confirmation_language = (
+        "ready for full council" in curator_output.lower() or
+        "full council" in curator_output.lower() and "(yes/no)" in curator_output.lower() or
+        "refined query" in curator_output.lower() and "(yes/no)" in curator_output.lower()
+    )
+    has_refined_query = "refined query" in curator_output.lower()
+    
+    asking_confirmation = (
+        not is_greeting_only and 
+        not is_first_message and
+        has_confirmation_language and
+        has_refined_query
+    )
+    return {
+        "output": curator_output,
+        "asking_confirmation": asking_confirmation,
+        "prompt": prompt
+    }
+
+def _curator_metrics(clock, usage, **extra):
+    return run_metrics("curator", [clock.to_dict(usage)], clock.finished - clock.started, **extra)
+
+def _council_metrics(run, started, plan=None, **extra):
+    if plan:
+        extra["token_budget"] = plan
+    if run.interrupted:
+        extra.update(stop_reason=run.stop_reason, interrupted=dict(run.interrupted))
+    if run.compaction:
+        extra["compaction"] = compaction.report(run.compaction, run.usage, run.metrics)
+    return run_metrics("council", run.metrics, time.perf_counter() - started, **extra)
+
+@track_in_flight("curator")
+def run_curator_only(prompt: str, conversation_history: list = None, stream: bool = False) -> dict:
+    """
+    Run only the Curator agent for fast, conversational query refinement.
+    Returns Curator output and whether it's asking for confirmation.
+    """
+    # Load persistent memory if no history provided
+    if conversation_history is None:
+        conversation_history = get_recent_messages(6)
+    curator_prompt = _curator_only_prompt(prompt, conversation_history, get_all_preferences())
+    clock = StageClock("Curator")
+    usage = []
+    clock.start()
     
     try:
         if stream:
@@ -158,10 +243,15 @@ History: {history_summary}"""
             stream_gen = ollama_completion(
                 [{"role": "user", "content": curator_prompt}],
                 stream=True,
-                max_tokens=300,  # Hard cap — very fast
-                temperature=0.8  # Slightly lower for reliability
+                usage=usage,
+                **_role_kwargs(
+                    model_router.CURATOR,
+                    max_tokens=300,  # Hard cap — very fast
+                    temperature=0.8,  # Slightly lower for reliability
+                )
             )
             for chunk in stream_gen:
+                clock.token()
                 print(chunk, end="", flush=True)
                 full_output += chunk
             print()  # New line after streaming
@@ -170,105 +260,112 @@ History: {history_summary}"""
             # Non-streaming mode (for API compatibility)
             curator_output = ollama_completion(
                 [{"role": "user", "content": curator_prompt}],
-                max_tokens=300,  # Hard cap — very fast
-                temperature=0.8  # Slightly lower for reliability
+                usage=usage,
+                **_role_kwargs(
+                    model_router.CURATOR,
+                    max_tokens=300,  # Hard cap — very fast
+                    temperature=0.8,  # Slightly lower for reliability
+                )
             )
+        clock.finish()
         
-        # Clean output - remove any model prefixes, artifacts, or leaked lines
-        curator_output = curator_output.strip()
-        # Remove common prefixes that models sometimes add
-        prefixes_to_remove = ["### Assistant:", "Assistant:", "Curator:", "### Curator:", "### User:", "User:"]
-        for prefix in prefixes_to_remove:
-            if curator_output.startswith(prefix):
-                curator_output = curator_output[len(prefix):].strip()
-        
-        # Remove leaked lines like "Press Enter...", "### User:", etc.
-        lines_to_remove = ["Press Enter", "press enter", "### User", "### Assistant", "---", "==="]
-        cleaned_lines = []
-        for line in curator_output.split('\n'):
-            line_stripped = line.strip()
-            if not any(to_remove.lower() in line_stripped.lower() for to_remove in lines_to_remove):
-                cleaned_lines.append(line)
-        curator_output = '\n'.join(cleaned_lines).strip()
-        
-        # Check if Curator is asking for confirmation
-        # Only mark as asking if there's a substantive, refined query (not first message, not vague)
-        is_greeting_only = len(prompt.strip()) < 30 and any(
-            word in prompt.lower() for word in ['hi', 'hello', 'hey', 'greeting', 'who are you', 'what are you']
-        )
-        is_first_message = not conversation_history or len(conversation_history) == 0
-        
-        # Only ask for confirmation if:
-        # - Not a greeting
-        # - Not the very first message (need at least one refinement turn)
-        # - Output contains confirmation language AND has a refined query
-        has_confirmation_language = (
-            "ready for full council" in curator_output.lower() or
-            "full council" in curator_output.lower() and "(yes/no)" in curator_output.lower() or
-            "refined query" in curator_output.lower() and "(yes/no)" in curator_output.lower()
-        )
-        has_refined_query = "refined query" in curator_output.lower()
-        
-        asking_confirmation = (
-            not is_greeting_only and 
-            not is_first_message and
-            has_confirmation_language and
-            has_refined_query
-        )
+        result = _curator_result(prompt, conversation_history, curator_output)
+        result["metrics"] = _curator_metrics(clock, usage)
+        record_run(result["metrics"])
         
         # Save to persistent memory
         add_message("user", prompt)
-        add_message("assistant", curator_output)
+        add_message("assistant", result["output"])
 
-        return {
-            "output": curator_output,
-            "asking_confirmation": asking_confirmation,
-            "prompt": prompt
-        }
+        return result
     except KeyboardInterrupt:
         raise  # Re-raise to be handled by caller
     except Exception as e:
+        clock.finish()
+        record_run(_curator_metrics(clock, usage, error=f"Curator failed: {str(e)}"))
         return {"error": f"Curator failed: {str(e)}"}
 
-def run_council_sync(prompt: str, previous_proposal: dict = None, skip_curator: bool = False, stream: bool = False) -> dict:
+async def _astream_agent(name, messages, **kwargs):
+    """Yield content events for one agent as Ollama produces tokens."""
+    stream = await ollama_completion_async(messages, stream=True, **kwargs)
+    async for chunk in stream:
+        yield {"type": "content", "agent": name, "content": chunk}
+
+@track_in_flight("curator")
+async def astream_curator_only(prompt: str, conversation_history: list = None):
     """
-    Run the council with sequential agent calls using direct LiteLLM.
-    Bypasses CrewAI's problematic LLM routing while maintaining the council pattern.
-    
-    Args:
-        prompt: The user's prompt or refined query
-        previous_proposal: For self-improvement mode execution
-        skip_curator: If True, skip Curator and run full council directly
+    Stream the Curator turn as events.
+
+    Yields {"type": "agent"}, then one {"type": "content"} event per token,
+    {"type": "agent_done"} and finally {"type": "result"} carrying the same
+    dict run_curator_only returns. SQLite access runs in a worker thread.
     """
-    print(f"Running council with prompt: {prompt}\n")
-    
-    # Detect self-improvement mode
-    is_self_improve_mode = "self-improvement mode" in prompt.lower() or "self-improve" in prompt.lower()
-    
-    # Handle approval execution (CLI applies proposals; engine does not execute)
-    if previous_proposal and "approved" in prompt.lower() and "proceed" in prompt.lower():
-        print("\n\033[1;33m" + "="*60 + "\033[0m")
-        print("\033[1;31mSELF-EXECUTION DISABLED FOR SAFETY\033[0m")
-        print("\033[1;33m" + "="*60 + "\033[0m")
-        print("\nProposal generated above — review and apply manually if desired.\n")
-        print("Self-Improvement proposals are applied by the CLI, not the engine.")
-        print("No code changes have been applied here.\n")
-        
-        return {
-            "prompt": prompt,
-            "executed": False,
-            "message": "Execution handled by CLI — no changes applied here"
-        }
+    if conversation_history is None:
+        conversation_history = await asyncio.to_thread(get_recent_messages, 6)
+    preferences = await asyncio.to_thread(get_all_preferences)
+    curator_prompt = _curator_only_prompt(prompt, conversation_history, preferences)
+    yield {"type": "agent", "agent": "Curator"}
+    clock = StageClock("Curator")
+    usage = []
+    parts = []
+    clock.start()
+    try:
+        async for event in _astream_agent(
+            "Curator",
+            [{"role": "user", "content": curator_prompt}],
+            usage=usage,
+            **_role_kwargs(
+                model_router.CURATOR,
+                max_tokens=300,  # Hard cap — very fast
+                temperature=0.8,  # Slightly lower for reliability
+            )
+        ):
+            clock.token()
+            parts.append(event["content"])
+            yield event
+        clock.finish()
+        result = _curator_result(prompt, conversation_history, "".join(parts))
+        result["metrics"] = _curator_metrics(clock, usage)
+        await asyncio.to_thread(record_run, result["metrics"])
+        await asyncio.to_thread(add_message, "user", prompt)
+        await asyncio.to_thread(add_message, "assistant", result["output"])
+    except Exception as e:
+        clock.finish()
+        result = {"error": f"Curator failed: {str(e)}"}
+        await asyncio.to_thread(record_run, _curator_metrics(clock, usage, error=result["error"]))
+    yield {"type": "agent_done", "agent": "Curator"}
+    yield {"type": "result", "result": result}
+
+async def run_curator_only_async(prompt: str, conversation_history: list = None) -> dict:
+    """Async variant of run_curator_only (drains astream_curator_only)."""
+    result = {}
+    async for event in astream_curator_only(prompt, conversation_history):
+        if event["type"] == "result":
+            result = event["result"]
+    return result
+
+def _is_self_improve_prompt(prompt):
+    return "self-improvement mode" in prompt.lower() or "self-improve" in prompt.lower()
+
+def _is_approval_request(prompt, previous_proposal):
+    return bool(previous_proposal) and "approved" in prompt.lower() and "proceed" in prompt.lower()
+
+def _execution_disabled_result(prompt):
+    print("\n\033[1;33m" + "="*60 + "\033[0m")
+    print("\033[1;31mSELF-EXECUTION DISABLED FOR SAFETY\033[0m")
+    print("\033[1;33m" + "="*60 + "\033[0m")
+    print("\nProposal generated above — review and apply manually if desired.\n")
+    print("Self-Improvement proposals are applied by the CLI, not the engine.")
+    print("No code changes have been applied here.\n")
     
-    # Curator agent (fast receptionist/assistant) - only if not skipped
-    curator_output = ""
-    if not skip_curator:
-        print("Starting council – loading model (first run only, please wait)...")
-        if stream:
-            print("\033[1;36mCurator (fast assistant):\033[0m ", end="", flush=True)
-        else:
-            print("\nRunning Curator (fast assistant)...")
-        curator_prompt = f"""You are the Curator — a fast, friendly, and strictly truthful assistant for The Council.
+    return {
+        "prompt": prompt,
+        "executed": False,
+        "message": "Execution handled by CLI — no changes applied here"
+    }
+
+def _council_curator_prompt(prompt):
+    return f"""You are the Curator — a fast, friendly, and strictly truthful assistant for The Council.
 CORE RULES:
 - NEVER invent context, previous conversations, or details that don't exist.
 - ONLY use information from the current message.
@@ -277,74 +374,25 @@ CORE RULES:
 - Do NOT claim you lack access to the system or codebase; respond only to the given prompt.
 Keep your response short and natural (under 100 words).
 Prompt: {prompt}"""
-        
-        try:
-            if stream:
-                full_output = ""
-                stream_gen = ollama_completion(
-                    [{"role": "user", "content": curator_prompt}],
-                    stream=True,
-                    max_tokens=300,  # Hard cap — very fast
-                    temperature=0.8  # Slightly lower for reliability
-                )
-                for chunk in stream_gen:
-                    print(chunk, end="", flush=True)
-                    full_output += chunk
-                print()  # New line after streaming
-                curator_output = full_output
-            else:
-                curator_output = ollama_completion(
-                    [{"role": "user", "content": curator_prompt}],
-                    max_tokens=300,  # Hard cap — very fast
-                    temperature=0.8  # Slightly lower for reliability
-                )
-            
-            # Clean output - remove any model prefixes, artifacts, or leaked lines
-            curator_output = curator_output.strip()
-            # Remove common prefixes that models sometimes add
-            prefixes_to_remove = ["### Assistant:", "Assistant:", "Curator:", "### Curator:", "### User:", "User:"]
-            for prefix in prefixes_to_remove:
-                if curator_output.startswith(prefix):
-                    curator_output = curator_output[len(prefix):].strip()
-            
-            # Remove leaked lines like "Press Enter...", "### User:", etc.
-            lines_to_remove = ["Press Enter", "press enter", "### User", "### Assistant", "---", "==="]
-            cleaned_lines = []
-            for line in curator_output.split('\n'):
-                line_stripped = line.strip()
-                if not any(to_remove.lower() in line_stripped.lower() for to_remove in lines_to_remove):
-                    cleaned_lines.append(line)
-            curator_output = '\n'.join(cleaned_lines).strip()
-            
-            if not stream:
-                print(f"Curator complete: {len(curator_output)} chars")
-        except KeyboardInterrupt:
-            raise  # Re-raise to be handled by caller
-        except Exception as e:
-            return {"error": f"Curator failed: {str(e)}"}
-    else:
-        # When skipping Curator (after confirmation), show a message
-        if not stream:
-            print("Starting council – loading model (first run only, please wait)...")
-        curator_output = f"Curator: Understood. Deliberation beginning with refined query: {prompt}"
-    
+
+def _skipped_curator_output(prompt):
+    return f"Curator: Understood. Deliberation beginning with refined query: {prompt}"
+
+def _load_memory_context(prompt):
+    """Load the memory blocks shared by the Researcher/Critic/Planner/Judge prompts."""
     memory_context = get_latest_summary()
     relevant_facts = get_relevant_facts(prompt, limit=5)
     preferences = get_all_preferences()
-    preferences_block = "\n".join(
-        f"- {key}: {value}" for key, value in preferences.items()
-    ) if preferences else "(No preferences set.)"
-    facts_block = "\n".join(f"- {fact}" for fact in relevant_facts) if relevant_facts else "(No relevant facts.)"
-    memory_block = memory_context if memory_context else "(No prior memory.)"
+    return {
+        "preferences_block": _preferences_block(preferences),
+        "facts_block": "\n".join(f"- {fact}" for fact in relevant_facts) if relevant_facts else "(No relevant facts.)",
+        "memory_block": memory_context if memory_context else "(No prior memory.)",
+    }
 
-    # Researcher agent
-    if stream:
-        print("\033[1;35mResearcher (bold exploration):\033[0m ", end="", flush=True)
-    else:
-        print("Running Researcher (bold exploration)...")
-    
+def _researcher_prompt(is_self_improve_mode):
+    # Agent prompts are suffixes; the shared context comes from src.prompts.shared_prefix
     if is_self_improve_mode:
-        researcher_prompt = f"""You are the Researcher agent analyzing the Council codebase for self-improvement.
+        return """You are the Researcher agent analyzing the Council codebase for self-improvement.
 Your task: Examine the codebase structure, identify concrete improvement opportunities, and analyze what high-leverage changes would enhance the Council's capabilities.
 
 CRITICAL SAFETY RULES:
@@ -363,17 +411,8 @@ Focus on:
 - Advanced features that could be added
 
 Review the codebase context and propose ONE specific, concrete improvement with high impact.
-Memory Summary:
-{memory_block}
-Facts:
-{facts_block}
-Preferences:
-{preferences_block}
-
-Prompt: {prompt}
 Provide detailed analysis of the improvement opportunity."""
-    else:
-        researcher_prompt = f"""You are the Researcher agent — a bold, visionary explorer of advanced software engineering practices.
+    return """You are the Researcher agent — a bold, visionary explorer of advanced software engineering practices.
 Go beyond mainstream advice and uncover cutting-edge, unconventional, experimental, or research-level techniques with high potential impact.
 Draw from academic papers, niche tools, and elite teams (Jane Street, DeepMind, NASA, seL4, etc.).
 Prioritize ideas that are underused, complex, or not widely adopted but could yield breakthroughs in correctness, expressiveness, or robustness.
@@ -388,40 +427,11 @@ Target caliber:
 - Evolutionary code improvement
 - Extreme language experiments (Idris, Rust, ATS, F*)
 Be speculative but grounded. Include specific tools, papers, or projects where possible.
-Memory Summary:
-{memory_block}
-Facts:
-{facts_block}
-Preferences:
-{preferences_block}
-
-Prompt: {prompt}
 Provide detailed reasoning, examples, risks, and rewards."""
-    
-    try:
-        if stream:
-            full_output = ""
-            stream_gen = ollama_completion([{"role": "user", "content": researcher_prompt}], stream=True)
-            for chunk in stream_gen:
-                print(chunk, end="", flush=True)
-                full_output += chunk
-            print()  # New line after streaming
-            research_output = full_output
-        else:
-            research_output = ollama_completion([{"role": "user", "content": researcher_prompt}])
-            print(f"Researcher complete: {len(research_output)} chars")
-    except KeyboardInterrupt:
-        raise  # Re-raise to be handled by caller
-    except Exception as e:
-        return {"error": f"Researcher failed: {str(e)}"}
 
-    # Critic agent
-    if stream:
-        print("\033[1;31mCritic (contrarian challenge):\033[0m ", end="", flush=True)
-    else:
-        print("Running Critic (contrarian challenge)...")
+def _critic_prompt(research_output, is_self_improve_mode):
     if is_self_improve_mode:
-        critic_prompt = f"""You are the Critic agent reviewing the Researcher's codebase improvement proposal.
+        return f"""You are the Critic agent reviewing the Researcher's codebase improvement proposal.
 Your task: Challenge the proposal rigorously. Is it high-leverage enough? Could it be bolder? Are there risks or edge cases?
 Push for more ambitious improvements if the proposal is too incremental.
 
@@ -432,56 +442,47 @@ CRITICAL SAFETY RULES:
 - Reject any proposal that could affect system stability or spawn external processes
 
 Research input: {research_output}
-Memory Summary:
-{memory_block}
-Facts:
-{facts_block}
-Preferences:
-{preferences_block}
-
-Prompt: {prompt}
 Provide sharp critique and demand more impact if needed, while ensuring safety constraints are met."""
-    else:
-        critic_prompt = f"""You are the Critic agent — a ruthless contrarian who rejects incremental, safe, or conventional improvements.
+    return f"""You are the Critic agent — a ruthless contrarian who rejects incremental, safe, or conventional improvements.
 If the Researcher includes anything resembling mainstream advice, aggressively dismiss it as insufficient for dramatic growth.
 Demand radically higher-leverage alternatives, even if they are harder, less proven, or considered overkill by most developers.
 Never accept narrowing to a single idea — insist on a portfolio of bold experiments.
 Highlight limitations of safe choices and elevate the most ambitious options.
 Research input: {research_output}
-Memory Summary:
-{memory_block}
-Facts:
-{facts_block}
-Preferences:
-{preferences_block}
-
-Prompt: {prompt}
 Output sharp, focused critique that forces greater ambition."""
-    
-    try:
-        if stream:
-            full_output = ""
-            stream_gen = ollama_completion([{"role": "user", "content": critic_prompt}], stream=True)
-            for chunk in stream_gen:
-                print(chunk, end="", flush=True)
-                full_output += chunk
-            print()  # New line after streaming
-            critic_output = full_output
-        else:
-            critic_output = ollama_completion([{"role": "user", "content": critic_prompt}])
-            print(f"Critic complete: {len(critic_output)} chars")
-    except KeyboardInterrupt:
-        raise  # Re-raise to be handled by caller
-    except Exception as e:
-        return {"error": f"Critic failed: {str(e)}"}
 
-    # Planner agent
-    if stream:
-        print("\033[1;33mPlanner (multi-track strategy):\033[0m ", end="", flush=True)
-    else:
-        print("Running Planner (multi-track strategy)...")
+# Critic personas run side by side in parallel execution mode; the value is
+# the focus appended to the Critic prompt ("" keeps the default Critic)
+CRITIC_PERSONAS = {
+    "contrarian": "",
+    "rigor": "correctness: hidden failure modes, unproven assumptions and missing evidence",
+    "pragmatist": "feasibility: adoption cost, hardware limits and which ideas can be piloted first",
+}
+
+def _critic_personas():
+    names = os.getenv("COUNCIL_CRITIC_PERSONAS", ",".join(CRITIC_PERSONAS))
+    return list(dict.fromkeys(name.strip().lower() for name in names.split(",") if name.strip()))
+
+def _critic_persona_prompt(persona, research_output, is_self_improve_mode):
+    base = _critic_prompt(research_output, is_self_improve_mode)
+    focus = CRITIC_PERSONAS.get(persona, f"the {persona} perspective")
+    return f"{base}\nFocus this critique on {focus}." if focus else base
+
+def _critic_persona_prompts(research_output, is_self_improve_mode):
+    return {
+        persona: _critic_persona_prompt(persona, research_output, is_self_improve_mode)
+        for persona in _critic_personas()
+    }
+
+def _combine_critiques(critiques):
+    """Merge persona critiques into the single Critic output the Planner reads."""
+    if len(critiques) == 1:
+        return next(iter(critiques.values()))
+    return "\n\n".join(f"[{persona} critic]\n{text}" for persona, text in critiques.items())
+
+def _planner_prompt(research_output, critic_output, is_self_improve_mode):
     if is_self_improve_mode:
-        planner_prompt = f"""You are the Planner agent structuring the codebase improvement proposal.
+        return f"""You are the Planner agent structuring the codebase improvement proposal.
 Your task: Turn the improvement idea into a concrete implementation plan with specific file changes.
 
 CRITICAL SAFETY RULES:
@@ -499,56 +500,18 @@ Specify:
 
 Research: {research_output}
 Critic: {critic_output}
-Memory Summary:
-{memory_block}
-Facts:
-{facts_block}
-Preferences:
-{preferences_block}
-
-Prompt: {prompt}
 Output a detailed implementation plan with file-level specificity, ensuring safety constraints."""
-    else:
-        planner_prompt = f"""You are the Planner agent — a pragmatic strategist for high-ambition experiments.
+    return f"""You are the Planner agent — a pragmatic strategist for high-ambition experiments.
 Turn the bold ideas from Researcher and Critic into a portfolio of concurrent or phased personal experiments (aim for 3–5 parallel tracks, not one).
 Make each track concrete: tools, learning resources, small pilot projects, success metrics, and risk mitigations.
 Emphasize parallel exploration to maximize learning velocity.
 Research: {research_output}
 Critic: {critic_output}
-Memory Summary:
-{memory_block}
-Facts:
-{facts_block}
-Preferences:
-{preferences_block}
-
-Prompt: {prompt}
 Output a clear, numbered multi-track action plan with timelines."""
-    
-    try:
-        if stream:
-            full_output = ""
-            stream_gen = ollama_completion([{"role": "user", "content": planner_prompt}], stream=True)
-            for chunk in stream_gen:
-                print(chunk, end="", flush=True)
-                full_output += chunk
-            print()  # New line after streaming
-            planner_output = full_output
-        else:
-            planner_output = ollama_completion([{"role": "user", "content": planner_prompt}])
-            print(f"Planner complete: {len(planner_output)} chars")
-    except KeyboardInterrupt:
-        raise  # Re-raise to be handled by caller
-    except Exception as e:
-        return {"error": f"Planner failed: {str(e)}"}
 
-    # Judge/Synthesizer agent
-    if stream:
-        print("\033[1;32mJudge (visionary synthesis):\033[0m ", end="", flush=True)
-    else:
-        print("Running Judge (visionary synthesis)...\n")
+def _judge_prompt(research_output, critic_output, planner_output, is_self_improve_mode):
     if is_self_improve_mode:
-        judge_prompt = f"""You are the Judge/Synthesizer creating a formal self-improvement proposal for the Council codebase.
+        return f"""You are the Judge/Synthesizer creating a formal self-improvement proposal for the Council codebase.
 
 Your task: Synthesize the analysis into ONE high-leverage, concrete improvement with executable code changes.
 
@@ -592,14 +555,8 @@ CRITICAL: Self-Improvement Mode produces proposals only. Execution requires expl
 Researcher: {research_output}
 Critic: {critic_output}
 Planner: {planner_output}
-Memory Context:
-{memory_block}
-
-Prompt: {prompt}
-
 The proposal will be presented to the user for manual review and application."""
-    else:
-        judge_prompt = f"""You are the Judge/Synthesizer — a radical visionary obsessed with 10x transformation.
+    return f"""You are the Judge/Synthesizer — a radical visionary obsessed with 10x transformation.
 NON-NEGOTIABLE RULES:
 - You MUST output EXACTLY 4 numbered bold recommendations. No more, no less.
 - Never converge on fewer than 4.
@@ -624,30 +581,111 @@ If you cannot produce 4, use these fallback techniques to complete the list:
 Researcher: {research_output}
 Critic: {critic_output}
 Planner: {planner_output}
-Memory Context:
-{memory_block}
+Now synthesize a complete 4-item portfolio."""
 
-Prompt: {prompt}
+def _curator_stage(prompt, routes=None):
+    return StageSpec(
+        name="Curator",
+        role="fast assistant",
+        build_prompt=lambda outputs: _council_curator_prompt(prompt),
+        max_tokens=300,  # Hard cap — very fast
+        temperature=0.8,  # Slightly lower for reliability
+        shared_context=False,
+        color="1;36",
+        postprocess=_clean_curator_output,
+        completion_options=(routes or {}).get(model_router.CURATOR),
+    )
 
-Now synthesize a complete 4-item portfolio."""
-    
-    try:
-        if stream:
-            full_output = ""
-            stream_gen = ollama_completion([{"role": "user", "content": judge_prompt}], stream=True)
-            for chunk in stream_gen:
-                print(chunk, end="", flush=True)
-                full_output += chunk
-            print("\n")  # New line after streaming
-            judge_output = full_output
-        else:
-            judge_output = ollama_completion([{"role": "user", "content": judge_prompt}])
-            print(f"Judge complete: {len(judge_output)} chars")
-    except KeyboardInterrupt:
-        raise  # Re-raise to be handled by caller
-    except Exception as e:
-        return {"error": f"Judge failed: {str(e)}"}
+# Stands in for a stage the run's deadline skipped (see src/cancellation.py)
+_NOT_REACHED = "(Not reached: the council ran out of time before this stage.)"
+
+def _council_stages(is_self_improve_mode, max_tokens=None, routes=None):
+    """Researcher → Critic → Planner → Judge, declared as pipeline stages.
+
+    ``max_tokens`` ({stage: tokens}, from src.token_budget) overrides the
+    global LLM_MAX_TOKENS per stage; ``routes`` ({role: completion kwargs},
+    from _model_routes) picks each stage's model.
+    """
+    mode = is_self_improve_mode
+    stages = [
+        StageSpec(
+            name="Researcher",
+            role="bold exploration",
+            build_prompt=lambda outputs: _researcher_prompt(mode),
+            color="1;35",
+            budget_weight=1.0,
+        ),
+        StageSpec(
+            name="Critic",
+            role="contrarian challenge",
+            build_prompt=lambda outputs: _critic_prompt(outputs["Researcher"], mode),
+            depends_on=("Researcher",),
+            color="1;31",
+            fan_out=lambda outputs: _critic_persona_prompts(outputs["Researcher"], mode),
+            combine=_combine_critiques,
+            budget_weight=1.0,
+        ),
+        StageSpec(
+            name="Planner",
+            role="multi-track strategy",
+            build_prompt=lambda outputs: _planner_prompt(outputs["Researcher"], outputs["Critic"], mode),
+            depends_on=("Researcher", "Critic"),
+            color="1;33",
+            budget_weight=1.0,
+        ),
+        StageSpec(
+            name="Judge",
+            role="visionary synthesis",
+            build_prompt=lambda outputs: _judge_prompt(
+                outputs.get("Researcher", _NOT_REACHED),
+                outputs.get("Critic", _NOT_REACHED),
+                outputs.get("Planner", _NOT_REACHED),
+                mode,
+            ),
+            depends_on=("Researcher", "Critic", "Planner"),
+            color="1;32",
+            # Synthesizes whatever is available when the deadline cuts the run short
+            final=True,
+            # The 4-item portfolio needs the most room
+            budget_weight=1.25,
+        ),
+    ]
+    if max_tokens or routes:
+        stages = [
+            dataclasses.replace(
+                spec,
+                max_tokens=(max_tokens or {}).get(spec.name, spec.max_tokens),
+                completion_options=(routes or {}).get(spec.name.lower()),
+            )
+            for spec in stages
+        ]
+    return stages
+
+def _model_routes(skip_curator):
+    """Completion kwargs per role for this run's calls, in order (see src/model_router.py)."""
+    roles = [] if skip_curator else [model_router.CURATOR]
+    roles += [model_router.RESEARCHER, model_router.CRITIC, model_router.PLANNER, model_router.JUDGE]
+    if ENABLE_PERSISTENCE:
+        # The snapshot job follows the Judge, so it decides whether the Judge's model stays loaded
+        roles.append(model_router.MEMORY_SNAPSHOT)
+    routes = model_router.ModelRouter.from_env().plan(roles)
+    return {route.role: route.completion_kwargs() for route in routes}
 
+def _token_plan(is_self_improve_mode, skip_curator):
+    """Per-stage max_tokens for this run (None without COUNCIL_TARGET_LATENCY_S)."""
+    weights = {spec.name: spec.budget_weight for spec in _council_stages(is_self_improve_mode) if spec.budget_weight}
+    return token_budget.council_plan(weights, fixed_stages=() if skip_curator else ("Curator",))
+
+def _council_pipeline(is_self_improve_mode, plan=None, routes=None):
+    return Pipeline(
+        _council_stages(is_self_improve_mode, plan["max_tokens"] if plan else None, routes),
+        parallel=execution_mode() == PARALLEL,
+        max_concurrency=max_concurrency(),
+        compact=compaction.compactor(),
+    )
+
+def _parse_judge_output(judge_output):
+    """Split the Judge output into (final_answer, reasoning_summary)."""
     # Parse judge output - extract only from "Final Answer:" line, ensure reasoning is concise
     if "Final Answer:" in judge_output and "Rationale:" in judge_output:
         parts = judge_output.split("Final Answer:")[1].split("Rationale:")
@@ -688,13 +726,80 @@ Now synthesize a complete 4-item portfolio."""
             fallback_lines.append(f"{num}. {item}")
         if fallback_lines:
             final_answer += "\n" + "\n".join(fallback_lines)
+    return final_answer, reasoning_summary
+
+def _parse_self_improve_proposal(judge_output):
+    """Extract the structured self-improvement proposal from the Judge output."""
+    proposal_data = {}
+    if "PROPOSAL:" in judge_output:
+        proposal_data["description"] = judge_output.split("PROPOSAL:")[1].split("\n")[0].strip()
+    
+    # Parse file changes
+    file_changes = {}
+    if "FILES_TO_CHANGE:" in judge_output:
+        files_section = judge_output.split("FILES_TO_CHANGE:")[1]
+        if "IMPACT:" in files_section:
+            files_section = files_section.split("IMPACT:")[0]
+        
+        # Try to extract file paths and contents
+        lines = files_section.split("\n")
+        current_file = None
+        current_content = []
+        in_file_content = False
+        
+        for line in lines:
+            # Detect file path (looks like a path)
+            if (line.strip().endswith((".py", ".md", ".txt", ".yaml", ".yml", ".json")) or 
+                ("/" in line and line.strip().startswith(("src/", "test/", "scripts/")))):
+                if current_file and current_content:
+                    file_changes[current_file] = "\n".join(current_content).strip()
+                current_file = line.strip().rstrip(":")
+                current_content = []
+                in_file_content = True
+            elif in_file_content and current_file:
+                current_content.append(line)
+        
+        if current_file and current_content:
+            file_changes[current_file] = "\n".join(current_content).strip()
+        
+        proposal_data["file_changes"] = file_changes
+    
+    if "IMPACT:" in judge_output:
+        impact_section = judge_output.split("IMPACT:")[1]
+        if "ROLLBACK:" in impact_section:
+            impact_section = impact_section.split("ROLLBACK:")[0]
+        proposal_data["impact"] = impact_section.strip()
+    
+    if "ROLLBACK:" in judge_output:
+        rollback_section = judge_output.split("ROLLBACK:")[1]
+        if "Rationale:" in rollback_section:
+            rollback_section = rollback_section.split("Rationale:")[0]
+        proposal_data["rollback"] = rollback_section.strip()
+    return proposal_data
+
+def _partial_council_result(prompt, outputs, reason):
+    """Result for a run stopped before the Judge: the latest stage output as-is."""
+    agents_outputs = [{"name": name, "output": output} for name, output in outputs.items()]
+    for name in ("Planner", "Critic", "Researcher"):
+        if outputs.get(name):
+            return {
+                "prompt": prompt,
+                "agents": agents_outputs,
+                "final_answer": outputs[name],
+                "reasoning_summary": f"The council stopped ({reason}) before the Judge; this is the {name}'s output.",
+                "partial": True,
+            }
+    return {"error": f"Council stopped ({reason}) before any stage produced output"}
+
+def _build_council_result(prompt, outputs, is_self_improve_mode, run=None):
+    """Assemble the council result dict from the per-agent outputs."""
+    if run is not None and run.interrupted and "Judge" not in outputs:
+        return {**_partial_council_result(prompt, outputs, run.stop_reason), "interrupted": dict(run.interrupted)}
+    judge_output = outputs["Judge"]
+    final_answer, reasoning_summary = _parse_judge_output(judge_output)
 
     agents_outputs = [
-        {"name": "Curator", "output": curator_output},
-        {"name": "Researcher", "output": research_output},
-        {"name": "Critic", "output": critic_output},
-        {"name": "Planner", "output": planner_output},
-        {"name": "Judge", "output": judge_output}
+        {"name": name, "output": output} for name, output in outputs.items()
     ]
 
     result = {
@@ -706,85 +811,216 @@ Now synthesize a complete 4-item portfolio."""
 
     # Parse self-improvement proposal if in self-improve mode
     if is_self_improve_mode:
-        proposal_data = {}
         try:
-            if "PROPOSAL:" in judge_output:
-                proposal_data["description"] = judge_output.split("PROPOSAL:")[1].split("\n")[0].strip()
-            
-            # Parse file changes
-            file_changes = {}
-            if "FILES_TO_CHANGE:" in judge_output:
-                files_section = judge_output.split("FILES_TO_CHANGE:")[1]
-                if "IMPACT:" in files_section:
-                    files_section = files_section.split("IMPACT:")[0]
-                
-                # Try to extract file paths and contents
-                lines = files_section.split("\n")
-                current_file = None
-                current_content = []
-                in_file_content = False
-                
-                for line in lines:
-                    # Detect file path (looks like a path)
-                    if (line.strip().endswith((".py", ".md", ".txt", ".yaml", ".yml", ".json")) or 
-                        ("/" in line and line.strip().startswith(("src/", "test/", "scripts/")))):
-                        if current_file and current_content:
-                            file_changes[current_file] = "\n".join(current_content).strip()
-                        current_file = line.strip().rstrip(":")
-                        current_content = []
-                        in_file_content = True
-                    elif in_file_content and current_file:
-                        current_content.append(line)
-                
-                if current_file and current_content:
-                    file_changes[current_file] = "\n".join(current_content).strip()
-                
-                proposal_data["file_changes"] = file_changes
-            
-            if "IMPACT:" in judge_output:
-                impact_section = judge_output.split("IMPACT:")[1]
-                if "ROLLBACK:" in impact_section:
-                    impact_section = impact_section.split("ROLLBACK:")[0]
-                proposal_data["impact"] = impact_section.strip()
-            
-            if "ROLLBACK:" in judge_output:
-                rollback_section = judge_output.split("ROLLBACK:")[1]
-                if "Rationale:" in rollback_section:
-                    rollback_section = rollback_section.split("Rationale:")[0]
-                proposal_data["rollback"] = rollback_section.strip()
-            
-            result["proposal"] = proposal_data
+            result["proposal"] = _parse_self_improve_proposal(judge_output)
             result["is_self_improve"] = True
         except Exception as e:
             # If parsing fails, still return the result but log the error
             result["proposal_parse_error"] = str(e)
+    if run is not None and run.interrupted:
+        result["interrupted"] = dict(run.interrupted)
+    return result
 
-    # Save session to persistent memory database (only if persistence enabled)
-    if "error" not in result and ENABLE_PERSISTENCE:
+def _record_session(prompt, final_answer, reasoning_summary):
+    session_id = save_session(prompt, final_answer, reasoning_summary)
+    if session_id:
+        add_message("user", prompt, session_id=session_id)
+        add_message("assistant", final_answer, session_id=session_id)
+    return session_id
+
+def _store_snapshot(session_id, prompt, final_answer, reasoning_summary, summary, facts):
+    if not summary:
+        summary = build_session_summary(prompt, final_answer, reasoning_summary)
+    save_summary(session_id, summary)
+    if facts:
+        save_facts(session_id, facts)
+
+def _snapshot_job(payload):
+    """Memory worker job: summarize the session, extract and embed its facts."""
+    summary, facts = generate_memory_snapshot(
+        payload["prompt"], payload["final_answer"], payload["reasoning_summary"]
+    )
+    _store_snapshot(
+        payload["session_id"], payload["prompt"], payload["final_answer"],
+        payload["reasoning_summary"], summary, facts
+    )
+
+def _maintenance_job(payload):
+    """Memory worker job: a maintenance pass if one is due (see src/maintenance.py)."""
+    from src.maintenance import run_if_due
+    run_if_due()
+
+memory_worker.register("snapshot", _snapshot_job, uses_llm=True)
+# No longer queued (the API's MaintenanceScheduler runs it when idle); kept
+# so jobs queued by earlier versions still complete
+memory_worker.register("maintenance", _maintenance_job)
+
+def _persist_session(result):
+    """Save the session now; queue its memory snapshot for the memory worker."""
+    prompt = result["prompt"]
+    final_answer = result["final_answer"]
+    reasoning_summary = result["reasoning_summary"]
+    try:
+        session_id = _record_session(prompt, final_answer, reasoning_summary)
+        if session_id:
+            memory_worker.submit("snapshot", {
+                "session_id": session_id,
+                "prompt": prompt,
+                "final_answer": final_answer,
+                "reasoning_summary": reasoning_summary,
+            })
+    except Exception as e:
+        # Don't fail the whole process if memory save fails
+        print(f"\nWarning: Failed to save session to memory database: {e}")
+
+def _should_persist(result):
+    # A Judge cut short by the deadline left an incomplete answer; keep it out of memory
+    return (
+        ENABLE_PERSISTENCE
+        and "error" not in result
+        and not result.get("partial")
+        and "Judge" not in result.get("interrupted", {})
+    )
+
+async def _persist_session_async(result):
+    """Async variant of _persist_session; the SQLite writes run in a thread."""
+    await asyncio.to_thread(_persist_session, result)
+
+@track_in_flight("council")
+def run_council_sync(
+    prompt: str,
+    previous_proposal: dict = None,
+    skip_curator: bool = False,
+    stream: bool = False,
+    token: CancellationToken = None,
+) -> dict:
+    """
+    Run the council with sequential agent calls against the local Ollama server.
+    Bypasses CrewAI's problematic LLM routing while maintaining the council pattern.
+    
+    Args:
+        prompt: The user's prompt or refined query
+        previous_proposal: For self-improvement mode execution
+        skip_curator: If True, skip Curator and run full council directly
+        token: Cancellation/deadline budget shared by every stage (defaults
+            to COUNCIL_DEADLINE_S); stages it cuts short are listed under
+            "interrupted" in the result
+    """
+    print(f"Running council with prompt: {prompt}\n")
+    
+    # Detect self-improvement mode
+    is_self_improve_mode = _is_self_improve_prompt(prompt)
+    
+    # Handle approval execution (CLI applies proposals; engine does not execute)
+    if _is_approval_request(prompt, previous_proposal):
+        return _execution_disabled_result(prompt)
+    
+    # Curator agent (fast receptionist/assistant) - only if not skipped
+    run = PipelineRun(token=token or CancellationToken.from_env())
+    plan = _token_plan(is_self_improve_mode, skip_curator)
+    routes = _model_routes(skip_curator)
+    started = time.perf_counter()
+    if not skip_curator:
+        print("Starting council – loading model (first run only, please wait)...")
         try:
-            from src.memory import prune_messages, vacuum_db
-            session_id = save_session(prompt, final_answer, reasoning_summary)
-            if session_id:
-                add_message("user", prompt, session_id=session_id)
-                add_message("assistant", final_answer, session_id=session_id)
-                summary, facts = generate_memory_snapshot(prompt, final_answer, reasoning_summary)
-                if not summary:
-                    summary = build_session_summary(prompt, final_answer, reasoning_summary)
-                save_summary(session_id, summary)
-                if facts:
-                    save_facts(session_id, facts)
-                # Memory maintenance (only if persistence enabled)
-                retain_days = int(os.getenv("MEMORY_RETENTION_DAYS", "90"))
-                prune_messages(retain_days=retain_days)
-                if os.getenv("MEMORY_VACUUM", "0").lower() in {"1", "true", "yes"}:
-                    vacuum_db()
-        except Exception as e:
-            # Don't fail the whole process if memory save fails
-            print(f"\nWarning: Failed to save session to memory database: {e}")
+            Pipeline([_curator_stage(prompt, routes)]).run(run, ollama_completion, stream=stream)
+        except StageError as e:
+            record_run(_council_metrics(run, started, error=str(e)))
+            return {"error": str(e)}
+    else:
+        # When skipping Curator (after confirmation), show a message
+        if not stream:
+            print("Starting council – loading model (first run only, please wait)...")
+        run.outputs["Curator"] = _skipped_curator_output(prompt)
+    
+    # Same prefix for every agent below so Ollama can reuse its evaluated KV cache
+    run.prefix = shared_prefix(prompt, _load_memory_context(prompt))
+    try:
+        _council_pipeline(is_self_improve_mode, plan, routes).run(run, ollama_completion, stream=stream)
+    except StageError as e:
+        record_run(_council_metrics(run, started, plan, error=str(e)))
+        return {"error": str(e)}
+
+    result = _build_council_result(prompt, run.outputs, is_self_improve_mode, run)
+    if "error" in result:
+        record_run(_council_metrics(run, started, plan, error=result["error"]))
+        return result
+    result["prompt_cache"] = prefix_reuse_report(run.usage)
+    result["metrics"] = _council_metrics(run, started, plan)
+    record_run(result["metrics"])
+    token_budget.observe(result["metrics"])
+
+    # Save session to persistent memory database (only if persistence enabled)
+    if _should_persist(result):
+        _persist_session(result)
 
     return result
 
-async def run_council_async(prompt: str) -> dict:
-    loop = asyncio.get_running_loop()
-    with ThreadPoolExecutor() as pool:
-        return await loop.run_in_executor(pool, run_council_sync, prompt)
+@track_in_flight("council")
+async def astream_council(
+    prompt: str, previous_proposal: dict = None, skip_curator: bool = False, token: CancellationToken = None
+):
+    """
+    Run the council as an async event stream.
+
+    For each agent this yields {"type": "agent", "agent": name}, one
+    {"type": "content"} event per generated token and {"type": "agent_done"},
+    so callers can forward output while it is produced. The last event is
+    {"type": "result"} with the same dict run_council_sync returns (or an
+    {"error": ...} dict naming the failed stage). Persistence runs after the
+    result event, so keep iterating to the end for the session to be saved.
+    ``token`` bounds the run as in run_council_sync.
+    """
+    is_self_improve_mode = _is_self_improve_prompt(prompt)
+    if _is_approval_request(prompt, previous_proposal):
+        yield {"type": "result", "result": _execution_disabled_result(prompt)}
+        return
+
+    run = PipelineRun(token=token or CancellationToken.from_env())
+    plan = await asyncio.to_thread(_token_plan, is_self_improve_mode, skip_curator)
+    routes = _model_routes(skip_curator)
+    started = time.perf_counter()
+    try:
+        if not skip_curator:
+            async for event in Pipeline([_curator_stage(prompt, routes)]).astream(run, ollama_completion_async):
+                yield event
+        else:
+            run.outputs["Curator"] = _skipped_curator_output(prompt)
+
+        context = await asyncio.to_thread(_load_memory_context, prompt)
+        run.prefix = shared_prefix(prompt, context)
+        async for event in _council_pipeline(is_self_improve_mode, plan, routes).astream(run, ollama_completion_async):
+            yield event
+    except StageError as e:
+        await asyncio.to_thread(record_run, _council_metrics(run, started, plan, error=str(e)))
+        yield {"type": "result", "result": {"error": str(e)}}
+        return
+
+    result = _build_council_result(prompt, run.outputs, is_self_improve_mode, run)
+    if "error" in result:
+        await asyncio.to_thread(record_run, _council_metrics(run, started, plan, error=result["error"]))
+        yield {"type": "result", "result": result}
+        return
+    result["prompt_cache"] = prefix_reuse_report(run.usage)
+    result["metrics"] = _council_metrics(run, started, plan)
+    await asyncio.to_thread(record_run, result["metrics"])
+    token_budget.observe(result["metrics"])
+    yield {"type": "result", "result": result}
+    if _should_persist(result):
+        await _persist_session_async(result)
+
+async def run_council_async(
+    prompt: str, previous_proposal: dict = None, skip_curator: bool = False, token: CancellationToken = None
+) -> dict:
+    """
+    Coroutine version of run_council_sync (drains astream_council).
+
+    Every LLM call is awaited on the event loop through the async Ollama
+    client, and the short SQLite reads/writes run via asyncio.to_thread, so an
+    open deliberation does not pin an OS thread while the model generates.
+    """
+    result = {}
+    async for event in astream_council(prompt, previous_proposal, skip_curator, token):
+        if event["type"] == "result":
+            result = event["result"]
+    return result
@@ -0,0 +1,105 @@
+"""Compact binary encoding for stored embedding vectors.
+
+Vectors are stored as little-endian float32 BLOBs (4 bytes per dimension,
+vs ~13 bytes as JSON text) or, with ``MEMORY_EMBEDDING_DTYPE=int8``, as one
+signed byte per dimension plus a per-vector scale. Float32 BLOBs decode
+without copying (a read-only numpy view over the row's bytes).
+
+:class:`EmbeddingCache` keeps recently computed vectors in memory so the
+same text is not sent to the embedding model twice.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FLOAT32 = "float32"
+INT8 = "int8"
+DTYPES = (FLOAT32, INT8)
+
+_FLOAT32_LE = np.dtype("<f4")
+
+
+def storage_dtype() -> str:
+    dtype = os.getenv("MEMORY_EMBEDDING_DTYPE", FLOAT32).strip().lower()
+    return dtype if dtype in DTYPES else FLOAT32
+
+
+def encode(vector: Sequence[float], dtype: str = FLOAT32) -> Tuple[bytes, Optional[float]]:
+    """Return ``(blob, scale)``; ``scale`` is ``None`` for float32."""
+    values = np.asarray(vector, dtype=np.float32)
+    if values.ndim != 1:
+        raise ValueError("Embedding must be a flat sequence of numbers")
+    if dtype == INT8:
+        peak = float(np.abs(values).max()) if values.size else 0.0
+        scale = peak / 127 if peak else 1.0
+        quantized = np.clip(np.rint(values / scale), -127, 127).astype(np.int8)
+        return quantized.tobytes(), scale
+    return values.astype(_FLOAT32_LE, copy=False).tobytes(), None
+
+
+def decode(blob: bytes, dtype: str = FLOAT32, scale: Optional[float] = None) -> np.ndarray:
+    """Decode a stored vector; float32 returns a zero-copy view of ``blob``."""
+    if dtype == INT8:
+        factor = scale if scale is not None else 1.0
+        return np.frombuffer(blob, dtype=np.int8).astype(np.float32) * np.float32(factor)
+    return np.frombuffer(blob, dtype=_FLOAT32_LE)
+
+
+def cache_size() -> int:
+    return max(0, int(os.getenv("MEMORY_EMBED_CACHE_SIZE", "1024")))
+
+
+class EmbeddingCache:
+    """Thread-safe LRU of embedding vectors keyed by ``(model, sha256(text))``.
+
+    Hashing the text keeps long facts out of the key set. ``max_entries=0``
+    disables caching.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None) -> None:
+        self.max_entries = max_entries if max_entries is not None else cache_size()
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(model: str, text: str) -> Tuple[str, str]:
+        return model, hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: Sequence[str]) -> Dict[str, List[float]]:
+        """Return ``{text: vector}`` for the texts that are cached."""
+        found = {}
+        with self._lock:
+            for text in texts:
+                key = self.key(model, text)
+                vector = self._entries.get(key)
+                if vector is None:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                found[text] = vector
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            for text, vector in vectors.items():
+                key = self.key(model, text)
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
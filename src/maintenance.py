@@ -0,0 +1,151 @@
+"""Idle-time maintenance of the memory database.
+
+Retention pruning and space reclamation used to run after every session,
+with an optional full ``VACUUM`` that rewrites the whole file. Instead,
+:func:`run_maintenance` prunes old messages in small batches and returns
+free pages with ``PRAGMA incremental_vacuum``, stopping early when its time
+budget runs out or a deliberation starts. :class:`MaintenanceScheduler`
+runs it every ``MEMORY_MAINTENANCE_INTERVAL_S`` seconds, but only while no
+deliberation is in flight. Each pass's stats are stored in
+``maintenance_runs`` (see :func:`last_run`).
+
+New databases use ``auto_vacuum=INCREMENTAL``. Files created before that
+keep their mode; with ``MEMORY_VACUUM=1`` the first idle pass converts them
+with one full ``VACUUM``.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src import memory
+from src.telemetry import MAINTENANCE_LAST_RUN, MEMORY_DB_BYTES, deliberations_in_flight
+
+# Re-check for an idle moment this often while deliberations are running
+_BUSY_RETRY_S = 30.0
+
+
+def interval_seconds() -> float:
+    return float(os.getenv("MEMORY_MAINTENANCE_INTERVAL_S", "3600"))
+
+
+def budget_seconds() -> float:
+    return float(os.getenv("MEMORY_MAINTENANCE_BUDGET_S", "2"))
+
+
+def retain_days() -> int:
+    return int(os.getenv("MEMORY_RETENTION_DAYS", "90"))
+
+
+def prune_batch_size() -> int:
+    return max(1, int(os.getenv("MEMORY_PRUNE_BATCH", "500")))
+
+
+def vacuum_step_pages() -> int:
+    return max(1, int(os.getenv("MEMORY_VACUUM_PAGES", "256")))
+
+
+def convert_requested() -> bool:
+    return os.getenv("MEMORY_VACUUM", "0").lower() in {"1", "true", "yes"}
+
+
+def run_maintenance(
+    budget_s: Optional[float] = None, is_busy: Callable[[], bool] = lambda: deliberations_in_flight() > 0
+) -> Dict[str, Any]:
+    """Prune and reclaim space in bounded steps; returns (and records) the pass's stats.
+
+    ``complete`` is ``False`` when the pass stopped on its budget or because
+    ``is_busy()`` became true; the next pass picks up where it left off.
+    """
+    budget = budget_seconds() if budget_s is None else budget_s
+    started_at = time.time()
+    start = time.perf_counter()
+
+    def stop() -> bool:
+        return time.perf_counter() - start >= budget or is_busy()
+
+    pruned = 0
+    pages = 0
+    complete = False
+    while not stop():
+        batch = memory.prune_messages(retain_days(), batch_size=prune_batch_size(), max_batches=1)
+        pruned += batch
+        if batch < prune_batch_size():
+            break
+    if convert_requested() and not stop() and memory.database_stats().get("auto_vacuum") != "incremental":
+        # One full rewrite switches a pre-existing file to incremental auto-vacuum
+        memory.vacuum_db()
+    while not stop():
+        freed = memory.incremental_vacuum(vacuum_step_pages())
+        pages += freed
+        if freed < vacuum_step_pages():
+            complete = True
+            break
+
+    stats = {
+        "started_at": started_at,
+        "duration_s": round(time.perf_counter() - start, 4),
+        "messages_pruned": pruned,
+        "pages_freed": pages,
+        "complete": complete,
+    }
+    db = memory.database_stats()
+    stats.update(db_bytes=db.get("db_bytes", 0), free_bytes=db.get("free_bytes", 0))
+    memory.record_maintenance_run(stats)
+    MEMORY_DB_BYTES.set(stats["db_bytes"])
+    MAINTENANCE_LAST_RUN.set(time.time())
+    return stats
+
+
+def last_run() -> Optional[Dict[str, Any]]:
+    """Stats of the most recent pass (from any process), or ``None``."""
+    return memory.get_last_maintenance_run()
+
+
+def is_due(now: Optional[float] = None) -> bool:
+    previous = last_run()
+    if previous is None or not previous["complete"]:
+        return True
+    return (now or time.time()) - previous["started_at"] >= interval_seconds()
+
+
+def run_if_due() -> Optional[Dict[str, Any]]:
+    """Run a pass if the interval has elapsed since the last complete one."""
+    if not memory.ENABLE_PERSISTENCE or not is_due():
+        return None
+    return run_maintenance()
+
+
+class MaintenanceScheduler:
+    """Daemon thread running :func:`run_if_due` whenever no deliberation is in flight."""
+
+    def __init__(self, is_busy: Callable[[], bool] = lambda: deliberations_in_flight() > 0) -> None:
+        self.is_busy = is_busy
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def tick(self) -> Optional[Dict[str, Any]]:
+        """One scheduling decision; returns the pass's stats if one ran."""
+        if self.is_busy() or not is_due():
+            return None
+        return run_maintenance(is_busy=self.is_busy)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"\nWarning: memory maintenance failed: {e}")
+            self._stopping.wait(min(interval_seconds(), _BUSY_RETRY_S))
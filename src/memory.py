@@ -1,284 +1,362 @@
+import json
 import sqlite3
 import os
-import json
-import math
-import urllib.request
-import urllib.error
+import re
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
+import numpy as np
+
+from src import embeddings
+from src.migrations import migrate
+from src.ollama_client import OllamaError, get_client
+from src.read_cache import ReadCache
+from src.telemetry import time_sqlite
+from src.vector_index import ExactIndex, IVFIndex, default_nlist, nearest_centroids, train_centroids
+
 # Support configurable persistence via environment variables
 # COUNCIL_ENABLE_PERSISTENCE: Enable/disable SQLite persistence (default: False for v0.1)
 ENABLE_PERSISTENCE = os.getenv("COUNCIL_ENABLE_PERSISTENCE", "false").lower() in {"true", "1", "yes"}
 DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(__file__), ".."))
 DB_PATH = os.path.join(DATA_DIR, "council_memory.db")
 
+# Prepared statements kept per connection (sqlite3 reuses them by SQL text)
+STATEMENT_CACHE_SIZE = 128
+BUSY_TIMEOUT_MS = 5000
+
+_local = threading.local()
+
+_fact_index_lock = threading.Lock()
+_fact_index_state = {}
+# Trained IVF centroids by (DB_PATH, dimension); None when not trained
+_centroid_cache = {}
+_embedding_cache = embeddings.EmbeddingCache()
+# Preferences, latest summary and recent messages (see src/read_cache.py)
+_read_cache = ReadCache(enabled=os.getenv("MEMORY_READ_CACHE", "1").lower() not in {"0", "false", "no"})
+# Connection used only to read PRAGMA data_version, which moves on every
+# commit by any other connection (other processes and this process's threads)
+_watcher = {"path": None, "conn": None}
+_watcher_lock = threading.Lock()
+
+def _connect():
+    """Return this thread's long-lived connection to DB_PATH.
+
+    Connections use WAL so API readers never block the writer, and
+    synchronous=NORMAL so commits skip the per-transaction fsync (WAL stays
+    crash-safe; only the last commits can be lost on power failure). A
+    connection is reopened if DB_PATH changed or the file was deleted.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        if _local.path == DB_PATH and os.path.exists(DB_PATH):
+            return conn
+        # Closing checkpoints and removes the stale -wal/-shm files first
+        close_connection()
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000, cached_statements=STATEMENT_CACHE_SIZE)
+    # Only takes effect while the file is still empty, i.e. before the WAL switch
+    # writes its header; existing files keep their mode until vacuum_db()
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    _local.conn = conn
+    _local.path = DB_PATH
+    return conn
+
+def close_connection():
+    """Close the calling thread's connection, if it has one."""
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is not None:
+        conn.close()
+
+@contextmanager
+def _cursor():
+    """Cursor on the thread's connection; commits on success, rolls back on error."""
+    conn = _connect()
+    if not _read_cache.enabled:
+        with conn:
+            yield conn.cursor()
+        return
+    before = _data_version(conn)
+    _read_cache.sync(_external_version())
+    changes = conn.total_changes
+    with conn:
+        yield conn.cursor()
+    if conn.total_changes == changes:
+        return
+    # Our commit moved the external version; accept it unless another
+    # connection also committed while this transaction was open
+    after = _data_version(conn)
+    token = _external_version()
+    if after != before or _data_version(conn) != after:
+        _read_cache.invalidate()
+    _read_cache.absorb(token)
+
+def _data_version(conn):
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+def _external_version():
+    with _watcher_lock:
+        if _watcher["path"] != DB_PATH:
+            if _watcher["conn"] is not None:
+                _watcher["conn"].close()
+            _watcher["conn"] = sqlite3.connect(DB_PATH, check_same_thread=False)
+            _watcher["path"] = DB_PATH
+        return DB_PATH, _data_version(_watcher["conn"])
+
+def _cached(source, key, loader):
+    """Serve ``loader()`` from the read cache while nothing has written to the database."""
+    if _read_cache.enabled:
+        _read_cache.sync(_external_version())
+    return _read_cache.get(source, key, loader)
+
+def _timed(func):
+    """Record the operation's latency in /metrics while persistence is enabled."""
+    return time_sqlite(func.__name__, enabled=lambda: ENABLE_PERSISTENCE)(func)
+
+@_timed
 def init_db():
-    """Initialize the SQLite database with sessions and reflections tables (only if persistence enabled)"""
+    """Create or upgrade the memory schema (only if persistence enabled); see src/migrations.py"""
     if not ENABLE_PERSISTENCE:
         return
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS sessions
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  timestamp TEXT,
-                  prompt TEXT,
-                  final_answer TEXT,
-                  reasoning TEXT)''')
-    c.execute('''CREATE TABLE IF NOT EXISTS reflections
-                 (session_id INTEGER,
-                  insight TEXT,
-                  FOREIGN KEY(session_id) REFERENCES sessions(id))''')
-    c.execute('''CREATE TABLE IF NOT EXISTS messages
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  session_id INTEGER,
-                  timestamp TEXT,
-                  role TEXT,
-                  content TEXT,
-                  FOREIGN KEY(session_id) REFERENCES sessions(id))''')
-    c.execute('''CREATE TABLE IF NOT EXISTS summaries
-                 (session_id INTEGER,
-                  timestamp TEXT,
-                  summary TEXT,
-                  FOREIGN KEY(session_id) REFERENCES sessions(id))''')
-    c.execute('''CREATE TABLE IF NOT EXISTS facts
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  session_id INTEGER,
-                  timestamp TEXT,
-                  fact TEXT,
-                  FOREIGN KEY(session_id) REFERENCES sessions(id))''')
-    c.execute('''CREATE TABLE IF NOT EXISTS embeddings
-                 (fact_id INTEGER,
-                  vector TEXT,
-                  FOREIGN KEY(fact_id) REFERENCES facts(id))''')
-    c.execute('''CREATE TABLE IF NOT EXISTS fact_scores
-                 (fact_id INTEGER PRIMARY KEY,
-                  confidence REAL,
-                  updated_at TEXT,
-                  FOREIGN KEY(fact_id) REFERENCES facts(id))''')
-    c.execute('''CREATE TABLE IF NOT EXISTS preferences
-                 (key TEXT PRIMARY KEY,
-                  value TEXT,
-                  updated_at TEXT)''')
-    conn.commit()
-    conn.close()
+    migrate(_connect())
 
+@_timed
 def save_session(prompt, final_answer, reasoning):
     """Save a council session to the database (only if persistence enabled)"""
     if not ENABLE_PERSISTENCE:
         return None
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("INSERT INTO sessions (timestamp, prompt, final_answer, reasoning) VALUES (?, ?, ?, ?)",
-              (datetime.now().isoformat(), prompt, final_answer, reasoning))
-    session_id = c.lastrowid
-    # Example reflection
-    c.execute("INSERT INTO reflections (session_id, insight) VALUES (?, ?)",
-              (session_id, "Council demonstrated bold deliberation on self-evolution."))
-    conn.commit()
-    conn.close()
+    with _cursor() as c:
+        c.execute("INSERT INTO sessions (timestamp, prompt, final_answer, reasoning) VALUES (?, ?, ?, ?)",
+                  (datetime.now().isoformat(), prompt, final_answer, reasoning))
+        session_id = c.lastrowid
+        # Example reflection
+        c.execute("INSERT INTO reflections (session_id, insight) VALUES (?, ?)",
+                  (session_id, "Council demonstrated bold deliberation on self-evolution."))
     return session_id
 
+@_timed
 def get_recent_sessions(n=5):
     """Retrieve the most recent N sessions from the database (returns empty list if persistence disabled)"""
     if not ENABLE_PERSISTENCE:
         return []
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT * FROM sessions ORDER BY id DESC LIMIT ?", (n,))
-    rows = c.fetchall()
-    conn.close()
+    with _cursor() as c:
+        c.execute("SELECT * FROM sessions ORDER BY id DESC LIMIT ?", (n,))
+        rows = c.fetchall()
     return rows
 
+@_timed
 def add_message(role, content, session_id=None):
     """Persist a conversation message."""
     if not ENABLE_PERSISTENCE:
         return None
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO messages (session_id, timestamp, role, content) VALUES (?, ?, ?, ?)",
-        (session_id, datetime.now().isoformat(), role, content)
-    )
-    conn.commit()
-    conn.close()
+    with _cursor() as c:
+        c.execute(
+            "INSERT INTO messages (session_id, timestamp, role, content) VALUES (?, ?, ?, ?)",
+            (session_id, datetime.now().isoformat(), role, content)
+        )
+        message = (c.lastrowid, role, content)
+    # Write through: cached windows gain the new message instead of being reloaded
+    _read_cache.update("messages", lambda n, rows: _merge_message(rows, message, n))
+
+def _merge_message(rows, message, n):
+    # A load that raced with the insert may already hold the message, so
+    # merge by id instead of appending
+    if n <= 0:
+        return rows
+    merged = {row[0]: row for row in rows}
+    merged[message[0]] = message
+    return tuple(merged[key] for key in sorted(merged))[-n:]
 
 def get_recent_messages(n=6):
     """Retrieve the most recent N messages for context."""
     if not ENABLE_PERSISTENCE:
         return []
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "SELECT role, content FROM messages ORDER BY id DESC LIMIT ?",
-        (n,)
-    )
-    rows = c.fetchall()
-    conn.close()
-    # Return in chronological order
-    return [{"role": r[0], "content": r[1]} for r in reversed(rows)]
+    rows = _cached("messages", n, lambda: _load_recent_messages(n))
+    return [{"role": role, "content": content} for _, role, content in rows]
 
+@_timed
+def _load_recent_messages(n):
+    with _cursor() as c:
+        c.execute(
+            "SELECT id, role, content FROM messages ORDER BY id DESC LIMIT ?",
+            (n,)
+        )
+        rows = c.fetchall()
+    # Chronological order
+    return tuple(reversed(rows))
+
+@_timed
 def save_summary(session_id, summary):
     """Save a compact summary for a session."""
     if not ENABLE_PERSISTENCE:
         return
     if not session_id or not summary:
         return
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO summaries (session_id, timestamp, summary) VALUES (?, ?, ?)",
-        (session_id, datetime.now().isoformat(), summary)
-    )
-    conn.commit()
-    conn.close()
+    with _cursor() as c:
+        c.execute(
+            "INSERT INTO summaries (session_id, timestamp, summary) VALUES (?, ?, ?)",
+            (session_id, datetime.now().isoformat(), summary)
+        )
+    _read_cache.invalidate("summary")
 
 def get_latest_summary():
     """Get the latest session summary, if available."""
     if not ENABLE_PERSISTENCE:
         return ""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "SELECT summary FROM summaries ORDER BY rowid DESC LIMIT 1"
-    )
-    row = c.fetchone()
-    conn.close()
+    return _cached("summary", None, _load_latest_summary)
+
+@_timed
+def _load_latest_summary():
+    with _cursor() as c:
+        c.execute(
+            "SELECT summary FROM summaries ORDER BY rowid DESC LIMIT 1"
+        )
+        row = c.fetchone()
     return row[0] if row else ""
 
+@_timed
 def save_facts(session_id, facts):
     """Save extracted facts for a session."""
     if not ENABLE_PERSISTENCE:
         return
     if not session_id or not facts:
         return
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    for fact in facts:
-        cleaned = fact.strip()
-        if cleaned:
+    cleaned_facts = [fact.strip() for fact in facts if fact.strip()]
+    # Embed before taking the write lock so it is not held across network I/O
+    vectors = _get_embeddings(cleaned_facts)
+    with _cursor() as c:
+        for cleaned, embedding in zip(cleaned_facts, vectors):
             c.execute(
                 "INSERT INTO facts (session_id, timestamp, fact) VALUES (?, ?, ?)",
                 (session_id, datetime.now().isoformat(), cleaned)
             )
             fact_id = c.lastrowid
-            embedding = _get_embedding(cleaned)
             if embedding:
+                dtype = embeddings.storage_dtype()
+                blob, scale = embeddings.encode(embedding, dtype)
                 c.execute(
-                    "INSERT INTO embeddings (fact_id, vector) VALUES (?, ?)",
-                    (fact_id, json.dumps(embedding))
+                    "INSERT INTO embeddings (fact_id, vector, dtype, scale, list_id) VALUES (?, ?, ?, ?, ?)",
+                    (fact_id, blob, dtype, scale, _fact_bucket(c, embedding))
                 )
             c.execute(
                 "INSERT INTO fact_scores (fact_id, confidence, updated_at) VALUES (?, ?, ?)",
                 (fact_id, 0.7, datetime.now().isoformat())
             )
-    conn.commit()
-    conn.close()
 
+@_timed
 def get_recent_facts(n=20):
     """Retrieve the most recent N facts."""
     if not ENABLE_PERSISTENCE:
         return []
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "SELECT fact FROM facts ORDER BY id DESC LIMIT ?",
-        (n,)
-    )
-    rows = c.fetchall()
-    conn.close()
+    with _cursor() as c:
+        c.execute(
+            "SELECT fact FROM facts ORDER BY id DESC LIMIT ?",
+            (n,)
+        )
+        rows = c.fetchall()
     return [r[0] for r in rows]
 
+@_timed
 def get_recent_fact_rows(n=200):
     """Retrieve recent fact rows with ids."""
     if not ENABLE_PERSISTENCE:
         return []
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "SELECT id, fact FROM facts ORDER BY id DESC LIMIT ?",
-        (n,)
-    )
-    rows = c.fetchall()
-    conn.close()
+    with _cursor() as c:
+        c.execute(
+            "SELECT id, fact FROM facts ORDER BY id DESC LIMIT ?",
+            (n,)
+        )
+        rows = c.fetchall()
     return rows
 
+@_timed
 def get_recent_fact_embeddings(n=200):
     """Retrieve recent fact embeddings with scores."""
     if not ENABLE_PERSISTENCE:
         return []
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "SELECT f.id, f.fact, e.vector, s.confidence "
-        "FROM facts f "
-        "JOIN embeddings e ON e.fact_id = f.id "
-        "LEFT JOIN fact_scores s ON s.fact_id = f.id "
-        "ORDER BY f.id DESC LIMIT ?",
-        (n,)
-    )
-    rows = c.fetchall()
-    conn.close()
+    with _cursor() as c:
+        c.execute(
+            "SELECT f.id, f.fact, e.vector, e.dtype, e.scale, s.confidence "
+            "FROM facts f "
+            "JOIN embeddings e ON e.fact_id = f.id "
+            "LEFT JOIN fact_scores s ON s.fact_id = f.id "
+            "ORDER BY f.id DESC LIMIT ?",
+            (n,)
+        )
+        rows = c.fetchall()
     result = []
-    for fact_id, fact, vec, confidence in rows:
+    for fact_id, fact, blob, dtype, scale, confidence in rows:
         try:
-            result.append((fact_id, fact, json.loads(vec), confidence or 0.7))
+            result.append((fact_id, fact, embeddings.decode(blob, dtype, scale), confidence or 0.7))
         except Exception:
             continue
     return result
 
 def get_relevant_facts(query, limit=5):
-    """Retrieve facts by embeddings (optional) or keyword overlap scoring."""
+    """Retrieve facts by embeddings (optional), BM25 keyword search, or both fused."""
     if not ENABLE_PERSISTENCE:
         return []
     if not query:
         return []
+    vector_ids = []
     if _use_embeddings():
         embedding = _get_embedding(query)
         if embedding:
-            facts = get_recent_fact_embeddings(200)
-            scored = []
-            for idx, (fact_id, fact, vec, confidence) in enumerate(facts):
-                sim = _cosine_similarity(embedding, vec)
-                if sim is None:
-                    continue
-                recency_boost = 1.0 + (1.0 / (idx + 2))
-                score = sim * recency_boost * (confidence or 0.7)
-                if score is not None:
-                    scored.append((score, fact))
-            scored.sort(key=lambda x: x[0], reverse=True)
-            return [f for _, f in scored[:limit]]
-
-    terms = {t.lower() for t in query.split() if len(t) > 2}
-    if not terms:
+            if not _use_hybrid():
+                return _fact_texts(_vector_fact_ids(embedding, limit))
+            vector_ids = _vector_fact_ids(embedding, _fusion_depth(limit))
+    if not vector_ids:
+        return _fact_texts(_keyword_fact_ids(query, limit))
+    fused = reciprocal_rank_fusion([vector_ids, _keyword_fact_ids(query, _fusion_depth(limit))])
+    return _fact_texts(fused[:limit])
+
+@_timed
+def search_memory(query, limit=5, sources=("facts", "summaries", "messages")):
+    """Full-text search over stored history; returns ``[(source, text)]``, best BM25 match first."""
+    if not ENABLE_PERSISTENCE:
+        return []
+    match = _fts_query(query)
+    if not match:
         return []
-    fact_rows = get_recent_fact_rows(200)
-    score_map = _get_fact_scores([row[0] for row in fact_rows])
-    scored = []
-    for idx, (fact_id, fact) in enumerate(fact_rows):
-        words = {w.lower() for w in fact.split() if len(w) > 2}
-        score = len(terms & words)
-        if score > 0:
-            recency_boost = 1.0 + (1.0 / (idx + 2))
-            confidence = score_map.get(fact_id, 0.7)
-            scored.append((score * recency_boost * confidence, fact))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [f for _, f in scored[:limit]]
+    ranked = []
+    with _cursor() as c:
+        for source in sources:
+            column = _FTS_COLUMNS[source]
+            c.execute(
+                f"SELECT bm25({source}_fts), {column} FROM {source}_fts "
+                f"WHERE {source}_fts MATCH ? ORDER BY rank LIMIT ?",
+                (match, limit)
+            )
+            ranked.extend((score, source, text) for score, text in c.fetchall())
+    ranked.sort(key=lambda row: row[0])
+    return [(source, text) for _, source, text in ranked[:limit]]
 
+def reciprocal_rank_fusion(rankings, k=60):
+    """Merge ranked id lists by summed ``1 / (k + rank)``; ids in several lists rise to the top."""
+    scores = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda item: scores[item], reverse=True)
+
+@_timed
 def set_preference(key, value):
     """Set a persistent preference value."""
     if not ENABLE_PERSISTENCE:
         return
     if not key:
         return
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO preferences (key, value, updated_at) VALUES (?, ?, ?) "
-        "ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at",
-        (key, value, datetime.now().isoformat())
-    )
-    conn.commit()
-    conn.close()
+    with _cursor() as c:
+        c.execute(
+            "INSERT INTO preferences (key, value, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at",
+            (key, value, datetime.now().isoformat())
+        )
+    _read_cache.invalidate("preferences")
 
 def get_preference(key):
     """Get a preference value by key."""
@@ -286,108 +364,411 @@ def get_preference(key):
         return ""
     if not key:
         return ""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT value FROM preferences WHERE key = ?", (key,))
-    row = c.fetchone()
-    conn.close()
-    return row[0] if row else ""
+    return get_all_preferences().get(key, "")
 
 def get_all_preferences():
     """Get all preferences as a dict."""
     if not ENABLE_PERSISTENCE:
         return {}
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT key, value FROM preferences ORDER BY key ASC")
-    rows = c.fetchall()
-    conn.close()
+    # Copied so callers cannot modify the cached mapping
+    return dict(_cached("preferences", None, _load_preferences))
+
+@_timed
+def _load_preferences():
+    with _cursor() as c:
+        c.execute("SELECT key, value FROM preferences ORDER BY key ASC")
+        rows = c.fetchall()
     return {k: v for k, v in rows}
 
-def prune_messages(retain_days=90):
-    """Delete old message rows to keep memory compact."""
+@_timed
+def prune_messages(retain_days=90, batch_size=500, max_batches=None):
+    """Delete messages older than ``retain_days``, keeping the newest 20; returns rows deleted.
+
+    Rows go in batches of ``batch_size``, each in its own short write
+    transaction, so readers and writers are never held up for long. Stops
+    after ``max_batches`` batches if given.
+    """
     if not ENABLE_PERSISTENCE:
-        return
+        return 0
     try:
         cutoff = datetime.now().timestamp() - (retain_days * 86400)
         cutoff_iso = datetime.fromtimestamp(cutoff).isoformat()
     except Exception:
+        return 0
+    with _cursor() as c:
+        c.execute("SELECT id FROM messages ORDER BY id DESC LIMIT 1 OFFSET 19")
+        row = c.fetchone()
+    if row is None:
+        return 0
+    oldest_kept = row[0]
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with _cursor() as c:
+            c.execute(
+                "DELETE FROM messages WHERE id IN "
+                "(SELECT id FROM messages WHERE timestamp < ? AND id < ? ORDER BY id LIMIT ?)",
+                (cutoff_iso, oldest_kept, batch_size)
+            )
+            count = c.rowcount
+        deleted += count
+        batches += 1
+        if count < batch_size:
+            break
+    if deleted:
+        _read_cache.invalidate("messages")
+    return deleted
+
+@_timed
+def incremental_vacuum(max_pages=256):
+    """Return up to ``max_pages`` free pages to the filesystem; returns the number released.
+
+    Only has an effect once the database uses ``auto_vacuum=INCREMENTAL``
+    (new databases do; older ones are converted by one :func:`vacuum_db`).
+    """
+    if not ENABLE_PERSISTENCE:
+        return 0
+    conn = _connect()
+    before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    # The pragma frees one page per step; execute() stops after the first
+    # step of a statement without result columns, executescript() does not
+    conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)})")
+    return before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+def database_stats():
+    """Size and free-page figures for the memory database."""
+    if not ENABLE_PERSISTENCE:
+        return {}
+    conn = _connect()
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return {
+        "db_bytes": page_size * page_count,
+        "free_bytes": page_size * freelist_count,
+        "freelist_pages": freelist_count,
+        "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}[conn.execute("PRAGMA auto_vacuum").fetchone()[0]],
+    }
+
+@_timed
+def record_maintenance_run(stats):
+    """Store a maintenance pass's stats, keeping the last 100."""
+    if not ENABLE_PERSISTENCE:
         return
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT id FROM messages ORDER BY id DESC LIMIT 20")
-    keep_ids = {row[0] for row in c.fetchall()}
-    if keep_ids:
-        placeholders = ",".join("?" for _ in keep_ids)
+    with _cursor() as c:
         c.execute(
-            f"DELETE FROM messages WHERE timestamp < ? AND id NOT IN ({placeholders})",
-            (cutoff_iso, *keep_ids)
+            "INSERT INTO maintenance_runs (started_at, duration_s, messages_pruned, pages_freed, "
+            "db_bytes, free_bytes, complete) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (stats["started_at"], stats["duration_s"], stats["messages_pruned"], stats["pages_freed"],
+             stats["db_bytes"], stats["free_bytes"], int(stats["complete"]))
         )
-    else:
-        c.execute("DELETE FROM messages WHERE timestamp < ?", (cutoff_iso,))
-    conn.commit()
-    conn.close()
+        c.execute("DELETE FROM maintenance_runs WHERE id <= ?", (c.lastrowid - 100,))
 
+@_timed
+def get_last_maintenance_run():
+    if not ENABLE_PERSISTENCE:
+        return None
+    with _cursor() as c:
+        c.execute(
+            "SELECT started_at, duration_s, messages_pruned, pages_freed, db_bytes, free_bytes, complete "
+            "FROM maintenance_runs ORDER BY id DESC LIMIT 1"
+        )
+        row = c.fetchone()
+    if row is None:
+        return None
+    keys = ("started_at", "duration_s", "messages_pruned", "pages_freed", "db_bytes", "free_bytes", "complete")
+    stats = dict(zip(keys, row))
+    stats["complete"] = bool(stats["complete"])
+    return stats
+
+@_timed
 def vacuum_db():
-    """Run SQLite VACUUM to reclaim space."""
+    """Rewrite the whole database with VACUUM (slow; also switches old files to incremental auto-vacuum)."""
+    if not ENABLE_PERSISTENCE:
+        return
+    with _cursor() as c:
+        c.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        c.execute("VACUUM")
+
+@_timed
+def enqueue_memory_job(kind, payload):
+    """Append a job for the background memory worker; returns its id."""
+    if not ENABLE_PERSISTENCE:
+        return None
+    with _cursor() as c:
+        c.execute(
+            "INSERT INTO memory_jobs (kind, payload, created_at) VALUES (?, ?, ?)",
+            (kind, json.dumps(payload), datetime.now().isoformat())
+        )
+        return c.lastrowid
+
+@_timed
+def claim_memory_job(lease_seconds=600, skip_kinds=()):
+    """Claim the oldest runnable job as ``(id, kind, payload, attempts)``, or ``None``.
+
+    Jobs left ``running`` by a worker that died are runnable again once
+    their lease has expired, so a crash loses no work. Jobs of
+    ``skip_kinds`` stay queued.
+    """
+    if not ENABLE_PERSISTENCE:
+        return None
+    now = time.time()
+    skip = ", ".join("?" * len(skip_kinds))
+    with _cursor() as c:
+        c.execute(
+            "SELECT id, kind, payload, attempts FROM memory_jobs "
+            "WHERE (status = 'pending' OR (status = 'running' AND claimed_at < ?)) "
+            f"AND kind NOT IN ({skip}) "
+            "ORDER BY id LIMIT 1",
+            (now - lease_seconds, *skip_kinds)
+        )
+        row = c.fetchone()
+        if row is None:
+            return None
+        job_id, kind, payload, attempts = row
+        # Re-check the status so two workers cannot claim the same job
+        c.execute(
+            "UPDATE memory_jobs SET status = 'running', claimed_at = ?, attempts = attempts + 1 "
+            "WHERE id = ? AND (status = 'pending' OR claimed_at < ?)",
+            (now, job_id, now - lease_seconds)
+        )
+        if c.rowcount != 1:
+            return None
+    return job_id, kind, json.loads(payload), attempts + 1
+
+@_timed
+def finish_memory_job(job_id, error=None, retry=False):
+    """Delete a completed job; on ``error``, requeue it (``retry``) or mark it failed."""
     if not ENABLE_PERSISTENCE:
         return
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("VACUUM")
-    conn.commit()
-    conn.close()
+    with _cursor() as c:
+        if error is None:
+            c.execute("DELETE FROM memory_jobs WHERE id = ?", (job_id,))
+        else:
+            c.execute(
+                "UPDATE memory_jobs SET status = ?, claimed_at = NULL, error = ? WHERE id = ?",
+                ("pending" if retry else "failed", str(error), job_id)
+            )
+
+@_timed
+def count_memory_jobs(status="pending"):
+    if not ENABLE_PERSISTENCE:
+        return 0
+    with _cursor() as c:
+        c.execute("SELECT COUNT(*) FROM memory_jobs WHERE status = ?", (status,))
+        return c.fetchone()[0]
 
 def _use_embeddings():
     if not ENABLE_PERSISTENCE:
         return False
     return os.getenv("MEMORY_USE_EMBEDDINGS", "0").lower() in {"1", "true", "yes"}
 
+def _embed_model():
+    return os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+
 def _get_embedding(text):
-    if not text or not _use_embeddings():
-        return None
-    host = os.getenv("OLLAMA_HOST", "http://localhost:11434").rstrip("/")
-    model = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
-    payload = json.dumps({"model": model, "prompt": text}).encode("utf-8")
-    req = urllib.request.Request(
-        f"{host}/api/embeddings",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST"
-    )
+    return _get_embeddings([text])[0]
+
+def _get_embeddings(texts):
+    if not _use_embeddings():
+        return [None] * len(texts)
+    return cached_embeddings(texts)
+
+def cached_embeddings(texts):
+    """Embedding per text (``None`` where unavailable), served from the LRU cache when possible."""
+    model = _embed_model()
+    found = _embedding_cache.get_many(model, [text for text in texts if text])
+    missing = list(dict.fromkeys(text for text in texts if text and text not in found))
+    if missing:
+        computed = {text: vector for text, vector in zip(missing, _embed_texts(missing, model)) if vector}
+        _embedding_cache.put_many(model, computed)
+        found.update(computed)
+    return [found.get(text) for text in texts]
+
+def _embed_texts(texts, model):
+    # One /api/embed request for the whole batch
     try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-            return data.get("embedding")
-    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError):
-        return None
+        return get_client().embed_batch(texts, model=model, timeout=10 + len(texts))
+    except OllamaError:
+        return [None] * len(texts)
 
-def _cosine_similarity(a, b):
-    if not a or not b or len(a) != len(b):
-        return None
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(x * x for x in b))
-    if norm_a == 0 or norm_b == 0:
-        return None
-    return dot / (norm_a * norm_b)
+def _refresh_fact_index(train=True):
+    """Return {dimension: (index, recency weights)} over every stored fact embedding.
 
-def _get_fact_scores(fact_ids):
-    if not ENABLE_PERSISTENCE:
-        return {}
+    Built on first use and extended with embeddings saved since the last
+    call, so a query only decodes new rows. Rebuilt if DB_PATH changes or the
+    embeddings table shrinks. A dimension with trained centroids loads as an
+    IVFIndex; with ``train`` an exact index that reaches MEMORY_ANN_MIN_FACTS
+    is converted. Callers hold _fact_index_lock.
+    """
+    state = _fact_index_state
+    with _cursor() as c:
+        c.execute("SELECT MAX(rowid) FROM embeddings")
+        last_rowid = c.fetchone()[0] or 0
+        if state.get("path") != DB_PATH or last_rowid < state["last_rowid"]:
+            state.clear()
+            state.update(path=DB_PATH, last_rowid=0, indexes={})
+        if last_rowid == state["last_rowid"]:
+            return state["indexes"]
+        c.execute(
+            "SELECT e.fact_id, e.vector, e.dtype, e.scale, e.list_id, s.confidence "
+            "FROM embeddings e "
+            "LEFT JOIN fact_scores s ON s.fact_id = e.fact_id "
+            "WHERE e.rowid > ? ORDER BY e.rowid",
+            (state["last_rowid"],)
+        )
+        rows = c.fetchall()
+    by_dim = {}
+    for fact_id, blob, dtype, scale, list_id, confidence in rows:
+        try:
+            vector = embeddings.decode(blob, dtype, scale)
+        except (TypeError, ValueError):
+            continue
+        by_dim.setdefault(vector.size, []).append((fact_id, vector, confidence or 0.7, list_id))
+    indexes = state["indexes"]
+    for dim, dim_rows in by_dim.items():
+        fact_ids, vectors, weights, lists = zip(*dim_rows)
+        if dim in indexes:
+            index = indexes[dim][0]
+        else:
+            centroids = _stored_centroids(dim) if _use_ann() else None
+            index = ExactIndex(dim) if centroids is None else IVFIndex(dim, centroids)
+        if isinstance(index, IVFIndex):
+            index.add(fact_ids, vectors, weights, lists)
+        else:
+            index.add(fact_ids, vectors, weights)
+            if train and _use_ann() and len(index) >= _ann_min_facts():
+                index = _train_fact_ivf(index)
+        # Same boost as before: 1 + 1/(rank + 2), rank 0 = newest fact
+        rank = np.empty(len(index), dtype=np.float32)
+        rank[np.argsort(-index.ids, kind="stable")] = np.arange(len(index), dtype=np.float32)
+        indexes[dim] = (index, 1.0 + 1.0 / (rank + 2.0))
+    state["last_rowid"] = last_rowid
+    return indexes
+
+def _vector_fact_ids(embedding, limit):
+    """Top fact ids by cosine similarity x recency boost x confidence, over all stored facts."""
+    with _fact_index_lock:
+        entry = _refresh_fact_index().get(len(embedding))
+        if entry is None:
+            return []
+        index, recency = entry
+        if isinstance(index, IVFIndex) and _use_ann():
+            index.nprobe = _ann_nprobe()
+            fact_ids, _ = index.search(embedding, limit, weights=recency)
+        else:
+            fact_ids, _ = ExactIndex.search(index, embedding, limit, weights=recency)
+    return fact_ids.tolist()
+
+@_timed
+def _keyword_fact_ids(query, limit):
+    """Top fact ids by BM25 x confidence, newest first among ties."""
+    match = _fts_query(query)
+    if not match:
+        return []
+    with _cursor() as c:
+        c.execute(
+            "SELECT f.rowid FROM facts_fts f "
+            "LEFT JOIN fact_scores s ON s.fact_id = f.rowid "
+            "WHERE facts_fts MATCH ? "
+            "ORDER BY bm25(facts_fts) * COALESCE(s.confidence, 0.7), f.rowid DESC LIMIT ?",
+            (match, limit)
+        )
+        return [row[0] for row in c.fetchall()]
+
+def _fact_texts(fact_ids):
     if not fact_ids:
-        return {}
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+        return []
     placeholders = ",".join("?" for _ in fact_ids)
-    c.execute(
-        f"SELECT fact_id, confidence FROM fact_scores WHERE fact_id IN ({placeholders})",
-        tuple(fact_ids)
-    )
-    rows = c.fetchall()
-    conn.close()
-    return {fact_id: (confidence if confidence is not None else 0.7) for fact_id, confidence in rows}
+    with _cursor() as c:
+        c.execute(f"SELECT id, fact FROM facts WHERE id IN ({placeholders})", tuple(fact_ids))
+        texts = dict(c.fetchall())
+    return [texts[fact_id] for fact_id in fact_ids if fact_id in texts]
+
+_FTS_COLUMNS = {"facts": "fact", "summaries": "summary", "messages": "content"}
+_FTS_TERM = re.compile(r"\w+")
+
+def _fts_query(text):
+    # Any query word longer than two characters; quoted so FTS5 syntax in user text is inert
+    terms = dict.fromkeys(t.lower() for t in _FTS_TERM.findall(text or "") if len(t) > 2)
+    return " OR ".join(f'"{term}"' for term in terms)
+
+def _use_hybrid():
+    return os.getenv("MEMORY_HYBRID_SEARCH", "0").lower() in {"1", "true", "yes"}
+
+def _fusion_depth(limit):
+    # Candidates taken from each ranker before fusion
+    return max(4 * limit, 20)
+
+def rebuild_fact_index(nlist=None):
+    """Retrain the IVF centroids for every embedding dimension and re-bucket all facts.
+
+    Use after bulk imports, when the fact distribution has drifted, or to
+    build an IVF index below MEMORY_ANN_MIN_FACTS. Returns {dimension: nlist}.
+    """
+    if not ENABLE_PERSISTENCE:
+        return {}
+    with _fact_index_lock:
+        _fact_index_state.clear()
+        indexes = _refresh_fact_index(train=False)
+        built = {}
+        for dim, (index, recency) in indexes.items():
+            if len(index):
+                index = _train_fact_ivf(index, nlist)
+                indexes[dim] = (index, recency)
+                built[dim] = index.nlist
+    return built
+
+def _use_ann():
+    return os.getenv("MEMORY_ANN", "auto").strip().lower() != "off"
+
+def _ann_min_facts():
+    return int(os.getenv("MEMORY_ANN_MIN_FACTS", "50000"))
+
+def _ann_nprobe():
+    return max(1, int(os.getenv("MEMORY_ANN_NPROBE", "16")))
+
+def _stored_centroids(dim):
+    if (DB_PATH, dim) not in _centroid_cache:
+        with _cursor() as c:
+            c.execute("SELECT centroid FROM fact_index_centroids WHERE dim = ? ORDER BY list_id", (dim,))
+            rows = c.fetchall()
+        _centroid_cache[(DB_PATH, dim)] = np.stack([embeddings.decode(row[0]) for row in rows]) if rows else None
+    return _centroid_cache[(DB_PATH, dim)]
+
+def _fact_bucket(c, embedding):
+    """IVF bucket for a newly saved vector, if its dimension has trained centroids."""
+    if not _use_ann():
+        return None
+    centroids = _centroid_cache.get((DB_PATH, len(embedding)))
+    if centroids is None:
+        c.execute("SELECT COUNT(*) FROM fact_index_centroids WHERE dim = ?", (len(embedding),))
+        if not c.fetchone()[0]:
+            return None
+        centroids = _stored_centroids(len(embedding))
+    return int(nearest_centroids(embedding, centroids)[0])
+
+def _train_fact_ivf(index, nlist=None):
+    """Train centroids over ``index`` and persist them with every row's bucket; returns an IVFIndex."""
+    nlist = nlist or int(os.getenv("MEMORY_ANN_NLIST", "0")) or default_nlist(len(index))
+    centroids = train_centroids(index.matrix, nlist)
+    lists = nearest_centroids(index.matrix, centroids)
+    ivf = IVFIndex(index.dim, centroids, _ann_nprobe())
+    ivf.add(index.ids, index.matrix, index.weights, lists.tolist())
+    with _cursor() as c:
+        c.execute("DELETE FROM fact_index_centroids WHERE dim = ?", (index.dim,))
+        c.executemany(
+            "INSERT INTO fact_index_centroids (dim, list_id, centroid) VALUES (?, ?, ?)",
+            ((index.dim, list_id, embeddings.encode(centroid)[0]) for list_id, centroid in enumerate(centroids))
+        )
+        c.executemany(
+            "UPDATE embeddings SET list_id = ? WHERE fact_id = ?",
+            zip(lists.tolist(), index.ids.tolist())
+        )
+    _centroid_cache[(DB_PATH, index.dim)] = centroids
+    return ivf
 
+@_timed
 def build_session_summary(prompt, final_answer, reasoning, max_chars=1200):
     """Create a compact, durable summary for long-term memory."""
     parts = []
@@ -0,0 +1,181 @@
+"""Background worker for memory writes that do not need to block a response.
+
+After a council run only the session row and its two messages are written
+inline. The memory snapshot (an extra LLM call), fact extraction and
+embedding are queued as jobs in the ``memory_jobs`` table and run one at a
+time on a daemon thread. Jobs registered with ``uses_llm=True`` are held
+back while a deliberation is in flight, so their generation never competes
+with one the API admitted (``COUNCIL_MAX_DELIBERATIONS``); other jobs keep
+running.
+
+The queue is durable: a job is deleted only after its handler returns, and
+a job left ``running`` by a process that died is picked up again once its
+lease (``MEMORY_JOB_LEASE_S``) expires. Failing jobs are retried up to
+``MEMORY_JOB_MAX_ATTEMPTS`` times and then kept with status ``failed``.
+
+Back-pressure: once ``MEMORY_QUEUE_MAX`` jobs are pending, :func:`submit`
+runs the job in the caller's thread instead of queueing it, so a worker
+that cannot keep up slows producers down rather than growing the backlog
+without bound. ``MEMORY_WORKER=0`` runs every job inline.
+"""
+import atexit
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Set
+
+from src import memory
+from src.telemetry import MEMORY_JOBS_PENDING, deliberations_in_flight
+
+Handler = Callable[[Dict[str, Any]], None]
+
+_handlers: Dict[str, Handler] = {}
+# Kinds whose handler makes an LLM call
+_llm_kinds: Set[str] = set()
+
+
+def register(kind: str, handler: Handler, uses_llm: bool = False) -> None:
+    """Route jobs of ``kind`` to ``handler(payload)``."""
+    _handlers[kind] = handler
+    if uses_llm:
+        _llm_kinds.add(kind)
+    else:
+        _llm_kinds.discard(kind)
+
+
+def worker_enabled() -> bool:
+    return os.getenv("MEMORY_WORKER", "1").lower() not in {"0", "false", "no"}
+
+
+def queue_max() -> int:
+    return max(0, int(os.getenv("MEMORY_QUEUE_MAX", "100")))
+
+
+def lease_seconds() -> float:
+    return float(os.getenv("MEMORY_JOB_LEASE_S", "600"))
+
+
+def max_attempts() -> int:
+    return max(1, int(os.getenv("MEMORY_JOB_MAX_ATTEMPTS", "3")))
+
+
+class MemoryWorker:
+    """Single daemon thread draining ``memory_jobs`` in insertion order."""
+
+    def __init__(
+        self, poll_interval: float = 5.0, is_busy: Callable[[], bool] = lambda: deliberations_in_flight() > 0
+    ) -> None:
+        self.poll_interval = poll_interval
+        self.is_busy = is_busy
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._idle = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="memory-worker", daemon=True)
+            self._thread.start()
+
+    def notify(self) -> None:
+        self._idle.clear()
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after the current job; queued jobs stay in the table for the next start."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Block until the queue is empty (``False`` on timeout)."""
+        self.notify()
+        return self._idle.wait(timeout)
+
+    def run_pending(self) -> int:
+        """Run runnable jobs in the calling thread until none are left; returns how many ran.
+
+        LLM jobs are left queued while :attr:`is_busy`; the next poll retries them.
+        """
+        ran = 0
+        while not self._stopping.is_set():
+            deferred = tuple(sorted(_llm_kinds)) if self.is_busy() else ()
+            job = memory.claim_memory_job(lease_seconds(), skip_kinds=deferred)
+            if job is None:
+                break
+            run_job(*job)
+            ran += 1
+        MEMORY_JOBS_PENDING.set(memory.count_memory_jobs())
+        return ran
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                self.run_pending()
+            except Exception as e:
+                # Keep the thread alive if the database is briefly unavailable
+                print(f"\nWarning: memory worker error: {e}")
+            if not self._wake.is_set():
+                # Nothing was submitted while this pass ran
+                self._idle.set()
+            self._wake.wait(self.poll_interval)
+
+
+def run_job(job_id: int, kind: str, payload: Dict[str, Any], attempts: int) -> None:
+    """Run one claimed job and record the outcome."""
+    handler = _handlers.get(kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for memory job kind {kind!r}")
+        handler(payload)
+    except Exception as e:
+        memory.finish_memory_job(job_id, error=e, retry=handler is not None and attempts < max_attempts())
+        print(f"\nWarning: memory job {job_id} ({kind}) failed: {e}")
+        return
+    memory.finish_memory_job(job_id)
+
+
+_worker: Optional[MemoryWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> MemoryWorker:
+    """Return the process-wide worker, starting it (and resuming leftover jobs) on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = MemoryWorker()
+            atexit.register(_drain_at_exit)
+        _worker.start()
+        return _worker
+
+
+def _drain_at_exit() -> None:
+    # Give short-lived processes (the CLI) a chance to finish their jobs;
+    # anything left over is resumed by the next process
+    if _worker is not None:
+        _worker.drain(float(os.getenv("MEMORY_WORKER_DRAIN_S", "30")))
+        _worker.stop(timeout=1)
+
+
+def submit(kind: str, payload: Dict[str, Any]) -> bool:
+    """Queue a job for the background worker; returns ``False`` if it ran inline instead."""
+    if not memory.ENABLE_PERSISTENCE:
+        return False
+    if not worker_enabled() or memory.count_memory_jobs() >= queue_max():
+        handler = _handlers[kind]
+        handler(payload)
+        return False
+    memory.enqueue_memory_job(kind, payload)
+    MEMORY_JOBS_PENDING.inc()
+    get_worker().notify()
+    return True
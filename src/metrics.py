@@ -0,0 +1,191 @@
+"""Per-stage latency, token and throughput metrics for council runs."""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.telemetry import observe_run
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_METRICS_PATH = PROJECT_ROOT / "data" / "metrics.jsonl"
+
+_NS = 1e9
+_write_lock = threading.Lock()
+# Block size for reading the metrics file backwards
+_TAIL_CHUNK = 64 * 1024
+
+
+def rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB (``None`` if unavailable)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            pages = int(handle.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        import sys
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes (peak, not current, RSS)
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def _rate(tokens: int, duration_ns: int) -> Optional[float]:
+    return round(tokens / (duration_ns / _NS), 2) if tokens and duration_ns else None
+
+
+class StageClock:
+    """Wall-clock marks for one stage call.
+
+    ``created`` is when the stage became runnable; ``start()`` when its
+    request was sent, so the gap is time spent waiting for a slot.
+    """
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self.created = time.perf_counter()
+        self.started: Optional[float] = None
+        self.first_token: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def start(self) -> None:
+        if self.started is None:
+            self.started = time.perf_counter()
+
+    def token(self) -> None:
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter()
+
+    def to_dict(self, usage: List[Dict[str, Any]], attempts: int = 1) -> Dict[str, Any]:
+        """Combine the clock with Ollama's response stats (see ``ollama_completion(usage=...)``)."""
+        started = self.started if self.started is not None else self.created
+        finished = self.finished if self.finished is not None else time.perf_counter()
+        prompt_tokens = sum(record.get("prompt_eval_count", 0) for record in usage)
+        eval_tokens = sum(record.get("eval_count", 0) for record in usage)
+        prompt_ns = sum(record.get("prompt_eval_duration", 0) for record in usage)
+        eval_ns = sum(record.get("eval_duration", 0) for record in usage)
+        load_ns = sum(record.get("load_duration", 0) for record in usage)
+        if self.first_token is not None:
+            ttft = self.first_token - started
+        elif prompt_ns or load_ns:
+            # Non-streaming call: Ollama's load + prompt evaluation time
+            ttft = (load_ns + prompt_ns) / _NS
+        else:
+            ttft = None
+        return {
+            "stage": self.stage,
+            "queue_wait_s": round(started - self.created, 4),
+            "ttft_s": round(ttft, 4) if ttft is not None else None,
+            "total_s": round(finished - started, 4),
+            "load_s": round(load_ns / _NS, 4),
+            "prompt_eval_count": prompt_tokens,
+            "eval_count": eval_tokens,
+            "prompt_tokens_per_sec": _rate(prompt_tokens, prompt_ns),
+            "tokens_per_sec": _rate(eval_tokens, eval_ns),
+            "cached": bool(usage) and all(record.get("cached") for record in usage),
+            "attempts": attempts,
+            "rss_mb": rss_mb(),
+        }
+
+
+def run_metrics(kind: str, stages: List[Dict[str, Any]], total_s: float, **extra: Any) -> Dict[str, Any]:
+    """Summary for one run; ``slowest_stage`` names the stage that dominated wall time."""
+    slowest = max(stages, key=lambda stage: stage["total_s"])["stage"] if stages else None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "kind": kind,
+        "total_s": round(total_s, 4),
+        "prompt_eval_count": sum(stage["prompt_eval_count"] for stage in stages),
+        "eval_count": sum(stage["eval_count"] for stage in stages),
+        "slowest_stage": slowest,
+        "rss_mb": rss_mb(),
+        "stages": stages,
+        **extra,
+    }
+
+
+def metrics_enabled() -> bool:
+    return os.getenv("COUNCIL_METRICS", "1").lower() not in {"0", "false", "no"}
+
+
+def metrics_path() -> Path:
+    return Path(os.getenv("COUNCIL_METRICS_PATH", str(DEFAULT_METRICS_PATH)))
+
+
+def max_bytes() -> int:
+    """Size at which the metrics file is rotated (``COUNCIL_METRICS_MAX_MB``, default 5)."""
+    return int(float(os.getenv("COUNCIL_METRICS_MAX_MB", "5")) * 1024 * 1024)
+
+
+def record_run(metrics: Dict[str, Any]) -> None:
+    """Append one run's metrics as a JSON line to the local metrics store.
+
+    Once the file reaches :func:`max_bytes` it is renamed to ``<name>.1``
+    (replacing the previous one) and a new file is started, so at most
+    twice the limit is kept on disk.
+    """
+    observe_run(metrics)
+    if not metrics_enabled():
+        return
+    path = metrics_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _write_lock:
+            if path.exists() and path.stat().st_size >= max_bytes():
+                path.replace(path.with_name(path.name + ".1"))
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(metrics, ensure_ascii=True) + "\n")
+    except OSError as exc:
+        print(f"\nWarning: Failed to write metrics: {exc}")
+
+
+def _lines_backwards(path: Path):
+    """Lines of ``path`` from last to first, read in blocks from the end."""
+    with path.open("rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        position = handle.tell()
+        rest = b""
+        while position > 0:
+            step = min(_TAIL_CHUNK, position)
+            position -= step
+            handle.seek(position)
+            lines = (handle.read(step) + rest).split(b"\n")
+            # The first piece may be the end of a line that starts in an earlier block
+            rest = lines.pop(0)
+            yield from reversed(lines)
+        yield rest
+
+
+def load_runs(limit: Optional[int] = None, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Read recorded runs (most recent last), optionally only those of ``kind``.
+
+    With ``limit`` only the tail of the file is read.
+    """
+    path = metrics_path()
+    if not path.exists():
+        return []
+    runs = []
+    for line in _lines_backwards(path):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            run = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if kind is None or run.get("kind") == kind:
+            runs.append(run)
+            if limit and len(runs) >= limit:
+                break
+    runs.reverse()
+    return runs
@@ -0,0 +1,234 @@
+"""Versioned schema migrations for the memory database.
+
+The applied version is stored in SQLite's ``PRAGMA user_version``. Each
+migration runs once, in its own transaction, and bumps the version, so
+existing ``council_memory.db`` files are upgraded in place on the next
+``init_db()``. Append new migrations to ``MIGRATIONS``; never edit or
+reorder released ones.
+"""
+import json
+import sqlite3
+from typing import Callable, List, NamedTuple
+
+from src import embeddings
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _create_base_tables(conn: sqlite3.Connection) -> None:
+    # IF NOT EXISTS: databases created before migrations existed start at version 0
+    conn.execute('''CREATE TABLE IF NOT EXISTS sessions
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     timestamp TEXT,
+                     prompt TEXT,
+                     final_answer TEXT,
+                     reasoning TEXT)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS reflections
+                    (session_id INTEGER,
+                     insight TEXT,
+                     FOREIGN KEY(session_id) REFERENCES sessions(id))''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS messages
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     session_id INTEGER,
+                     timestamp TEXT,
+                     role TEXT,
+                     content TEXT,
+                     FOREIGN KEY(session_id) REFERENCES sessions(id))''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS summaries
+                    (session_id INTEGER,
+                     timestamp TEXT,
+                     summary TEXT,
+                     FOREIGN KEY(session_id) REFERENCES sessions(id))''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS facts
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     session_id INTEGER,
+                     timestamp TEXT,
+                     fact TEXT,
+                     FOREIGN KEY(session_id) REFERENCES sessions(id))''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS embeddings
+                    (fact_id INTEGER,
+                     vector TEXT,
+                     FOREIGN KEY(fact_id) REFERENCES facts(id))''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS fact_scores
+                    (fact_id INTEGER PRIMARY KEY,
+                     confidence REAL,
+                     updated_at TEXT,
+                     FOREIGN KEY(fact_id) REFERENCES facts(id))''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS preferences
+                    (key TEXT PRIMARY KEY,
+                     value TEXT,
+                     updated_at TEXT)''')
+
+
+def _add_lookup_indexes(conn: sqlite3.Connection) -> None:
+    # get_recent_fact_embeddings joins facts -> embeddings on fact_id
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_fact_id ON embeddings(fact_id)")
+    # prune_messages deletes by timestamp
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(timestamp)")
+    # Per-session lookups of a run's summary and reflections
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_session_id ON summaries(session_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_reflections_session_id ON reflections(session_id)")
+    conn.execute("ANALYZE")
+
+
+def _pack_embeddings(conn: sqlite3.Connection) -> None:
+    # JSON text vectors -> float32 BLOBs; rows that never parsed are dropped
+    conn.execute('''CREATE TABLE embeddings_packed
+                    (fact_id INTEGER,
+                     vector BLOB,
+                     dtype TEXT NOT NULL DEFAULT 'float32',
+                     scale REAL,
+                     FOREIGN KEY(fact_id) REFERENCES facts(id))''')
+    rows = conn.execute("SELECT fact_id, vector FROM embeddings ORDER BY rowid")
+    for batch in iter(lambda: rows.fetchmany(1000), []):
+        packed = []
+        for fact_id, vector in batch:
+            try:
+                blob, _ = embeddings.encode(json.loads(vector))
+            except (TypeError, ValueError):
+                continue
+            packed.append((fact_id, blob, embeddings.FLOAT32))
+        conn.executemany("INSERT INTO embeddings_packed (fact_id, vector, dtype) VALUES (?, ?, ?)", packed)
+    conn.execute("DROP TABLE embeddings")
+    conn.execute("ALTER TABLE embeddings_packed RENAME TO embeddings")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_fact_id ON embeddings(fact_id)")
+
+
+def _add_fact_ann_index(conn: sqlite3.Connection) -> None:
+    # IVF bucket per embedding and the trained centroids per vector dimension
+    conn.execute("ALTER TABLE embeddings ADD COLUMN list_id INTEGER")
+    conn.execute('''CREATE TABLE IF NOT EXISTS fact_index_centroids
+                    (dim INTEGER,
+                     list_id INTEGER,
+                     centroid BLOB,
+                     PRIMARY KEY (dim, list_id))''')
+
+
+# Full-text indexes over the text columns keyword retrieval searches. facts
+# and messages use external-content FTS5 tables keyed by their INTEGER
+# PRIMARY KEY, so the index stores no second copy of the text. summaries has
+# only an implicit rowid, which VACUUM may renumber, so its FTS table keeps
+# its own copy of the text. Triggers keep all three in step with inserts,
+# deletes (e.g. prune_messages) and updates (summaries' from migration 8).
+_FTS_TOKENIZER = "tokenize='porter unicode61'"
+
+
+def _add_external_fts(conn: sqlite3.Connection, table: str, column: str) -> None:
+    fts = f"{table}_fts"
+    conn.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({column}, content='{table}', content_rowid='id', {_FTS_TOKENIZER})"
+    )
+    insert = f"INSERT INTO {fts} (rowid, {column}) VALUES (new.id, new.{column});"
+    delete = f"INSERT INTO {fts} ({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column});"
+    conn.execute(f"CREATE TRIGGER {table}_fts_insert AFTER INSERT ON {table} BEGIN {insert} END")
+    conn.execute(f"CREATE TRIGGER {table}_fts_delete AFTER DELETE ON {table} BEGIN {delete} END")
+    conn.execute(f"CREATE TRIGGER {table}_fts_update AFTER UPDATE OF {column} ON {table} BEGIN {delete} {insert} END")
+    # Index the rows written before this migration
+    conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def _add_full_text_index(conn: sqlite3.Connection) -> None:
+    _add_external_fts(conn, "facts", "fact")
+    _add_external_fts(conn, "messages", "content")
+    conn.execute(f"CREATE VIRTUAL TABLE summaries_fts USING fts5(summary, session_id UNINDEXED, {_FTS_TOKENIZER})")
+    conn.execute(
+        "CREATE TRIGGER summaries_fts_insert AFTER INSERT ON summaries BEGIN "
+        "INSERT INTO summaries_fts (summary, session_id) VALUES (new.summary, new.session_id); END"
+    )
+    conn.execute(
+        "CREATE TRIGGER summaries_fts_delete AFTER DELETE ON summaries BEGIN "
+        "DELETE FROM summaries_fts WHERE summary = old.summary AND session_id IS old.session_id; END"
+    )
+    conn.execute("INSERT INTO summaries_fts (summary, session_id) SELECT summary, session_id FROM summaries")
+
+
+def _add_memory_jobs(conn: sqlite3.Connection) -> None:
+    # Durable queue for the background memory worker (src/memory_worker.py)
+    conn.execute('''CREATE TABLE IF NOT EXISTS memory_jobs
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     kind TEXT NOT NULL,
+                     payload TEXT NOT NULL,
+                     status TEXT NOT NULL DEFAULT 'pending',
+                     attempts INTEGER NOT NULL DEFAULT 0,
+                     created_at TEXT,
+                     claimed_at REAL,
+                     error TEXT)''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_jobs_status ON memory_jobs(status, id)")
+
+
+def _add_maintenance_runs(conn: sqlite3.Connection) -> None:
+    # Outcome of each maintenance pass (src/maintenance.py), newest last
+    conn.execute('''CREATE TABLE IF NOT EXISTS maintenance_runs
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     started_at REAL,
+                     duration_s REAL,
+                     messages_pruned INTEGER,
+                     pages_freed INTEGER,
+                     db_bytes INTEGER,
+                     free_bytes INTEGER,
+                     complete INTEGER)''')
+
+
+# summaries_fts has no key back to summaries, so each delete removes exactly
+# one copy of the old row; two identical summaries stay indexed once each
+_DELETE_ONE_SUMMARY = (
+    "DELETE FROM summaries_fts WHERE rowid = (SELECT rowid FROM summaries_fts "
+    "WHERE summary = old.summary AND session_id IS old.session_id LIMIT 1);"
+)
+
+
+def _fix_summaries_fts_triggers(conn: sqlite3.Connection) -> None:
+    # Migration 5 deleted every matching copy and ignored updates
+    conn.execute("DROP TRIGGER IF EXISTS summaries_fts_delete")
+    conn.execute(f"CREATE TRIGGER summaries_fts_delete AFTER DELETE ON summaries BEGIN {_DELETE_ONE_SUMMARY} END")
+    conn.execute(
+        "CREATE TRIGGER summaries_fts_update AFTER UPDATE OF summary, session_id ON summaries BEGIN "
+        f"{_DELETE_ONE_SUMMARY} "
+        "INSERT INTO summaries_fts (summary, session_id) VALUES (new.summary, new.session_id); END"
+    )
+    # Re-index so copies already lost to the old delete trigger come back
+    conn.execute("DELETE FROM summaries_fts")
+    conn.execute("INSERT INTO summaries_fts (summary, session_id) SELECT summary, session_id FROM summaries")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "base tables", _create_base_tables),
+    Migration(2, "lookup indexes", _add_lookup_indexes),
+    Migration(3, "binary embedding vectors", _pack_embeddings),
+    Migration(4, "fact ANN index", _add_fact_ann_index),
+    Migration(5, "full-text index", _add_full_text_index),
+    Migration(6, "memory job queue", _add_memory_jobs),
+    Migration(7, "maintenance runs", _add_maintenance_runs),
+    Migration(8, "summaries full-text triggers", _fix_summaries_fts_triggers),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, target: int = SCHEMA_VERSION) -> int:
+    """Apply pending migrations up to ``target`` and return the resulting version.
+
+    Each step takes the write lock first and re-reads the version, so
+    processes starting at the same time do not apply a migration twice.
+    """
+    for migration in MIGRATIONS:
+        if migration.version > target or migration.version <= schema_version(conn):
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if schema_version(conn) < migration.version:
+                migration.apply(conn)
+                conn.execute(f"PRAGMA user_version = {migration.version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return schema_version(conn)
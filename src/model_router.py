@@ -0,0 +1,129 @@
+"""Per-role model routing for Ollama calls.
+
+Every LLM call has a role (see :data:`ROLES`). ``COUNCIL_MODEL_<ROLE>``
+maps a role to its own Ollama model, e.g. ``COUNCIL_MODEL_CURATOR=phi3:mini``
+or ``COUNCIL_MODEL_JUDGE=llama3:8b``. ``COUNCIL_MODEL_OPTIONS_<ROLE>`` (a
+JSON object) adds Ollama options such as ``num_ctx``; the CrewAI agents'
+LangChain client only gets the options it has fields for. Roles without a
+mapping use ``LLM_MODEL`` (default ``phi3``).
+
+Loading a model on a CPU-only host takes seconds to minutes, and two
+resident models may not fit in RAM. :meth:`ModelRouter.plan` looks at a
+run's whole call sequence and treats consecutive calls to the same model as
+a group. The last call of a group is sent with ``keep_alive=0`` when a
+different model follows and the run does not need the current one again,
+so Ollama unloads it before loading the next model.
+``COUNCIL_MODEL_GROUPING=0`` turns this off. With a single model nothing
+changes.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, List, Optional, Sequence
+
+from src.ollama_client import DEFAULT_MODEL
+
+CURATOR = "curator"
+RESEARCHER = "researcher"
+CRITIC = "critic"
+PLANNER = "planner"
+JUDGE = "judge"
+MEMORY_SNAPSHOT = "memory_snapshot"
+SELF_HEAL_CRITIQUE = "self_heal_critique"
+ROLES = (CURATOR, RESEARCHER, CRITIC, PLANNER, JUDGE, MEMORY_SNAPSHOT, SELF_HEAL_CRITIQUE)
+
+# Tells Ollama to unload the model as soon as the request completes
+_UNLOAD = "0"
+
+
+def _model_name(model: str) -> str:
+    # Accept LiteLLM-style names ("ollama/phi3") as well as bare Ollama tags
+    return model.split("/", 1)[1] if model.startswith("ollama/") else model
+
+
+def default_model() -> str:
+    return _model_name(os.getenv("LLM_MODEL") or DEFAULT_MODEL)
+
+
+def grouping_enabled() -> bool:
+    return os.getenv("COUNCIL_MODEL_GROUPING", "1").lower() not in {"0", "false", "no"}
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Model, Ollama options and keep-alive for one call of ``role``."""
+
+    role: str
+    model: str
+    options: Dict[str, Any] = field(default_factory=dict)
+    keep_alive: Optional[str] = None
+
+    def completion_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for ``ollama_completion``."""
+        kwargs: Dict[str, Any] = {"model": self.model, **self.options}
+        if self.keep_alive is not None:
+            kwargs["keep_alive"] = self.keep_alive
+        return kwargs
+
+    def supported_options(self, fields: Collection[str]) -> Dict[str, Any]:
+        """``options`` a client with ``fields`` accepts; the rest are dropped with a warning."""
+        unsupported = sorted(set(self.options) - set(fields))
+        if unsupported:
+            print(f"\nWarning: ignoring options not supported for {self.role}: {', '.join(unsupported)}")
+        return {key: value for key, value in self.options.items() if key in fields}
+
+    def client_kwargs(self, defaults: Dict[str, Any], fields: Collection[str]) -> Dict[str, Any]:
+        """Constructor arguments: ``defaults`` overridden by the supported ``options``.
+
+        The model always comes from the route, never from the options.
+        """
+        kwargs = {**defaults, **self.supported_options(fields)}
+        kwargs["model"] = self.model
+        return kwargs
+
+
+class ModelRouter:
+    """Maps roles to models; unmapped roles get ``default``."""
+
+    def __init__(
+        self,
+        models: Optional[Dict[str, str]] = None,
+        options: Optional[Dict[str, Dict[str, Any]]] = None,
+        default: Optional[str] = None,
+        grouping: bool = True,
+    ) -> None:
+        self.models = {role: _model_name(model) for role, model in (models or {}).items()}
+        self.options = dict(options or {})
+        self.default = _model_name(default or DEFAULT_MODEL)
+        self.grouping = grouping
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        models = {}
+        options = {}
+        for role in ROLES:
+            model = os.getenv(f"COUNCIL_MODEL_{role.upper()}")
+            if model:
+                models[role] = model
+            raw = os.getenv(f"COUNCIL_MODEL_OPTIONS_{role.upper()}")
+            if raw:
+                options[role] = json.loads(raw)
+        return cls(models, options, default_model(), grouping_enabled())
+
+    def route(self, role: str) -> ModelRoute:
+        if role not in ROLES:
+            raise ValueError(f"Unknown model role: {role}")
+        return ModelRoute(role, self.models.get(role, self.default), dict(self.options.get(role, {})))
+
+    def plan(self, roles: Sequence[str]) -> List[ModelRoute]:
+        """Routes for a run's calls in order, unloading models the run is done with."""
+        routes = [self.route(role) for role in roles]
+        if not self.grouping:
+            return routes
+        planned = []
+        for index, route in enumerate(routes):
+            later = [other.model for other in routes[index + 1:]]
+            if later and later[0] != route.model and route.model not in later:
+                route = ModelRoute(route.role, route.model, route.options, _UNLOAD)
+            planned.append(route)
+        return planned
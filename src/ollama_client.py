@@ -0,0 +1,378 @@
+"""Long-lived, connection-pooled HTTP client for the Ollama REST API."""
+import asyncio
+import json
+import os
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import httpx
+
+DEFAULT_HOST = "http://localhost:11434"
+DEFAULT_MODEL = "phi3"
+DEFAULT_EMBED_MODEL = "nomic-embed-text"
+
+
+class OllamaError(RuntimeError):
+    """Raised when Ollama is unreachable or returns an error payload."""
+
+
+def _resolve_host(host: Optional[str] = None) -> str:
+    return (host or os.getenv("OLLAMA_HOST", DEFAULT_HOST)).rstrip("/")
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("OLLAMA_POOL_MAX_CONNECTIONS", "8")),
+        max_keepalive_connections=int(os.getenv("OLLAMA_POOL_MAX_KEEPALIVE", "4")),
+        keepalive_expiry=float(os.getenv("OLLAMA_POOL_KEEPALIVE_EXPIRY", "300")),
+    )
+
+
+def _chat_payload(
+    messages: List[Dict[str, str]],
+    model: str,
+    options: Optional[Dict[str, Any]],
+    stream: bool,
+    keep_alive: Optional[str],
+) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "model": model,
+        "messages": messages,
+        "stream": stream,
+        "options": options or {},
+    }
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    return payload
+
+
+def _http_error(exc: httpx.HTTPError) -> OllamaError:
+    return OllamaError(str(exc) or type(exc).__name__)
+
+
+def _decode_chunk(line: str) -> Dict[str, Any]:
+    try:
+        data = json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise OllamaError(f"Invalid stream chunk from Ollama: {exc}") from exc
+    if "error" in data:
+        raise OllamaError(data["error"])
+    return data
+
+
+def _decode_body(response: httpx.Response) -> Dict[str, Any]:
+    try:
+        data = response.json()
+    except ValueError as exc:
+        raise OllamaError(f"Invalid JSON from Ollama: {exc}") from exc
+    if "error" in data:
+        raise OllamaError(data["error"])
+    return data
+
+
+def _embed_model(model: Optional[str]) -> str:
+    return model or os.getenv("OLLAMA_EMBED_MODEL", DEFAULT_EMBED_MODEL)
+
+
+def _embed_payload(text: str, model: Optional[str]) -> Dict[str, Any]:
+    return {"model": _embed_model(model), "prompt": text}
+
+
+def _embed_batch_payload(texts: List[str], model: Optional[str]) -> Dict[str, Any]:
+    return {"model": _embed_model(model), "input": texts}
+
+
+def _batch_embeddings(response: httpx.Response, count: int) -> List[List[float]]:
+    vectors = _decode_body(response).get("embeddings") or []
+    if len(vectors) != count:
+        raise OllamaError(f"Expected {count} embeddings from Ollama, got {len(vectors)}")
+    return vectors
+
+
+def _raise_for_error(response: httpx.Response) -> None:
+    if response.status_code < 400:
+        return
+    try:
+        detail = response.json().get("error", response.text)
+    except (ValueError, AttributeError):
+        detail = response.text
+    raise OllamaError(f"HTTP {response.status_code}: {detail}")
+
+
+class ChatStream:
+    """Iterator over a streamed chat's decoded NDJSON chunks.
+
+    ``close()`` releases the response (and its pooled connection) even if
+    iteration never started, which closing a plain generator would not.
+    """
+
+    def __init__(self, response: httpx.Response) -> None:
+        self._response = response
+        self._chunks = self._iter_chunks(response)
+
+    def __iter__(self) -> "ChatStream":
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        return next(self._chunks)
+
+    def close(self) -> None:
+        self._chunks.close()
+        self._response.close()
+
+    @staticmethod
+    def _iter_chunks(response: httpx.Response) -> Iterator[Dict[str, Any]]:
+        try:
+            for line in response.iter_lines():
+                if line:
+                    yield _decode_chunk(line)
+        except httpx.HTTPError as exc:
+            raise _http_error(exc) from exc
+        finally:
+            response.close()
+
+
+class OllamaClient:
+    """Thin wrapper over a pooled ``httpx.Client`` bound to one Ollama host.
+
+    Completions, streaming completions and embeddings all share the same
+    keep-alive connection pool, so a council run reuses a handful of warm
+    sockets instead of opening one per agent call.
+    """
+
+    def __init__(self, host: Optional[str] = None, transport: Optional[httpx.BaseTransport] = None) -> None:
+        self.host = _resolve_host(host)
+        self._client = httpx.Client(
+            base_url=self.host,
+            limits=_pool_limits(),
+            transport=transport,
+            timeout=None,
+        )
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_MODEL,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: float = 1800,
+        keep_alive: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run a non-streaming chat completion and return the raw response body."""
+        payload = _chat_payload(messages, model, options, False, keep_alive)
+        try:
+            response = self._client.post("/api/chat", json=payload, timeout=timeout)
+        except httpx.HTTPError as exc:
+            raise _http_error(exc) from exc
+        _raise_for_error(response)
+        return _decode_body(response)
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_MODEL,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: float = 1800,
+        keep_alive: Optional[str] = None,
+    ) -> ChatStream:
+        """Start a streaming chat completion.
+
+        The request is sent eagerly so connection errors surface here rather
+        than on first iteration. The returned iterator yields one decoded
+        NDJSON object per line, ending with the ``done`` message that carries
+        Ollama's timing and token statistics; close it to abandon the request.
+        """
+        payload = _chat_payload(messages, model, options, True, keep_alive)
+        request = self._client.build_request("POST", "/api/chat", json=payload, timeout=timeout)
+        try:
+            response = self._client.send(request, stream=True)
+        except httpx.HTTPError as exc:
+            raise _http_error(exc) from exc
+        if response.status_code >= 400:
+            response.read()
+            response.close()
+            _raise_for_error(response)
+        return ChatStream(response)
+
+    def embed(self, text: str, model: Optional[str] = None, timeout: float = 10) -> Optional[List[float]]:
+        """Return the embedding vector for ``text`` (``None`` if Ollama omits it)."""
+        payload = _embed_payload(text, model)
+        try:
+            response = self._client.post("/api/embeddings", json=payload, timeout=timeout)
+        except httpx.HTTPError as exc:
+            raise _http_error(exc) from exc
+        _raise_for_error(response)
+        return _decode_body(response).get("embedding")
+
+    def embed_batch(
+        self, texts: List[str], model: Optional[str] = None, timeout: float = 30
+    ) -> List[List[float]]:
+        """Embed ``texts`` in one request to ``/api/embed``; vectors are in input order.
+
+        Ollama releases without the batch endpoint answer 404, in which case
+        each text is embedded with :meth:`embed` instead.
+        """
+        if not texts:
+            return []
+        payload = _embed_batch_payload(texts, model)
+        try:
+            response = self._client.post("/api/embed", json=payload, timeout=timeout)
+        except httpx.HTTPError as exc:
+            raise _http_error(exc) from exc
+        # An unknown model is also a 404, but its error message names the model
+        if response.status_code == 404 and "model" not in response.text:
+            return [self.embed(text, model=model, timeout=timeout) for text in texts]
+        _raise_for_error(response)
+        return _batch_embeddings(response, len(texts))
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class AsyncOllamaClient:
+    """asyncio-native counterpart of :class:`OllamaClient`.
+
+    Requests are awaited on the event loop instead of occupying a worker
+    thread, so many deliberations can wait on Ollama concurrently. A client
+    is bound to the loop it was created on; use :func:`get_async_client`.
+    """
+
+    def __init__(self, host: Optional[str] = None, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        self.host = _resolve_host(host)
+        self._client = httpx.AsyncClient(
+            base_url=self.host,
+            limits=_pool_limits(),
+            transport=transport,
+            timeout=None,
+        )
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_MODEL,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: float = 1800,
+        keep_alive: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run a non-streaming chat completion and return the raw response body."""
+        payload = _chat_payload(messages, model, options, False, keep_alive)
+        try:
+            response = await self._client.post("/api/chat", json=payload, timeout=timeout)
+        except httpx.HTTPError as exc:
+            raise _http_error(exc) from exc
+        _raise_for_error(response)
+        return _decode_body(response)
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_MODEL,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: float = 1800,
+        keep_alive: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Start a streaming chat completion (see :meth:`OllamaClient.chat_stream`).
+
+        Closing the returned iterator, or cancelling the task consuming it,
+        closes the HTTP response, which makes Ollama stop generating.
+        """
+        payload = _chat_payload(messages, model, options, True, keep_alive)
+        request = self._client.build_request("POST", "/api/chat", json=payload, timeout=timeout)
+        try:
+            response = await self._client.send(request, stream=True)
+        except httpx.HTTPError as exc:
+            raise _http_error(exc) from exc
+        if response.status_code >= 400:
+            await response.aread()
+            await response.aclose()
+            _raise_for_error(response)
+        return self._iter_stream(response)
+
+    @staticmethod
+    async def _iter_stream(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+        try:
+            async for line in response.aiter_lines():
+                if line:
+                    yield _decode_chunk(line)
+        except httpx.HTTPError as exc:
+            raise _http_error(exc) from exc
+        finally:
+            await response.aclose()
+
+    async def embed(self, text: str, model: Optional[str] = None, timeout: float = 10) -> Optional[List[float]]:
+        """Return the embedding vector for ``text`` (``None`` if Ollama omits it)."""
+        payload = _embed_payload(text, model)
+        try:
+            response = await self._client.post("/api/embeddings", json=payload, timeout=timeout)
+        except httpx.HTTPError as exc:
+            raise _http_error(exc) from exc
+        _raise_for_error(response)
+        return _decode_body(response).get("embedding")
+
+    async def embed_batch(
+        self, texts: List[str], model: Optional[str] = None, timeout: float = 30
+    ) -> List[List[float]]:
+        """Embed ``texts`` in one request (see :meth:`OllamaClient.embed_batch`)."""
+        if not texts:
+            return []
+        payload = _embed_batch_payload(texts, model)
+        try:
+            response = await self._client.post("/api/embed", json=payload, timeout=timeout)
+        except httpx.HTTPError as exc:
+            raise _http_error(exc) from exc
+        if response.status_code == 404 and "model" not in response.text:
+            return [await self.embed(text, model=model, timeout=timeout) for text in texts]
+        _raise_for_error(response)
+        return _batch_embeddings(response, len(texts))
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_clients: Dict[str, OllamaClient] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncOllamaClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
+def get_client(host: Optional[str] = None) -> OllamaClient:
+    """Return the shared client for ``host`` (defaults to ``OLLAMA_HOST``)."""
+    resolved = _resolve_host(host)
+    with _clients_lock:
+        client = _clients.get(resolved)
+        if client is None:
+            client = OllamaClient(resolved)
+            _clients[resolved] = client
+        return client
+
+
+def close_clients() -> None:
+    """Close every pooled client (used on shutdown and in tests)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+def get_async_client(host: Optional[str] = None) -> AsyncOllamaClient:
+    """Return the shared async client for ``host`` on the running event loop."""
+    loop = asyncio.get_running_loop()
+    resolved = _resolve_host(host)
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(resolved)
+        if client is None:
+            client = AsyncOllamaClient(resolved)
+            clients[resolved] = client
+        return client
+
+
+async def aclose_async_clients() -> None:
+    """Close the async clients bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = list(_async_clients.pop(loop, {}).values())
+    for client in clients:
+        await client.aclose()
@@ -1,61 +1,231 @@
+import asyncio
 import os
-import litellm
+import time
 from dotenv import load_dotenv
 
+from src.ollama_client import DEFAULT_MODEL, OllamaError, get_async_client, get_client
+from src.response_cache import get_response_cache
+from src.telemetry import LLM_ERRORS
+
 load_dotenv()
 
-# Configure LiteLLM for longer timeouts on CPU first loads
-litellm.success_callback = []  # Optional: suppress logs if needed
-litellm.failure_callback = []
+
+def _strip_provider(model: str) -> str:
+    # Accept LiteLLM-style names ("ollama/phi3") as well as bare Ollama tags
+    return model.split("/", 1)[1] if model.startswith("ollama/") else model
+
+
+def _request_args(kwargs: dict) -> dict:
+    """Translate ollama_completion kwargs into OllamaClient.chat arguments."""
+    # Allow max_tokens to be overridden via kwargs, otherwise use env variable
+    max_tokens = kwargs.pop("max_tokens", int(os.getenv("LLM_MAX_TOKENS", 500)))
+    temperature = kwargs.pop("temperature", float(os.getenv("LLM_TEMPERATURE", 0.7)))
+    model = _strip_provider(kwargs.pop("model", DEFAULT_MODEL))
+    timeout = kwargs.pop("timeout", 1800)  # 30 minutes for slow CPU first load
+    keep_alive = kwargs.pop("keep_alive", os.getenv("OLLAMA_KEEP_ALIVE") or None)
+    options = {"temperature": temperature, "num_predict": max_tokens, **kwargs}
+    # A fixed context size keeps Ollama from reloading the model (and dropping
+    # its prompt cache) when callers would otherwise get different defaults
+    if os.getenv("OLLAMA_NUM_CTX"):
+        options.setdefault("num_ctx", int(os.getenv("OLLAMA_NUM_CTX")))
+    return {"model": model, "timeout": timeout, "keep_alive": keep_alive, "options": options}
+
+
+def _cache_args(request_args: dict) -> dict:
+    options = request_args["options"]
+    return {
+        "model": request_args["model"],
+        "temperature": options["temperature"],
+        "max_tokens": options["num_predict"],
+    }
+
+
+def _replay(text: str):
+    # Cache hits are served to streaming callers as a single chunk
+    yield text
+
+
+async def _areplay(text: str):
+    yield text
+
+
+class _CompletionStream:
+    """Content chunks of a streamed completion.
+
+    ``close()`` also closes the Ollama response when the caller gives up
+    before the first chunk, when the generator's own cleanup never runs.
+    """
+
+    def __init__(self, chunks, response) -> None:
+        self._chunks = chunks
+        self._response = response
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        return next(self._chunks)
+
+    def close(self) -> None:
+        try:
+            self._chunks.close()
+        finally:
+            self._response.close()
+
+
+def _record_usage(usage, messages: list, response: dict) -> None:
+    """Append Ollama's token statistics for one call to a caller-supplied list."""
+    if usage is None:
+        return
+    usage.append({
+        # Leading system message of a multi-message prompt (see src.prompts)
+        "prefix": messages[0]["content"] if len(messages) > 1 and messages[0].get("role") == "system" else "",
+        "prompt_chars": sum(len(msg.get("content") or "") for msg in messages),
+        "prompt_eval_count": response.get("prompt_eval_count") or 0,
+        "eval_count": response.get("eval_count") or 0,
+        "prompt_eval_duration": response.get("prompt_eval_duration") or 0,
+        "eval_duration": response.get("eval_duration") or 0,
+        "load_duration": response.get("load_duration") or 0,
+        "total_duration": response.get("total_duration") or 0,
+        "cached": bool(response.get("cached")),
+    })
+
+
+def _message_content(response: dict) -> str:
+    try:
+        return response["message"]["content"]
+    except Exception as exc:
+        LLM_ERRORS.labels(kind="parse").inc()
+        raise RuntimeError(f"Ollama response parsing failed: {exc}") from exc
+
 
 def ollama_completion(messages: list, stream: bool = False, **kwargs):
     """
-    Direct LiteLLM completion call to Ollama – bypasses CrewAI routing issues
-    
+    Direct completion call to Ollama over the shared pooled HTTP client
+
     Args:
         messages: List of message dicts with 'role' and 'content'
         stream: If True, returns a generator that yields content chunks
-        **kwargs: Additional arguments passed to litellm.completion
+        **kwargs: max_tokens, temperature, timeout, model and keep_alive are
+            handled explicitly; usage=<list> collects Ollama's token statistics
+            for the call; host=<url> targets another Ollama instance; anything
+            else is passed through as an Ollama option
     """
-    # Allow max_tokens to be overridden via kwargs, otherwise use env variable
-    max_tokens = kwargs.pop("max_tokens", int(os.getenv("LLM_MAX_TOKENS", 500)))
-    
-    # Support OLLAMA_HOST environment variable (defaults to localhost)
-    ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+    usage = kwargs.pop("usage", None)
+    host = kwargs.pop("host", None)
+    request_args = _request_args(kwargs)
+    # Optional response cache (LLM_CACHE=1) keyed on model, prompt, temperature, max_tokens
+    cache = get_response_cache()
+    embedding = None
+    if cache:
+        cached, embedding = cache.lookup(messages=messages, **_cache_args(request_args))
+        if cached is not None:
+            _record_usage(usage, messages, {"cached": True})
+            return _replay(cached) if stream else cached
+
+    # Shared pooled client for host, or OLLAMA_HOST (defaults to localhost)
+    client = get_client(host)
+    start = time.perf_counter()
     try:
-        response = litellm.completion(
-            model="ollama/phi3",
-            messages=messages,
-            api_base=ollama_host,
-            temperature=kwargs.pop("temperature", float(os.getenv("LLM_TEMPERATURE", 0.7))),
-            max_tokens=max_tokens,
-            timeout=kwargs.pop("timeout", 1800),  # 30 minutes for slow CPU first load
-            stream=stream,
-            **kwargs
-        )
+        if stream:
+            response = client.chat_stream(messages, **request_args)
+        else:
+            response = client.chat(messages, **request_args)
     except Exception as exc:
+        LLM_ERRORS.labels(kind="completion").inc()
         raise RuntimeError(f"Ollama completion failed: {exc}") from exc
-    
+
     if stream:
         # Return generator that yields content chunks
         def stream_generator():
-            full_content = ""
+            parts = []
             try:
                 for chunk in response:
-                    if chunk.choices[0].delta.content:
-                        content = chunk.choices[0].delta.content
-                        full_content += content
+                    content = (chunk.get("message") or {}).get("content")
+                    if content:
+                        parts.append(content)
                         yield content
-            except Exception as exc:
+                    if chunk.get("done"):
+                        _record_usage(usage, messages, chunk)
+            except OllamaError as exc:
+                LLM_ERRORS.labels(kind="stream").inc()
                 raise RuntimeError(f"Ollama stream failed: {exc}") from exc
-            # Store full content in a closure for later access (optional)
-            stream_generator.full_content = full_content
+            finally:
+                # Closing early (cancel, deadline) aborts the request right away
+                response.close()
+            if cache:
+                cache.put(messages=messages, response="".join(parts),
+                          latency=time.perf_counter() - start, embedding=embedding,
+                          **_cache_args(request_args))
+        return _CompletionStream(stream_generator(), response)
+    text = _message_content(response)
+    _record_usage(usage, messages, response)
+    if cache:
+        cache.put(messages=messages, response=text,
+                  latency=time.perf_counter() - start, embedding=embedding,
+                  **_cache_args(request_args))
+    return text
+
+
+async def ollama_completion_async(messages: list, stream: bool = False, **kwargs):
+    """
+    asyncio-native variant of ollama_completion
+
+    Awaiting it returns the completion text, or with stream=True an async
+    generator of content chunks. No worker thread is held while Ollama generates.
+    """
+    usage = kwargs.pop("usage", None)
+    host = kwargs.pop("host", None)
+    request_args = _request_args(kwargs)
+    cache = get_response_cache()
+    embedding = None
+    if cache:
+        cached, embedding = await asyncio.to_thread(cache.lookup, messages=messages, **_cache_args(request_args))
+        if cached is not None:
+            _record_usage(usage, messages, {"cached": True})
+            return _areplay(cached) if stream else cached
+
+    client = get_async_client(host)
+    start = time.perf_counter()
+    try:
+        if stream:
+            response = await client.chat_stream(messages, **request_args)
+        else:
+            response = await client.chat(messages, **request_args)
+    except Exception as exc:
+        LLM_ERRORS.labels(kind="completion").inc()
+        raise RuntimeError(f"Ollama completion failed: {exc}") from exc
+
+    if stream:
+        async def stream_generator():
+            parts = []
+            try:
+                async for chunk in response:
+                    content = (chunk.get("message") or {}).get("content")
+                    if content:
+                        parts.append(content)
+                        yield content
+                    if chunk.get("done"):
+                        _record_usage(usage, messages, chunk)
+            except OllamaError as exc:
+                LLM_ERRORS.labels(kind="stream").inc()
+                raise RuntimeError(f"Ollama stream failed: {exc}") from exc
+            finally:
+                await response.aclose()
+            if cache:
+                await asyncio.to_thread(
+                    cache.put, messages=messages, response="".join(parts),
+                    latency=time.perf_counter() - start, embedding=embedding, **_cache_args(request_args)
+                )
         return stream_generator()
-    else:
-        try:
-            return response.choices[0].message.content
-        except Exception as exc:
-            raise RuntimeError(f"Ollama response parsing failed: {exc}") from exc
+    text = _message_content(response)
+    _record_usage(usage, messages, response)
+    if cache:
+        await asyncio.to_thread(
+            cache.put, messages=messages, response=text,
+            latency=time.perf_counter() - start, embedding=embedding, **_cache_args(request_args)
+        )
+    return text
 
 # For compatibility if needed elsewhere
 class OllamaLLM:
@@ -0,0 +1,472 @@
+"""Declarative stage pipeline for council deliberations.
+
+Agents are declared as :class:`StageSpec` data (prompt builder, token budget,
+temperature, dependencies, retry/timeout policy). :class:`Pipeline` executes
+them in order and owns streaming, retries, timing, fan-out and cancellation,
+so those policies live in one place instead of once per agent.
+
+A run may carry a :class:`~src.cancellation.CancellationToken`. Stages stop
+at the next chunk once it fires and keep the text produced so far; stages
+that have not started are skipped, except ``final`` ones, which run on the
+token's reserve against whatever outputs exist.
+"""
+import functools
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from src.agents.base import Agent
+from src.cancellation import CancellationToken
+from src.metrics import StageClock
+from src.prompts import agent_messages
+from src.scheduler import HostRotation, merge_bounded, run_bounded
+
+Outputs = Dict[str, str]
+
+
+@dataclass(frozen=True)
+class StageSpec:
+    """One pipeline stage.
+
+    ``build_prompt`` receives the outputs of earlier stages and returns the
+    agent-specific prompt; with ``shared_context`` it is sent after the run's
+    shared prefix. ``fan_out`` (used only when the pipeline runs in parallel
+    mode) returns several named prompts that run concurrently and are merged
+    by ``combine``. ``completion_options`` (model, keep-alive and Ollama
+    options from :mod:`src.model_router`) are passed to every call and take
+    precedence over the stage's own settings. Stages with a
+    ``budget_weight`` share the run's token budget when a latency target is
+    set (see :mod:`src.token_budget`). A ``final`` stage still runs when
+    earlier stages were cut short by the run's deadline; its prompt builder
+    must tolerate missing outputs.
+    """
+
+    name: str
+    role: str
+    build_prompt: Callable[[Outputs], str]
+    depends_on: Tuple[str, ...] = ()
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    timeout: Optional[float] = None
+    retries: Optional[int] = None
+    shared_context: bool = True
+    color: str = "1;37"
+    postprocess: Optional[Callable[[str], str]] = None
+    fan_out: Optional[Callable[[Outputs], Dict[str, str]]] = None
+    combine: Optional[Callable[[Dict[str, str]], str]] = None
+    final: bool = False
+    budget_weight: Optional[float] = None
+    completion_options: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class PipelineRun:
+    """Mutable state of one execution: outputs, token usage and per-call metrics.
+
+    ``interrupted`` maps each stage the token cut short to ``"truncated"``
+    (partial output kept) or ``"skipped"`` (no output), and ``stop_reason``
+    records why (``"deadline"`` or ``"cancelled"``).
+    """
+
+    prefix: str = ""
+    outputs: Outputs = field(default_factory=dict)
+    usage: List[Dict[str, Any]] = field(default_factory=list)
+    metrics: List[Dict[str, Any]] = field(default_factory=list)
+    token: Optional[CancellationToken] = None
+    interrupted: Dict[str, str] = field(default_factory=dict)
+    stop_reason: Optional[str] = None
+    # Compacted upstream outputs and counters (uses, chars_in, chars_out, seconds)
+    compacted: Outputs = field(default_factory=dict)
+    compaction: Dict[str, float] = field(default_factory=dict)
+
+    def stop_requested(self, final: bool = False) -> Optional[str]:
+        """Why a (``final``) stage must stop now, or ``None``."""
+        return self.token.stop_reason(final) if self.token is not None else None
+
+    def interrupt(self, name: str, how: str, reason: str) -> None:
+        self.interrupted[name] = how
+        self.stop_reason = self.stop_reason or reason
+
+
+class StageError(RuntimeError):
+    """A stage failed; ``str()`` reads "<Stage> failed: <error>"."""
+
+    def __init__(self, stage: str, error: BaseException) -> None:
+        super().__init__(f"{stage} failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+def _join_variants(outputs: Dict[str, str]) -> str:
+    return "\n\n".join(f"[{name}]\n{text}" for name, text in outputs.items())
+
+
+class StageAgent(Agent):
+    """Runs a single :class:`StageSpec` call through an injected completion function.
+
+    Failures are retried up to ``retries`` times, but only while no output
+    has been produced, so streamed tokens are never duplicated. Closing the
+    completion stream on exit (including cancellation) aborts the request.
+    When the run's token fires the call ends at the next chunk (or when its
+    capped timeout expires) and returns what it has, with ``truncated`` set.
+    Each call appends its token usage and a metrics record to the run.
+    """
+
+    def __init__(
+        self,
+        spec: StageSpec,
+        completion: Callable[..., Any],
+        run: PipelineRun,
+        retries: int = 0,
+        variant: Optional[str] = None,
+        host: Optional[str] = None,
+    ) -> None:
+        super().__init__()
+        self.spec = spec
+        self.completion = completion
+        self.run = run
+        self.retries = spec.retries if spec.retries is not None else retries
+        self.variant = variant
+        self.host = host
+        self.calls: List[Dict[str, Any]] = []
+        self.attempts = 0
+        self.truncated = False
+        # Created when the stage becomes runnable; started when its request goes out
+        self.clock = StageClock(self.agent_name)
+
+    @property
+    def agent_name(self) -> str:
+        return f"{self.spec.name} ({self.variant})" if self.variant else self.spec.name
+
+    @property
+    def agent_role(self) -> str:
+        return self.spec.role
+
+    def messages(self, suffix: str) -> List[Dict[str, str]]:
+        if self.spec.shared_context and self.run.prefix:
+            return agent_messages(self.run.prefix, suffix)
+        return [{"role": "user", "content": suffix}]
+
+    def completion_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"usage": self.calls}
+        if self.spec.max_tokens is not None:
+            kwargs["max_tokens"] = self.spec.max_tokens
+        if self.spec.temperature is not None:
+            kwargs["temperature"] = self.spec.temperature
+        timeout = self.spec.timeout
+        if self.run.token is not None:
+            timeout = self.run.token.timeout(timeout, self.spec.final)
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        if self.host:
+            kwargs["host"] = self.host
+        if self.spec.completion_options:
+            kwargs.update(self.spec.completion_options)
+        return kwargs
+
+    def _stop_reason(self) -> Optional[str]:
+        return self.run.stop_requested(self.spec.final)
+
+    def _cut_short(self, reason: str, text: str) -> str:
+        self.truncated = True
+        self.run.interrupt(self.agent_name, "truncated" if text else "skipped", reason)
+        return text
+
+    def process(self, suffix: str, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """Return the completion for ``suffix``, streaming chunks to ``on_chunk`` if given."""
+        self.clock.start()
+        try:
+            return self._complete(suffix, on_chunk)
+        finally:
+            self._record()
+
+    def _complete(self, suffix: str, on_chunk: Optional[Callable[[str], None]]) -> str:
+        parts: List[str] = []
+        while True:
+            reason = self._stop_reason()
+            if reason:
+                return self._cut_short(reason, "".join(parts))
+            self.attempts += 1
+            try:
+                if on_chunk is None:
+                    return self.completion(self.messages(suffix), **self.completion_kwargs())
+                stream = self.completion(self.messages(suffix), stream=True, **self.completion_kwargs())
+                try:
+                    for chunk in stream:
+                        self.clock.token()
+                        parts.append(chunk)
+                        on_chunk(chunk)
+                        reason = self._stop_reason()
+                        if reason:
+                            return self._cut_short(reason, "".join(parts))
+                finally:
+                    close = getattr(stream, "close", None)
+                    if close:
+                        close()
+                return "".join(parts)
+            except Exception as exc:
+                # A timeout capped by the deadline ends the stage, not the run
+                reason = self._stop_reason()
+                if reason:
+                    return self._cut_short(reason, "".join(parts))
+                if parts or self.attempts > self.retries:
+                    raise
+                self._log_retry(exc)
+
+    def _log_retry(self, exc: Exception) -> None:
+        self.logger.warning(
+            "Retrying %s after error (%d/%d): %s", self.agent_name, self.attempts, self.retries, exc
+        )
+
+    def _record(self) -> None:
+        self.clock.finish()
+        self.run.usage.extend(self.calls)
+        metrics = self.clock.to_dict(self.calls, self.attempts)
+        if self.truncated:
+            metrics["truncated"] = True
+        if self.spec.completion_options and "model" in self.spec.completion_options:
+            metrics["model"] = self.spec.completion_options["model"]
+        self.run.metrics.append(metrics)
+
+    async def astream(self, suffix: str) -> AsyncIterator[str]:
+        """Yield content chunks for ``suffix`` (async counterpart of :meth:`process`)."""
+        self.on_start()
+        self.clock.start()
+        parts = []
+        try:
+            while True:
+                reason = self._stop_reason()
+                if reason:
+                    self._cut_short(reason, "".join(parts))
+                    break
+                self.attempts += 1
+                try:
+                    stream = await self.completion(self.messages(suffix), stream=True, **self.completion_kwargs())
+                    try:
+                        async for chunk in stream:
+                            self.clock.token()
+                            parts.append(chunk)
+                            yield chunk
+                            reason = self._stop_reason()
+                            if reason:
+                                self._cut_short(reason, "".join(parts))
+                                break
+                    finally:
+                        aclose = getattr(stream, "aclose", None)
+                        if aclose:
+                            await aclose()
+                    break
+                except Exception as exc:
+                    reason = self._stop_reason()
+                    if reason:
+                        self._cut_short(reason, "".join(parts))
+                        break
+                    if parts or self.attempts > self.retries:
+                        self.on_error(exc)
+                        raise
+                    self._log_retry(exc)
+        finally:
+            self._record()
+        self.on_finish("".join(parts))
+
+
+class Pipeline:
+    """Executes stages in declaration order against a shared :class:`PipelineRun`.
+
+    ``parallel`` enables stage fan-out, bounded by ``max_concurrency``. The
+    completion function is passed per call so callers can resolve it late
+    (tests patch ``council.ollama_completion``). With a ``compact`` function
+    (see :mod:`src.compaction`) each stage's prompt builder sees compacted
+    versions of the outputs it depends on; ``run.outputs`` keeps the full text.
+    """
+
+    def __init__(
+        self,
+        stages: List[StageSpec],
+        parallel: bool = False,
+        max_concurrency: int = 1,
+        retries: Optional[int] = None,
+        compact: Optional[Callable[[str], str]] = None,
+    ) -> None:
+        self.stages = list(stages)
+        self.compact = compact
+        self.parallel = parallel
+        self.max_concurrency = max_concurrency
+        self.retries = retries if retries is not None else int(os.getenv("COUNCIL_STAGE_RETRIES", "0"))
+        names = set()
+        for spec in self.stages:
+            if spec.name in names:
+                raise ValueError(f"Duplicate stage name: {spec.name}")
+            names.add(spec.name)
+
+    def _skip_reason(self, spec: StageSpec, run: PipelineRun) -> Optional[str]:
+        """Why ``spec`` should not start, recording it as skipped; ``None`` to run it."""
+        reason = run.stop_requested(spec.final)
+        skipped = [run.interrupted.get(name) == "skipped" for name in spec.depends_on]
+        # A final stage needs at least one input; any other stage needs all of them
+        if reason is None and skipped and (all(skipped) if spec.final else any(skipped)):
+            reason = run.stop_reason
+        if reason:
+            run.interrupt(spec.name, "skipped", reason)
+        return reason
+
+    def _check_dependencies(self, spec: StageSpec, run: PipelineRun) -> None:
+        # A final stage makes do without outputs the deadline kept from being produced
+        missing = [
+            name for name in spec.depends_on
+            if name not in run.outputs and not (spec.final and run.interrupted.get(name) == "skipped")
+        ]
+        if missing:
+            raise ValueError(f"Stage {spec.name} depends on missing output(s): {', '.join(missing)}")
+
+    def _combine(self, spec: StageSpec, run: PipelineRun, results: Dict[str, str]) -> str:
+        # Variants the token stopped before they produced anything are left out
+        kept = {
+            variant: text for variant, text in results.items()
+            if text or run.interrupted.get(f"{spec.name} ({variant})") != "skipped"
+        }
+        if not kept:
+            run.interrupt(spec.name, "skipped", run.stop_reason or "")
+            return ""
+        return (spec.combine or _join_variants)(kept)
+
+    def _inputs(self, spec: StageSpec, run: PipelineRun) -> Outputs:
+        """Outputs as ``spec``'s prompt builder sees them (dependencies compacted)."""
+        if self.compact is None or not spec.depends_on:
+            return run.outputs
+        inputs = dict(run.outputs)
+        stats = run.compaction
+        for name in spec.depends_on:
+            if name not in run.outputs:
+                continue
+            if name not in run.compacted:
+                start = time.perf_counter()
+                run.compacted[name] = self.compact(run.outputs[name])
+                stats["seconds"] = stats.get("seconds", 0.0) + time.perf_counter() - start
+            inputs[name] = run.compacted[name]
+            stats["uses"] = stats.get("uses", 0) + 1
+            stats["chars_in"] = stats.get("chars_in", 0) + len(run.outputs[name])
+            stats["chars_out"] = stats.get("chars_out", 0) + len(inputs[name])
+        return inputs
+
+    def _fans_out(self, spec: StageSpec) -> bool:
+        return self.parallel and spec.fan_out is not None
+
+    def _finish(self, spec: StageSpec, run: PipelineRun, text: str) -> str:
+        if not text and run.interrupted.get(spec.name) == "skipped":
+            return text
+        if spec.postprocess:
+            text = spec.postprocess(text)
+        run.outputs[spec.name] = text
+        return text
+
+    def run(self, run: PipelineRun, completion: Callable[..., Any], stream: bool = False) -> Outputs:
+        """Execute every stage, printing progress; raises :class:`StageError`."""
+        for spec in self.stages:
+            reason = self._skip_reason(spec, run)
+            if reason:
+                print(f"Skipping {spec.name} ({reason})")
+                continue
+            self._check_dependencies(spec, run)
+            try:
+                if self._fans_out(spec):
+                    text = self._run_fan_out(spec, run, completion, stream)
+                elif stream:
+                    print(f"\033[{spec.color}m{spec.name} ({spec.role}):\033[0m ", end="", flush=True)
+                    agent = StageAgent(spec, completion, run, self.retries)
+                    text = agent.generate_response(
+                        spec.build_prompt(self._inputs(spec, run)), on_chunk=lambda chunk: print(chunk, end="", flush=True)
+                    )
+                    print()  # New line after streaming
+                else:
+                    print(f"Running {spec.name} ({spec.role})...")
+                    agent = StageAgent(spec, completion, run, self.retries)
+                    text = agent.generate_response(spec.build_prompt(self._inputs(spec, run)))
+            except KeyboardInterrupt:
+                raise  # Re-raise to be handled by caller
+            except Exception as exc:
+                raise StageError(spec.name, exc) from exc
+            text = self._finish(spec, run, text)
+            if not stream and not self._fans_out(spec):
+                print(f"{spec.name} complete: {len(text)} chars")
+        return run.outputs
+
+    def _run_fan_out(self, spec: StageSpec, run: PipelineRun, completion: Callable[..., Any], stream: bool) -> str:
+        prompts = spec.fan_out(self._inputs(spec, run))
+        hosts = HostRotation()
+        print(f"Running {spec.name} personas in parallel ({', '.join(prompts)})...")
+        tasks = [
+            functools.partial(
+                StageAgent(spec, completion, run, self.retries, variant=variant, host=hosts.next()).generate_response,
+                suffix,
+            )
+            for variant, suffix in prompts.items()
+        ]
+        results = dict(zip(prompts, run_bounded(tasks, self.max_concurrency)))
+        for variant, text in results.items():
+            if stream:
+                print(f"\033[{spec.color}m{spec.name} ({variant}):\033[0m {text}")
+            else:
+                print(f"{spec.name} ({variant}) complete: {len(text)} chars")
+        return self._combine(spec, run, results)
+
+    async def astream(self, run: PipelineRun, completion: Callable[..., Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Execute every stage as an event stream; raises :class:`StageError`.
+
+        Yields {"type": "agent"}, {"type": "content"} per token and
+        {"type": "agent_done"} for each stage (for each variant of a fanned-out
+        stage). Cancelling the consumer closes the in-flight Ollama stream.
+        """
+        for spec in self.stages:
+            if self._skip_reason(spec, run):
+                continue
+            self._check_dependencies(spec, run)
+            fan_out = self._fans_out(spec)
+            if not fan_out:
+                yield {"type": "agent", "agent": spec.name}
+            try:
+                if fan_out:
+                    results: Dict[str, str] = {}
+                    async for event in self._astream_fan_out(spec, run, completion, results):
+                        yield event
+                    text = self._combine(spec, run, results)
+                else:
+                    agent = StageAgent(spec, completion, run, self.retries)
+                    parts = []
+                    async for chunk in agent.astream(spec.build_prompt(self._inputs(spec, run))):
+                        parts.append(chunk)
+                        yield {"type": "content", "agent": spec.name, "content": chunk}
+                    text = "".join(parts)
+            except Exception as exc:
+                raise StageError(spec.name, exc) from exc
+            self._finish(spec, run, text)
+            if not fan_out:
+                yield {"type": "agent_done", "agent": spec.name}
+
+    async def _astream_fan_out(
+        self, spec: StageSpec, run: PipelineRun, completion: Callable[..., Any], results: Dict[str, str]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        prompts = spec.fan_out(self._inputs(spec, run))
+        hosts = HostRotation()
+
+        def variant_stream(variant: str, suffix: str):
+            agent = StageAgent(spec, completion, run, self.retries, variant=variant, host=hosts.next())
+
+            async def events():
+                yield {"type": "agent", "agent": agent.agent_name}
+                parts = []
+                async for chunk in agent.astream(suffix):
+                    parts.append(chunk)
+                    yield {"type": "content", "agent": agent.agent_name, "content": chunk}
+                results[variant] = "".join(parts)
+                yield {"type": "agent_done", "agent": agent.agent_name}
+            return events
+
+        streams = [variant_stream(variant, suffix) for variant, suffix in prompts.items()]
+        async for event in merge_bounded(streams, self.max_concurrency):
+            yield event
+        # Keep declaration order regardless of completion order
+        ordered = {variant: results[variant] for variant in prompts}
+        results.clear()
+        results.update(ordered)
@@ -0,0 +1,66 @@
+"""Prompt assembly around a shared, byte-stable prefix.
+
+Every council agent after the Curator sees the same session context (memory
+summary, relevant facts, preferences and the user prompt). Rendering that
+context identically, as the first message of every agent call, lets Ollama
+reuse the already-evaluated KV cache for the prefix and only evaluate the
+agent-specific suffix.
+"""
+from typing import Dict, List
+
+# Fallback when Ollama does not report token counts for the first call
+CHARS_PER_TOKEN = 4.0
+
+
+def shared_prefix(prompt: str, context: Dict[str, str]) -> str:
+    """Canonical session context shared by Researcher, Critic, Planner and Judge."""
+    return f"""You are one agent of The Council, a multi-agent deliberation.
+Memory Summary:
+{context["memory_block"]}
+Facts:
+{context["facts_block"]}
+Preferences:
+{context["preferences_block"]}
+
+Prompt: {prompt}"""
+
+
+def agent_messages(prefix: str, suffix: str) -> List[Dict[str, str]]:
+    """Shared prefix as the system message, agent instructions as the user turn."""
+    return [
+        {"role": "system", "content": prefix},
+        {"role": "user", "content": suffix},
+    ]
+
+
+def prefix_reuse_report(usage: List[Dict]) -> Dict:
+    """Summarize prompt-eval tokens saved by prefix reuse for one session.
+
+    ``usage`` is the list filled by ``ollama_completion(..., usage=usage)``.
+
+    The first call with a given prefix is treated as cold; its measured
+    ``prompt_eval_count`` calibrates tokens-per-char. Each later call with the
+    same prefix would have cost ``prompt_chars`` at that rate without reuse,
+    so the difference to its measured ``prompt_eval_count`` is the saving.
+    """
+    evaluated = [u for u in usage if u.get("prefix") and not u.get("cached")]
+    report = {
+        "calls": len(evaluated),
+        "prompt_eval_tokens": sum(u["prompt_eval_count"] for u in evaluated),
+        "estimated_prompt_tokens": 0,
+        "estimated_tokens_saved": 0,
+    }
+    seen_prefixes = {}
+    tokens_per_char = 1.0 / CHARS_PER_TOKEN
+    for record in evaluated:
+        if record["prefix"] not in seen_prefixes:
+            seen_prefixes[record["prefix"]] = True
+            if record["prompt_eval_count"] and record["prompt_chars"]:
+                tokens_per_char = record["prompt_eval_count"] / record["prompt_chars"]
+            report["estimated_prompt_tokens"] += record["prompt_eval_count"]
+            continue
+        expected = int(record["prompt_chars"] * tokens_per_char)
+        report["estimated_prompt_tokens"] += expected
+        if record["prompt_eval_count"]:
+            report["estimated_tokens_saved"] += max(0, expected - record["prompt_eval_count"])
+    return report
@@ -0,0 +1,84 @@
+"""Versioned in-process cache for small, rarely changing memory reads.
+
+Every Curator turn and council run reads the preferences, the latest
+summary and the recent messages. :class:`ReadCache` serves those from
+memory until they change:
+
+* In-process writers call :meth:`ReadCache.invalidate` (or
+  :meth:`ReadCache.update` to write through) for the source they changed.
+  Each source has a generation number, so a load that raced with a write
+  is not stored.
+* Writes by other processes are detected with an external version token
+  (SQLite's ``PRAGMA data_version``): :meth:`ReadCache.sync` drops every
+  entry when the token moves, and :meth:`ReadCache.absorb` records a move
+  caused by this process's own, already-handled write.
+"""
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from src.telemetry import READ_CACHE_LOOKUPS
+
+_MISSING = object()
+
+
+class ReadCache:
+    """Map of ``source -> {key: value}`` validated by per-source generations."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[Hashable, Any]] = defaultdict(dict)
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._token: Optional[Hashable] = None
+        self._lock = threading.Lock()
+
+    def get(self, source: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Cached value for ``(source, key)``, calling ``loader()`` on a miss."""
+        if not self.enabled:
+            return loader()
+        with self._lock:
+            value = self._entries[source].get(key, _MISSING)
+            generation = self._generations[source]
+            if value is not _MISSING:
+                self.hits += 1
+                READ_CACHE_LOOKUPS.labels(result="hit").inc()
+                return value
+            self.misses += 1
+        READ_CACHE_LOOKUPS.labels(result="miss").inc()
+        value = loader()
+        with self._lock:
+            # A write since the load started makes the value stale
+            if self._generations[source] == generation:
+                self._entries[source][key] = value
+        return value
+
+    def invalidate(self, *sources: str) -> None:
+        """Drop the given sources (every source if none are named)."""
+        with self._lock:
+            for source in sources or list(self._entries):
+                self._generations[source] += 1
+                self._entries[source].clear()
+
+    def update(self, source: str, apply: Callable[[Hashable, Any], Any]) -> None:
+        """Write through: replace each cached ``value`` of ``source`` with ``apply(key, value)``."""
+        with self._lock:
+            self._generations[source] += 1
+            entries = self._entries[source]
+            for key, value in list(entries.items()):
+                entries[key] = apply(key, value)
+
+    def sync(self, token: Hashable) -> None:
+        """Drop everything if the external version moved since the last sync."""
+        with self._lock:
+            if token != self._token:
+                for source in list(self._entries):
+                    self._generations[source] += 1
+                    self._entries[source].clear()
+                self._token = token
+
+    def absorb(self, token: Hashable) -> None:
+        """Accept ``token`` as current without dropping entries (our own write moved it)."""
+        with self._lock:
+            self._token = token
@@ -0,0 +1,320 @@
+"""On-disk cache for agent completions with LRU/TTL eviction and an optional semantic tier."""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from src import embeddings
+from src.telemetry import CACHE_LOOKUPS
+from src.vector_index import ExactIndex
+
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(__file__), ".."))
+CACHE_PATH = os.path.join(DATA_DIR, "council_cache.db")
+
+_WHITESPACE = re.compile(r"\s+")
+
+EmbedFn = Callable[[str], Optional[List[float]]]
+
+
+def normalize_messages(messages: List[Dict[str, str]]) -> str:
+    """Canonical prompt text: role-tagged messages with whitespace collapsed."""
+    return "\n".join(
+        f"{msg.get('role', 'user')}: {_WHITESPACE.sub(' ', msg.get('content') or '').strip()}"
+        for msg in messages
+    )
+
+
+def split_scope(messages: List[Dict[str, str]]) -> Tuple[str, str]:
+    """``(scope, text)``: a hash of the leading system messages and the normalized rest.
+
+    Council agents share a byte-identical system prefix (see src.prompts),
+    so only the agent-specific rest is worth embedding, and a semantic match
+    must come from a call with the same prefix.
+    """
+    lead = 0
+    while lead < len(messages) - 1 and messages[lead].get("role") == "system":
+        lead += 1
+    scope = hashlib.sha256(normalize_messages(messages[:lead]).encode("utf-8")).hexdigest()
+    return scope, normalize_messages(messages[lead:])
+
+
+def make_key(model: str, prompt_text: str, temperature: float, max_tokens: int) -> str:
+    raw = json.dumps([model, prompt_text, round(float(temperature), 4), int(max_tokens)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class Lookup(NamedTuple):
+    """Result of :meth:`ResponseCache.lookup`; pass ``embedding`` on to ``put``."""
+
+    response: Optional[str]
+    embedding: Optional[List[float]] = None
+
+
+class ResponseCache:
+    """SQLite-backed completion cache.
+
+    Exact hits are keyed on (model, normalized prompt, temperature,
+    max_tokens). When ``semantic_threshold`` and ``embed_fn`` are set, a miss
+    falls back to the closest cached prompt for the same model/settings and
+    system prefix (see :func:`split_scope`) whose embedding cosine similarity
+    is at least the threshold; vectors are stored as float32 BLOBs. Entries
+    expire after ``ttl_seconds``; beyond ``max_entries``/``max_bytes`` the
+    least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 7 * 86400,
+        semantic_threshold: Optional[float] = None,
+        embed_fn: Optional[EmbedFn] = None,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+        self.embed_fn = embed_fn
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses
+               (key TEXT PRIMARY KEY,
+                model TEXT,
+                temperature REAL,
+                max_tokens INTEGER,
+                response TEXT,
+                size INTEGER,
+                latency REAL,
+                scope TEXT,
+                vector BLOB,
+                created_at REAL,
+                last_access REAL)"""
+        )
+        # Caches created before the packed vectors kept JSON text in "embedding"
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        for column, kind in (("scope", "TEXT"), ("vector", "BLOB")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE responses ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_scope ON responses(scope, model, temperature, max_tokens)"
+        )
+        self._conn.commit()
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.semantic_threshold is not None and self.embed_fn is not None
+
+    def get(self, model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> Optional[str]:
+        """Return a cached response or ``None``; updates hit/miss counters."""
+        return self.lookup(model, messages, temperature, max_tokens).response
+
+    def lookup(self, model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> Lookup:
+        """Like :meth:`get`, but also returns the query embedding computed on a semantic miss."""
+        prompt_text = normalize_messages(messages)
+        key = make_key(model, prompt_text, temperature, max_tokens)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, latency, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[2] <= self.ttl_seconds:
+                self._touch(key, now)
+                self.hits += 1
+                self.saved_seconds += row[1] or 0.0
+                CACHE_LOOKUPS.labels(result="hits").inc()
+                return Lookup(row[0])
+        embedding = None
+        if self.semantic_enabled:
+            scope, text = split_scope(messages)
+            embedding = self._embed(text)
+            hit = self._semantic_lookup(model, scope, embedding, temperature, max_tokens, now)
+            if hit is not None:
+                CACHE_LOOKUPS.labels(result="semantic_hits").inc()
+                return Lookup(hit, embedding)
+        with self._lock:
+            self.misses += 1
+        CACHE_LOOKUPS.labels(result="misses").inc()
+        return Lookup(None, embedding)
+
+    def put(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        response: str,
+        latency: float = 0.0,
+        embedding: Optional[List[float]] = None,
+    ) -> None:
+        """Store a response and enforce TTL/size limits.
+
+        ``embedding`` is the one :meth:`lookup` returned for these messages;
+        without it the prompt is embedded again.
+        """
+        if not response:
+            return
+        prompt_text = normalize_messages(messages)
+        key = make_key(model, prompt_text, temperature, max_tokens)
+        scope, vector = None, None
+        if self.semantic_enabled:
+            scope, text = split_scope(messages)
+            embedding = embedding or self._embed(text)
+            vector = embeddings.encode(embedding)[0] if embedding else None
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, temperature, max_tokens, response, size, latency, scope, vector, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    model,
+                    round(float(temperature), 4),
+                    int(max_tokens),
+                    response,
+                    len(response.encode("utf-8")),
+                    latency,
+                    scope,
+                    vector,
+                    now,
+                    now,
+                ),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return {
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "entries": entries,
+                "bytes": size,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _touch(self, key: str, now: float) -> None:
+        self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        try:
+            return self.embed_fn(text)
+        except Exception:
+            return None
+
+    def _semantic_lookup(
+        self,
+        model: str,
+        scope: str,
+        embedding: Optional[List[float]],
+        temperature: float,
+        max_tokens: int,
+        now: float,
+    ) -> Optional[str]:
+        if not embedding:
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rowid, vector FROM responses "
+                "WHERE scope = ? AND model = ? AND temperature = ? AND max_tokens = ? AND vector IS NOT NULL "
+                "AND created_at >= ?",
+                (scope, model, round(float(temperature), 4), int(max_tokens), now - self.ttl_seconds),
+            ).fetchall()
+        # Score outside the lock; rows of another dimension are skipped by the index
+        index = ExactIndex(len(embedding))
+        index.add((rowid for rowid, _ in rows), (embeddings.decode(blob) for _, blob in rows))
+        ids, scores = index.search(embedding, 1)
+        if not ids.size or scores[0] < self.semantic_threshold:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, response, latency FROM responses WHERE rowid = ?", (int(ids[0]),)
+            ).fetchone()
+            if row is None:
+                return None
+            self._touch(row[0], now)
+            self.semantic_hits += 1
+            self.saved_seconds += row[2] or 0.0
+            return row[1]
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        count, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        while count > self.max_entries or size > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            count -= 1
+            size -= row[1] or 0
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    return os.getenv("LLM_CACHE", "0").lower() in {"1", "true", "yes"}
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide cache configured from env, or ``None`` if disabled."""
+    global _cache
+    if not cache_enabled():
+        return None
+    with _cache_lock:
+        if _cache is None:
+            threshold = os.getenv("LLM_CACHE_SEMANTIC_THRESHOLD")
+            embed_fn = None
+            if threshold:
+                # Shares memory's embedding model and LRU, so a repeated prompt is embedded once
+                from src.memory import cached_embeddings
+
+                embed_fn = lambda text: cached_embeddings([text])[0]  # noqa: E731
+            _cache = ResponseCache(
+                path=os.getenv("LLM_CACHE_PATH", CACHE_PATH),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+                max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024),
+                ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 86400))),
+                semantic_threshold=float(threshold) if threshold else None,
+                embed_fn=embed_fn,
+            )
+        return _cache
+
+
+def cache_stats() -> Dict[str, float]:
+    """Hit/miss counters for the process-wide cache (empty dict if disabled)."""
+    cache = get_response_cache()
+    return cache.stats() if cache else {}
@@ -0,0 +1,169 @@
+"""Council runs as background jobs with an ID, a replayable event log and cancellation.
+
+``POST /runs`` starts a deliberation as an asyncio task and returns at
+once; the run's events are kept in order so any number of clients can
+follow them, reconnect with ``Last-Event-ID`` and pick up where they left
+off. Cancelling a run cancels its task, which closes the in-flight Ollama
+stream (so Ollama stops generating) and frees its admission slot.
+
+Finished runs are kept for ``COUNCIL_RUN_TTL_S`` seconds, at most
+``COUNCIL_RUNS_KEPT`` of them. Like the admission controller, the registry
+lives on the API event loop and is not thread-safe.
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from src.admission import BATCH, AdmissionController
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# astream_council-compatible factory: (prompt) -> async iterator of events
+RunStream = Callable[[str], AsyncIterator[Dict[str, Any]]]
+
+
+def run_ttl_seconds() -> float:
+    return float(os.getenv("COUNCIL_RUN_TTL_S", "3600"))
+
+
+def runs_kept() -> int:
+    return max(1, int(os.getenv("COUNCIL_RUNS_KEPT", "100")))
+
+
+class Run:
+    """One deliberation: status, result and the ordered log of its events."""
+
+    def __init__(self, prompt: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.prompt = prompt
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        # Event ids are 1-based positions in this list
+        self.events: List[Dict[str, Any]] = []
+        self.task: Optional[asyncio.Task] = None
+        self._appended = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def append(self, event: Dict[str, Any]) -> None:
+        self.events.append(event)
+        # Wake every follower, then start a fresh event for the next append
+        self._appended.set()
+        self._appended = asyncio.Event()
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        self.append({"type": "done", "status": status})
+
+    async def follow(self, after: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Yield ``{"id": n, **event}`` for events after id ``after``, live until the run finishes."""
+        position = max(0, after)
+        while True:
+            appended = self._appended
+            while position < len(self.events):
+                position += 1
+                yield {"id": position, **self.events[position - 1]}
+            if self.finished:
+                return
+            await appended.wait()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "prompt": self.prompt,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "events": len(self.events),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class RunRegistry:
+    """Starts runs behind the admission controller and keeps them addressable by ID."""
+
+    def __init__(self, admission: AdmissionController, stream: RunStream) -> None:
+        self.admission = admission
+        self.stream = stream
+        self._runs: Dict[str, Run] = {}
+
+    def get(self, run_id: str) -> Optional[Run]:
+        return self._runs.get(run_id)
+
+    def create(self, prompt: str, priority: int = BATCH) -> Run:
+        """Queue a run and start its task; raises :class:`~src.admission.QueueFull`."""
+        self._evict()
+        ticket = self.admission.submit(priority)
+        run = Run(prompt)
+        self._runs[run.id] = run
+        run.task = asyncio.create_task(self._execute(run, ticket))
+        # A task cancelled before its first step never enters _execute
+        run.task.add_done_callback(lambda _task: self._settle(run, ticket))
+        return run
+
+    def _settle(self, run: Run, ticket) -> None:
+        self.admission.release(ticket)
+        if not run.finished:
+            run.finish(CANCELLED)
+
+    def cancel(self, run_id: str) -> Optional[Run]:
+        """Cancel a queued or running run; finished runs are left as they are."""
+        run = self._runs.get(run_id)
+        if run is not None and not run.finished and run.task is not None:
+            run.task.cancel()
+        return run
+
+    async def cancel_all(self) -> None:
+        """Cancel every unfinished run and wait for their streams to close (shutdown)."""
+        tasks = [run.task for run in self._runs.values() if not run.finished and run.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _execute(self, run: Run, ticket) -> None:
+        try:
+            async for status in self.admission.wait(ticket):
+                run.append(status)
+            run.status = RUNNING
+            run.started_at = time.time()
+            async for event in self.stream(run.prompt):
+                if event["type"] == "result":
+                    run.result = event["result"]
+                else:
+                    run.append(event)
+        except asyncio.CancelledError:
+            run.finish(CANCELLED)
+            return
+        except Exception as e:
+            run.finish(FAILED, str(e))
+            return
+        finally:
+            self.admission.release(ticket)
+        error = (run.result or {}).get("error")
+        run.finish(FAILED if error else SUCCEEDED, error)
+
+    def _evict(self) -> None:
+        cutoff = time.time() - run_ttl_seconds()
+        finished = sorted((run for run in self._runs.values() if run.finished), key=lambda run: run.finished_at)
+        excess = len(self._runs) - runs_kept() + 1
+        for run in finished:
+            if run.finished_at < cutoff or excess > 0:
+                del self._runs[run.id]
+                excess -= 1
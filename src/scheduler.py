@@ -0,0 +1,95 @@
+"""Opt-in concurrent execution for independent council stages.
+
+The default pipeline is strictly sequential so only one generation is
+resident at a time. With ``COUNCIL_EXECUTION_MODE=parallel`` independent
+perspectives (e.g. several critic personas) run concurrently, capped at
+``COUNCIL_MAX_CONCURRENCY`` and optionally spread across ``OLLAMA_HOSTS``.
+"""
+import asyncio
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+SEQUENTIAL = "sequential"
+PARALLEL = "parallel"
+
+
+def execution_mode() -> str:
+    mode = os.getenv("COUNCIL_EXECUTION_MODE", SEQUENTIAL).strip().lower()
+    return PARALLEL if mode == PARALLEL else SEQUENTIAL
+
+
+def max_concurrency() -> int:
+    return max(1, int(os.getenv("COUNCIL_MAX_CONCURRENCY", "2")))
+
+
+class HostRotation:
+    """Round-robin over ``OLLAMA_HOSTS``; yields ``None`` (default host) when unset."""
+
+    def __init__(self, hosts: Optional[Iterable[str]] = None) -> None:
+        if hosts is None:
+            hosts = os.getenv("OLLAMA_HOSTS", "").split(",")
+        self.hosts = [host.strip() for host in hosts if host and host.strip()]
+        self._cycle = itertools.cycle(self.hosts) if self.hosts else None
+        self._lock = threading.Lock()
+
+    def next(self) -> Optional[str]:
+        if self._cycle is None:
+            return None
+        with self._lock:
+            return next(self._cycle)
+
+
+def run_bounded(tasks: List[Callable[[], T]], limit: int) -> List[T]:
+    """Run callables on at most ``limit`` threads; results keep task order.
+
+    The first exception raised by a task is re-raised after all tasks finish.
+    """
+    if limit <= 1 or len(tasks) <= 1:
+        return [task() for task in tasks]
+    with ThreadPoolExecutor(max_workers=min(limit, len(tasks))) as pool:
+        futures = [pool.submit(task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+async def merge_bounded(
+    streams: List[Callable[[], AsyncIterator[T]]], limit: int
+) -> AsyncIterator[T]:
+    """Interleave items from async-iterator factories, at most ``limit`` running at once.
+
+    Items are yielded as soon as any stream produces them. If a stream fails
+    the others are cancelled and the exception propagates to the consumer.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(max(1, limit))
+    done = object()
+
+    async def pump(factory):
+        try:
+            async with semaphore:
+                async for item in factory():
+                    await queue.put((item, None))
+        except Exception as exc:
+            await queue.put((None, exc))
+        finally:
+            await queue.put((done, None))
+
+    tasks = [asyncio.create_task(pump(factory)) for factory in streams]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item, exc = await queue.get()
+            if exc is not None:
+                raise exc
+            if item is done:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -9,6 +9,9 @@ import traceback
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional
 
+from src.model_router import SELF_HEAL_CRITIQUE, ModelRouter
+from src.ollama_llm import ollama_completion
+
 
 @dataclasses.dataclass
 class HealingProposal:
@@ -256,7 +259,15 @@ class HealingOrchestrator:
             f"TESTS: {', '.join(proposal.tests)}\n"
             f"RISKS: {proposal.risks}\n"
         )
+        router = ModelRouter.from_env()
         try:
+            if SELF_HEAL_CRITIQUE in router.models:
+                # A dedicated critique model answers directly instead of convening the council
+                critique = ollama_completion(
+                    [{"role": "user", "content": prompt}],
+                    **router.route(SELF_HEAL_CRITIQUE).completion_kwargs(),
+                )
+                return critique.strip()
             result = self.council_runner(prompt, skip_curator=True, stream=False)
         except Exception:
             return ""
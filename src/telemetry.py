@@ -0,0 +1,314 @@
+"""In-process Prometheus metrics (text exposition format 0.0.4).
+
+A minimal registry of counters, gauges and histograms so the API can serve
+``/metrics`` without an extra dependency. Metric objects are module-level
+and safe to update from worker threads.
+"""
+import functools
+import inspect
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Agent calls take seconds to many minutes on CPU-only hosts
+LLM_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SQLITE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=None) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def labels(self, **labels: str):
+        values = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            child = self._children.get(values)
+            if child is None:
+                child = self._new_child()
+                self._children[values] = child
+            return child
+
+    def _default(self):
+        # Unlabelled metrics use a single child
+        return self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return lines
+
+    def _items(self):
+        with self._lock:
+            return list(self._children.items())
+
+
+class _Value:
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = float(value)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        self._default().inc(amount)
+
+    def samples(self) -> Iterable[str]:
+        for values, child in self._items():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[index] += 1
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = HTTP_BUCKETS,
+        registry=None,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def samples(self) -> Iterable[str]:
+        for values, child in self._items():
+            for bound, count in zip(self.buckets, child.counts):
+                labels = _format_labels(self.labelnames + ("le",), values + (_format_value(bound),))
+                yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {child.count}"
+
+
+class Registry:
+    """Ordered collection of metrics; ``on_collect`` hooks refresh mirrored values."""
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self._hooks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics.append(metric)
+
+    def on_collect(self, hook: Callable[[], None]) -> None:
+        self._hooks.append(hook)
+
+    def render(self) -> str:
+        for hook in self._hooks:
+            try:
+                hook()
+            except Exception:
+                continue
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = Counter(
+    "council_http_requests_total", "HTTP requests by method, route and status.", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "council_http_request_duration_seconds", "Time to produce the HTTP response headers.", ("route",)
+)
+IN_FLIGHT = Gauge("council_deliberations_in_flight", "Curator turns and council runs in progress.", ("kind",))
+QUEUE_DEPTH = Gauge("council_admission_queue_depth", "Deliberations waiting for a free slot.")
+ADMISSION_REJECTED = Counter("council_admission_rejected_total", "Requests rejected because the queue was full.")
+RUNS = Counter("council_runs_total", "Completed runs by kind and outcome.", ("kind", "outcome"))
+AGENT_LATENCY = Histogram(
+    "council_agent_duration_seconds", "Wall time per agent call.", ("agent",), buckets=LLM_BUCKETS
+)
+AGENT_TTFT = Histogram(
+    "council_agent_ttft_seconds", "Time to first token per agent call.", ("agent",), buckets=LLM_BUCKETS
+)
+TOKENS_GENERATED = Counter("council_llm_tokens_generated_total", "Tokens generated by Ollama.", ("agent",))
+PROMPT_TOKENS = Counter("council_llm_prompt_tokens_total", "Prompt tokens evaluated by Ollama.", ("agent",))
+LLM_ERRORS = Counter("council_llm_errors_total", "Failed Ollama completions by failure kind.", ("kind",))
+SQLITE_LATENCY = Histogram(
+    "council_sqlite_query_duration_seconds",
+    "Latency of memory database operations.",
+    ("operation",),
+    buckets=SQLITE_BUCKETS,
+)
+MEMORY_JOBS_PENDING = Gauge("council_memory_jobs_pending", "Memory jobs waiting for the background worker.")
+MEMORY_DB_BYTES = Gauge("council_memory_db_bytes", "Memory database size after the last maintenance pass.")
+MAINTENANCE_LAST_RUN = Gauge(
+    "council_memory_maintenance_last_run_timestamp_seconds", "Unix time the last maintenance pass finished."
+)
+READ_CACHE_LOOKUPS = Counter(
+    "council_memory_read_cache_lookups_total", "Cached memory reads (preferences, summary, messages) by result.", ("result",)
+)
+CACHE_LOOKUPS = Counter("council_response_cache_lookups_total", "Response cache lookups by result.", ("result",))
+CACHE_HIT_RATIO = Gauge("council_response_cache_hit_ratio", "Share of response cache lookups served from cache.")
+
+
+def _collect_cache_stats() -> None:
+    from src.response_cache import cache_stats
+
+    # Lookups are counted as they happen (src/response_cache.py); the ratio is per cache object
+    stats = cache_stats()
+    if stats:
+        CACHE_HIT_RATIO.set(stats["hit_ratio"])
+
+
+REGISTRY.on_collect(_collect_cache_stats)
+
+
+def observe_run(metrics: Dict) -> None:
+    """Feed a run summary from :func:`src.metrics.run_metrics` into the registry."""
+    RUNS.labels(kind=metrics.get("kind", "unknown"), outcome="error" if metrics.get("error") else "ok").inc()
+    for stage in metrics.get("stages", []):
+        agent = stage["stage"]
+        AGENT_LATENCY.labels(agent=agent).observe(stage["total_s"])
+        if stage.get("ttft_s") is not None:
+            AGENT_TTFT.labels(agent=agent).observe(stage["ttft_s"])
+        TOKENS_GENERATED.labels(agent=agent).inc(stage.get("eval_count", 0))
+        PROMPT_TOKENS.labels(agent=agent).inc(stage.get("prompt_eval_count", 0))
+
+
+def deliberations_in_flight() -> int:
+    """Curator turns and council runs currently in progress, across kinds."""
+    return int(sum(child.value for _, child in IN_FLIGHT._items()))
+
+
+def track_in_flight(kind: str):
+    """Decorator counting calls (or async-generator iterations) of ``kind`` in progress."""
+    gauge = IN_FLIGHT.labels(kind=kind)
+
+    def decorate(func):
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def agen_wrapper(*args, **kwargs):
+                gauge.inc()
+                stream = func(*args, **kwargs)
+                try:
+                    async for item in stream:
+                        yield item
+                finally:
+                    await stream.aclose()
+                    gauge.dec()
+            return agen_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            gauge.inc()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                gauge.dec()
+        return wrapper
+
+    return decorate
+
+
+def time_sqlite(operation: str, enabled: Optional[Callable[[], bool]] = None):
+    """Decorator observing SQLITE_LATENCY; ``enabled`` skips no-op calls (persistence off)."""
+    histogram = SQLITE_LATENCY.labels(operation=operation)
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if enabled is not None and not enabled():
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+
+    return decorate
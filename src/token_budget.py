@@ -0,0 +1,157 @@
+"""Per-agent ``max_tokens`` sized from measured throughput and a latency target.
+
+With ``COUNCIL_TARGET_LATENCY_S`` set, each council run gets a token plan
+instead of the global ``LLM_MAX_TOKENS``. A run of the budgeted stages
+is modelled as::
+
+    target = fixed + sum(overhead[stage] + max_tokens[stage] / tokens_per_sec[stage])
+
+Here ``tokens_per_sec`` is a stage's median generation rate over recent
+calls on this host (the last ``COUNCIL_BUDGET_WINDOW`` samples per stage,
+so stages routed to different models get their own rate; stages without
+samples use the median over all of them). ``overhead`` is each
+stage's median time to first token (model load and prompt evaluation).
+``fixed`` is the measured duration of unbudgeted stages such as the Curator.
+The generation time left over is split by each stage's ``budget_weight``,
+converted to tokens at the stage's rate and clamped
+to ``[COUNCIL_MIN_TOKENS, COUNCIL_MAX_TOKENS]``. The plan is recorded in
+the run metrics, and every finished run is fed back through :func:`observe`.
+"""
+import os
+import statistics
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from src.metrics import load_runs
+
+
+def target_latency_seconds() -> Optional[float]:
+    """End-to-end council target (``0`` or unset keeps ``LLM_MAX_TOKENS``)."""
+    seconds = float(os.getenv("COUNCIL_TARGET_LATENCY_S", "0") or 0)
+    return seconds if seconds > 0 else None
+
+
+def min_tokens() -> int:
+    return max(1, int(os.getenv("COUNCIL_MIN_TOKENS", "128")))
+
+
+def max_tokens() -> int:
+    return max(min_tokens(), int(os.getenv("COUNCIL_MAX_TOKENS", "4096")))
+
+
+def window() -> int:
+    return max(1, int(os.getenv("COUNCIL_BUDGET_WINDOW", "20")))
+
+
+def _base_stage(name: str) -> str:
+    # Fanned-out variants ("Critic (skeptic)") share their stage's samples
+    return name.split(" (", 1)[0]
+
+
+def _median(values: Iterable[float]) -> Optional[float]:
+    values = list(values)
+    return statistics.median(values) if values else None
+
+
+class ThroughputModel:
+    """Recent per-stage samples of generation rate, time to first token and duration."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        # stage -> (tokens_per_sec, ttft_s, total_s)
+        self._samples: Dict[str, Deque[Tuple[float, float, float]]] = defaultdict(lambda: deque(maxlen=size))
+        self._lock = threading.Lock()
+
+    def observe(self, metrics: Dict[str, Any]) -> None:
+        """Add the stage records of one run (see :func:`src.metrics.run_metrics`)."""
+        with self._lock:
+            for stage in metrics.get("stages", []):
+                # Cache hits and cut-short calls say nothing about this host's speed
+                if stage.get("cached") or stage.get("truncated") or not stage.get("tokens_per_sec"):
+                    continue
+                self._samples[_base_stage(stage["stage"])].append(
+                    (stage["tokens_per_sec"], stage.get("ttft_s") or 0.0, stage["total_s"])
+                )
+
+    def _column(self, index: int, stage: Optional[str] = None) -> List[float]:
+        with self._lock:
+            groups = [self._samples[stage]] if stage in self._samples else list(self._samples.values())
+            return [sample[index] for group in groups for sample in group]
+
+    def tokens_per_sec(self, stage: Optional[str] = None) -> Optional[float]:
+        """Median generation rate of ``stage`` (of all stages if it has no samples)."""
+        return _median(self._column(0, stage))
+
+    def overhead(self, stage: str) -> float:
+        """Median time to first token of ``stage`` (of all stages if it has no samples)."""
+        return _median(self._column(1, stage)) or 0.0
+
+    def duration(self, stage: str) -> float:
+        with self._lock:
+            samples = list(self._samples.get(stage, ()))
+        return _median(sample[2] for sample in samples) or 0.0
+
+
+def plan(
+    weights: Dict[str, float],
+    target_s: float,
+    model: ThroughputModel,
+    fixed_stages: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """Token plan for stages ``{name: weight}`` to finish within ``target_s`` seconds.
+
+    ``max_tokens`` is empty (stages keep their defaults) until a throughput
+    measurement exists.
+    """
+    decision: Dict[str, Any] = {"target_s": target_s, "max_tokens": {}}
+    rate = model.tokens_per_sec()
+    if not rate:
+        decision["reason"] = "no throughput measurements yet"
+        return decision
+    fixed = sum(model.duration(stage) for stage in fixed_stages)
+    overhead = sum(model.overhead(stage) for stage in weights)
+    generation_s = max(0.0, target_s - fixed - overhead)
+    weight_sum = sum(weights.values()) or 1.0
+    low, high = min_tokens(), max_tokens()
+    rates = {stage: model.tokens_per_sec(stage) for stage in weights}
+    decision.update(
+        tokens_per_sec={stage: round(stage_rate, 2) for stage, stage_rate in rates.items()},
+        fixed_s=round(fixed, 2),
+        overhead_s=round(overhead, 2),
+        generation_s=round(generation_s, 2),
+        max_tokens={
+            stage: int(min(high, max(low, generation_s * weight / weight_sum * rates[stage])))
+            for stage, weight in weights.items()
+        },
+    )
+    return decision
+
+
+_model: Optional[ThroughputModel] = None
+_model_lock = threading.Lock()
+
+
+def get_model() -> ThroughputModel:
+    """Process-wide model, seeded from the recorded council runs on first use."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = ThroughputModel(window())
+            for run in load_runs(limit=window(), kind="council"):
+                _model.observe(run)
+        return _model
+
+
+def observe(metrics: Dict[str, Any]) -> None:
+    # Without a target nothing reads the model; it is seeded from disk once one is set
+    if target_latency_seconds() is not None:
+        get_model().observe(metrics)
+
+
+def council_plan(weights: Dict[str, float], fixed_stages: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+    """Plan for this run, or ``None`` when no latency target is configured."""
+    target = target_latency_seconds()
+    if target is None:
+        return None
+    return plan(weights, target, get_model(), fixed_stages)
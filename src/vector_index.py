@@ -0,0 +1,223 @@
+"""In-memory vector search over fact embeddings.
+
+:class:`ExactIndex` keeps a matrix of L2-normalized float32 rows, so cosine
+similarity against every stored vector is a single matrix-vector product,
+and the top ``k`` are selected with ``argpartition`` rather than a full sort.
+
+:class:`IVFIndex` adds an inverted-file layer for large fact tables: rows
+are bucketed under the nearest of ``nlist`` k-means centroids and a query
+only scores the rows of its ``nprobe`` closest buckets. Raising ``nprobe``
+trades latency for recall (``nprobe == nlist`` is an exact search).
+"""
+import math
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_NO_RESULTS = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+
+
+def normalize_rows(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(unit_rows, keep)``; zero rows are dropped (``keep`` masks the input)."""
+    norms = np.linalg.norm(vectors, axis=1)
+    keep = norms > 0
+    return (vectors[keep] / norms[keep, None]).astype(np.float32, copy=False), keep
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first."""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < scores.size:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def default_nlist(count: int) -> int:
+    """Bucket count for ``count`` rows (about 4 * sqrt(n), the usual IVF rule of thumb)."""
+    return max(1, min(count, int(4 * math.sqrt(count))))
+
+
+def nearest_centroids(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 16384) -> np.ndarray:
+    """Index of the most similar centroid for each row, computed in chunks to bound memory."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    result = np.empty(vectors.shape[0], dtype=np.intp)
+    for start in range(0, vectors.shape[0], chunk):
+        result[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+    return result
+
+
+def train_centroids(
+    unit_vectors: np.ndarray, nlist: int, iterations: int = 10, sample_size: int = 64, seed: int = 0
+) -> np.ndarray:
+    """Spherical k-means on at most ``sample_size`` rows per centroid; returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    count = unit_vectors.shape[0]
+    nlist = max(1, min(nlist, count))
+    sample = unit_vectors
+    if count > nlist * sample_size:
+        sample = unit_vectors[rng.choice(count, nlist * sample_size, replace=False)]
+    centroids = sample[rng.choice(sample.shape[0], nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = nearest_centroids(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        norms = np.linalg.norm(sums, axis=1)
+        filled = norms > 0
+        # Empty buckets keep their previous centroid
+        centroids[filled] = sums[filled] / norms[filled, None]
+    return centroids.astype(np.float32, copy=False)
+
+
+class ExactIndex:
+    """Brute-force cosine search over a growing set of ``(id, vector)`` rows.
+
+    Rows must share one dimension; ``add`` ignores rows of any other
+    dimension and zero vectors (which have no direction to compare). Each
+    row carries a ``weight`` that multiplies its similarity in ``search``.
+    """
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+        self._size = 0
+        # Grown by doubling so incremental adds stay amortized O(rows added)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._weights = np.empty(0, dtype=np.float32)
+        self._matrix = np.empty((0, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[: self._size]
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self._weights[: self._size]
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[: self._size]
+
+    def add(
+        self, ids: Iterable[int], vectors: Iterable[np.ndarray], weights: Optional[Iterable[float]] = None
+    ) -> np.ndarray:
+        """Append rows; returns the positions (into the arguments) of the rows kept."""
+        ids = list(ids)
+        vectors = list(vectors)
+        weights = [1.0] * len(ids) if weights is None else list(weights)
+        positions = np.array([i for i, vector in enumerate(vectors) if len(vector) == self.dim], dtype=np.intp)
+        if not positions.size:
+            return positions
+        unit, keep = normalize_rows(np.stack([vectors[i] for i in positions]).astype(np.float32, copy=False))
+        positions = positions[keep]
+        end = self._size + positions.size
+        self._reserve(end)
+        self._ids[self._size:end] = np.asarray(ids, dtype=np.int64)[positions]
+        self._weights[self._size:end] = np.asarray(weights, dtype=np.float32)[positions]
+        self._matrix[self._size:end] = unit
+        self._size = end
+        return positions
+
+    def _reserve(self, capacity: int) -> None:
+        if capacity <= self._ids.size:
+            return
+        capacity = max(capacity, 2 * self._ids.size, 64)
+        for name in ("_ids", "_weights", "_matrix"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: self._size] = old[: self._size]
+            setattr(self, name, new)
+
+    def _unit_query(self, query) -> Optional[np.ndarray]:
+        query = np.asarray(query, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if query.shape != (self.dim,) or norm == 0:
+            return None
+        return query / norm
+
+    def similarities(self, query) -> Optional[np.ndarray]:
+        """Cosine similarity of ``query`` to every row (``None`` for an unusable query)."""
+        unit = self._unit_query(query)
+        return None if unit is None else self.matrix @ unit
+
+    def search(self, query, k: int, weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(ids, scores)`` of the ``k`` best rows.
+
+        Scores are similarity x row weight, times ``weights`` if given (one
+        extra multiplier per row, e.g. a recency boost).
+        """
+        scores = self.similarities(query)
+        if scores is None:
+            return _NO_RESULTS
+        scores = scores * self.weights
+        if weights is not None:
+            scores *= weights
+        best = top_k(scores, k)
+        return self.ids[best], scores[best]
+
+
+class IVFIndex(ExactIndex):
+    """Inverted-file index: exact scoring restricted to the ``nprobe`` nearest buckets."""
+
+    def __init__(self, dim: int, centroids: np.ndarray, nprobe: int = 16) -> None:
+        super().__init__(dim)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.nprobe = nprobe
+        self._members: List[List[int]] = [[] for _ in range(self.nlist)]
+        self._member_arrays: List[Optional[np.ndarray]] = [None] * self.nlist
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def add(
+        self,
+        ids: Iterable[int],
+        vectors: Iterable[np.ndarray],
+        weights: Optional[Iterable[float]] = None,
+        lists: Optional[Iterable[Optional[int]]] = None,
+    ) -> np.ndarray:
+        """Append rows, bucketed by ``lists`` (e.g. persisted assignments) or their nearest centroid."""
+        start = self._size
+        positions = super().add(ids, vectors, weights)
+        if not positions.size:
+            return positions
+        assigned = np.full(positions.size, -1, dtype=np.intp)
+        if lists is not None:
+            lists = list(lists)
+            for offset, position in enumerate(positions.tolist()):
+                list_id = lists[position]
+                if list_id is not None and 0 <= list_id < self.nlist:
+                    assigned[offset] = list_id
+        missing = np.flatnonzero(assigned < 0)
+        if missing.size:
+            assigned[missing] = nearest_centroids(self._matrix[start + missing], self.centroids)
+        for offset, list_id in enumerate(assigned.tolist()):
+            self._members[list_id].append(start + offset)
+            self._member_arrays[list_id] = None
+        return positions
+
+    def _bucket(self, list_id: int) -> np.ndarray:
+        rows = self._member_arrays[list_id]
+        if rows is None:
+            rows = np.array(self._members[list_id], dtype=np.intp)
+            self._member_arrays[list_id] = rows
+        return rows
+
+    def search(self, query, k: int, weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        unit = self._unit_query(query)
+        if unit is None or not self._size:
+            return _NO_RESULTS
+        probe = top_k(self.centroids @ unit, self.nprobe)
+        rows = np.concatenate([self._bucket(list_id) for list_id in probe])
+        if not rows.size:
+            return _NO_RESULTS
+        scores = (self._matrix[rows] @ unit) * self._weights[rows]
+        if weights is not None:
+            scores *= weights[rows]
+        best = top_k(scores, k)
+        return self._ids[rows[best]], scores[best]
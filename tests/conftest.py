@@ -1,7 +1,15 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_metrics(tmp_path, monkeypatch):
+    # Keep run metrics out of data/metrics.jsonl during tests
+    monkeypatch.setenv("COUNCIL_METRICS_PATH", str(tmp_path / "metrics.jsonl"))
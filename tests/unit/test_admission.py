@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from src.admission import BATCH, INTERACTIVE, AdmissionController, QueueFull
+
+
+def test_submit_admits_up_to_limit_then_queues_then_rejects():
+    controller = AdmissionController(max_active=1, max_queue=1, estimate_s=60)
+
+    first = controller.submit()
+    second = controller.submit()
+
+    assert first.admitted.is_set()
+    assert not second.admitted.is_set()
+    assert controller.status(second) == {"type": "queued", "position": 1, "eta_s": 60}
+    with pytest.raises(QueueFull) as excinfo:
+        controller.submit()
+    assert excinfo.value.retry_after == 120
+
+    controller.release(first)
+
+    assert second.admitted.is_set()
+    assert controller.active == 1
+    assert controller.queued == 0
+
+
+def test_interactive_requests_jump_ahead_of_batch():
+    controller = AdmissionController(max_active=1, max_queue=4)
+    running = controller.submit()
+    batch = controller.submit(BATCH)
+    interactive = controller.submit(INTERACTIVE)
+
+    assert controller.position(interactive) == 1
+    assert controller.position(batch) == 2
+
+    controller.release(running)
+
+    assert interactive.admitted.is_set()
+    assert not batch.admitted.is_set()
+
+
+def test_wait_reports_position_changes_until_admitted():
+    async def scenario():
+        controller = AdmissionController(max_active=1, max_queue=4)
+        first = controller.submit()
+        second = controller.submit()
+        third = controller.submit()
+        updates = []
+
+        async def waiter():
+            async for status in controller.wait(third):
+                updates.append(status["position"])
+
+        task = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        controller.release(first)
+        await asyncio.sleep(0)
+        controller.release(second)
+        await task
+        return updates, third.admitted.is_set()
+
+    updates, admitted = asyncio.run(scenario())
+
+    assert updates == [2, 1]
+    assert admitted
+
+
+def test_releasing_a_queued_ticket_leaves_the_queue():
+    controller = AdmissionController(max_active=1, max_queue=2)
+    running = controller.submit()
+    queued = controller.submit()
+
+    controller.release(queued)
+    controller.release(queued)  # idempotent
+
+    assert controller.queued == 0
+    assert controller.active == 1
+    controller.release(running)
+    assert controller.active == 0
+
+
+def test_slot_records_run_duration_for_eta():
+    async def scenario():
+        controller = AdmissionController(max_active=1, max_queue=1)
+        async with controller.slot():
+            assert controller.active == 1
+        return controller
+
+    controller = asyncio.run(scenario())
+
+    assert controller.active == 0
+    assert controller.estimate_s is not None
+
+
+def test_chat_endpoint_returns_429_when_queue_is_full(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from src.api import main
+
+    controller = AdmissionController(max_active=1, max_queue=0)
+    monkeypatch.setattr(main, "admission", controller)
+    controller.submit()
+
+    response = TestClient(main.app).get("/chat", params={"message": "hi"})
+
+    assert response.status_code == 429
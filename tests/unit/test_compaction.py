@@ -0,0 +1,51 @@
+from src import compaction
+from src.pipeline import Pipeline, PipelineRun, StageSpec
+
+_RESEARCH = "\n".join(
+    ["Thesis: local inference needs smaller prompts."]
+    + [f"Filler sentence number {i} wanders off topic without much substance." for i in range(40)]
+    + ["1. Compact prompts between agents", "2. Cache the shared prefix for prompts"]
+)
+
+
+def test_compact_keeps_key_points_within_limit():
+    compacted = compaction.compact(_RESEARCH, limit=400)
+
+    assert len(compacted) <= 400
+    assert compacted.startswith("Thesis: local inference needs smaller prompts.")
+    assert "1. Compact prompts between agents" in compacted
+    assert compacted.endswith(f"[compacted from {len(_RESEARCH)} chars]")
+    assert compaction.compact(_RESEARCH, limit=400) == compacted
+    assert compaction.compact("short", limit=400) == "short"
+
+
+def test_pipeline_passes_compacted_inputs_downstream():
+    stages = [
+        StageSpec(name="A", role="first", build_prompt=lambda outputs: "a"),
+        StageSpec(name="B", role="second", build_prompt=lambda outputs: outputs["A"], depends_on=("A",)),
+        StageSpec(name="C", role="third", build_prompt=lambda outputs: outputs["A"], depends_on=("A", "B")),
+    ]
+    prompts = []
+
+    def completion(messages, **kwargs):
+        prompts.append(messages[-1]["content"])
+        return _RESEARCH if len(prompts) == 1 else "ok"
+
+    run = PipelineRun()
+    outputs = Pipeline(stages, compact=lambda text: text[:100]).run(run, completion)
+
+    assert prompts[1] == prompts[2] == _RESEARCH[:100]
+    assert outputs["A"] == _RESEARCH
+    assert run.compaction["uses"] == 3
+    assert run.compaction["chars_in"] - run.compaction["chars_out"] == 2 * (len(_RESEARCH) - 100)
+
+
+def test_report_estimates_tokens_and_time_saved():
+    usage = [{"prompt_chars": 4000, "prompt_eval_count": 1000}, {"prompt_chars": 10, "cached": True}]
+    stages = [{"prompt_tokens_per_sec": 50.0}, {"prompt_tokens_per_sec": None}]
+
+    report = compaction.report({"uses": 2, "chars_in": 6000, "chars_out": 2000, "seconds": 0.002}, usage, stages)
+
+    assert report["prompt_tokens_saved_est"] == 1000
+    assert report["prompt_eval_s_saved_est"] == 20.0
+    assert report["inputs_compacted"] == 2
@@ -0,0 +1,48 @@
+import pytest
+
+from src import embeddings
+
+
+def test_float32_round_trip_is_zero_copy():
+    blob, scale = embeddings.encode([0.5, -1.25, 3.0])
+
+    decoded = embeddings.decode(blob)
+
+    assert scale is None
+    assert len(blob) == 12
+    assert not decoded.flags.owndata
+    assert decoded.tolist() == [0.5, -1.25, 3.0]
+
+
+def test_int8_round_trip_within_quantization_error():
+    vector = [0.1, -0.5, 0.25, 1.0]
+
+    blob, scale = embeddings.encode(vector, embeddings.INT8)
+    decoded = embeddings.decode(blob, embeddings.INT8, scale)
+
+    assert len(blob) == len(vector)
+    assert decoded.tolist() == pytest.approx(vector, abs=scale)
+
+
+def test_int8_zero_vector():
+    blob, scale = embeddings.encode([0.0, 0.0], embeddings.INT8)
+
+    assert embeddings.decode(blob, embeddings.INT8, scale).tolist() == [0.0, 0.0]
+
+
+def test_storage_dtype_defaults_to_float32(monkeypatch):
+    monkeypatch.setenv("MEMORY_EMBEDDING_DTYPE", "bogus")
+    assert embeddings.storage_dtype() == embeddings.FLOAT32
+    monkeypatch.setenv("MEMORY_EMBEDDING_DTYPE", "INT8")
+    assert embeddings.storage_dtype() == embeddings.INT8
+
+
+def test_embedding_cache_is_lru_per_model():
+    cache = embeddings.EmbeddingCache(max_entries=2)
+    cache.put_many("m", {"a": [1.0], "b": [2.0]})
+    assert cache.get_many("m", ["a"]) == {"a": [1.0]}
+    cache.put_many("m", {"c": [3.0]})
+
+    assert cache.get_many("m", ["a", "b", "c"]) == {"a": [1.0], "c": [3.0]}
+    assert cache.get_many("other", ["a"]) == {}
+    assert (cache.hits, cache.misses) == (3, 2)
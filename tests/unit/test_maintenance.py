@@ -0,0 +1,61 @@
+import importlib
+
+import pytest
+
+from src import maintenance
+
+
+@pytest.fixture
+def memory_module(tmp_path, monkeypatch):
+    monkeypatch.setenv("COUNCIL_ENABLE_PERSISTENCE", "true")
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    import src.memory as memory
+    memory = importlib.reload(memory)
+    memory.init_db()
+    return memory
+
+
+def _add_old_messages(memory_module, count):
+    with memory_module._cursor() as c:
+        c.executemany(
+            "INSERT INTO messages (session_id, timestamp, role, content) VALUES (NULL, '2000-01-01T00:00:00', 'user', ?)",
+            (("x" * 500,) for _ in range(count)),
+        )
+
+
+def test_maintenance_prunes_in_batches_and_reclaims_space(memory_module, monkeypatch):
+    monkeypatch.setenv("MEMORY_PRUNE_BATCH", "100")
+    monkeypatch.setenv("MEMORY_VACUUM_PAGES", "10")
+    _add_old_messages(memory_module, 1000)
+    size_before = memory_module.database_stats()["db_bytes"]
+
+    stats = maintenance.run_maintenance(budget_s=30, is_busy=lambda: False)
+
+    assert stats["messages_pruned"] == 980
+    assert stats["complete"] is True
+    assert stats["pages_freed"] > 0
+    assert stats["db_bytes"] < size_before
+    assert memory_module.database_stats()["auto_vacuum"] == "incremental"
+    assert maintenance.last_run() == stats
+    assert not maintenance.is_due()
+
+
+def test_maintenance_yields_to_deliberations(memory_module):
+    _add_old_messages(memory_module, 100)
+
+    stats = maintenance.run_maintenance(budget_s=30, is_busy=lambda: True)
+
+    assert (stats["messages_pruned"], stats["complete"]) == (0, False)
+    # An interrupted pass is picked up again on the next tick
+    assert maintenance.is_due()
+
+
+def test_scheduler_waits_for_idle_moment(memory_module):
+    busy = [True]
+    scheduler = maintenance.MaintenanceScheduler(is_busy=lambda: busy[0])
+
+    assert scheduler.tick() is None
+    busy[0] = False
+    assert scheduler.tick()["complete"] is True
+    # Not due again until the interval has passed
+    assert scheduler.tick() is None
@@ -62,8 +62,13 @@ def test_message_persistence(memory_module):
     ]
 
 
+def _embed_with(monkeypatch, module, embed):
+    monkeypatch.setattr(module, "_embed_texts", lambda texts, model: [embed(text) for text in texts])
+
+
 def test_fact_storage_and_embeddings(memory_module, monkeypatch):
-    monkeypatch.setattr(memory_module, "_get_embedding", lambda text: [0.1, 0.2])
+    monkeypatch.setenv("MEMORY_USE_EMBEDDINGS", "1")
+    _embed_with(monkeypatch, memory_module, lambda text: [0.1, 0.2])
     session_id = memory_module.save_session("p", "a", "r")
     memory_module.save_facts(session_id, [" fact one ", "", "fact two"])
 
@@ -164,3 +169,252 @@ def test_concurrent_access(memory_module):
         assert cur.fetchone()[0] >= 10
     finally:
         conn.close()
+
+
+def test_connection_is_reused_per_thread_with_wal(memory_module):
+    conn = memory_module._connect()
+    memory_module.add_message("user", "hello")
+    memory_module.get_recent_messages(1)
+
+    assert memory_module._connect() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other = executor.submit(memory_module._connect).result()
+    assert other is not conn
+
+
+def test_reader_not_blocked_by_open_write_transaction(memory_module):
+    memory_module.add_message("user", "committed")
+    writer = sqlite3.connect(memory_module.DB_PATH)
+    try:
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute(
+            "INSERT INTO messages (session_id, timestamp, role, content) VALUES (NULL, '', 'user', 'pending')"
+        )
+        assert memory_module.get_recent_messages(5) == [{"role": "user", "content": "committed"}]
+    finally:
+        writer.rollback()
+        writer.close()
+
+
+def test_failed_write_rolls_back(memory_module):
+    with pytest.raises(sqlite3.OperationalError):
+        with memory_module._cursor() as c:
+            c.execute(
+                "INSERT INTO messages (session_id, timestamp, role, content) VALUES (NULL, '', 'user', 'x')"
+            )
+            c.execute("INSERT INTO missing_table VALUES (1)")
+    assert memory_module.get_recent_messages(5) == []
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_embeddings_stored_as_blobs_and_retrieved(memory_module, monkeypatch, dtype):
+    monkeypatch.setenv("MEMORY_EMBEDDING_DTYPE", dtype)
+    monkeypatch.setenv("MEMORY_USE_EMBEDDINGS", "1")
+    vectors = {"cats purr": [1.0, 0.0], "dogs bark": [0.0, 1.0], "query": [0.9, 0.1]}
+    _embed_with(monkeypatch, memory_module, lambda text: vectors[text])
+    session_id = memory_module.save_session("p", "a", "r")
+    memory_module.save_facts(session_id, ["cats purr", "dogs bark"])
+
+    conn = sqlite3.connect(memory_module.DB_PATH)
+    try:
+        stored = conn.execute("SELECT typeof(vector), dtype FROM embeddings").fetchall()
+    finally:
+        conn.close()
+
+    assert stored == [("blob", dtype), ("blob", dtype)]
+    assert memory_module.get_relevant_facts("query", limit=1) == ["cats purr"]
+
+
+def test_embedding_retrieval_searches_beyond_recent_facts(memory_module, monkeypatch):
+    monkeypatch.setenv("MEMORY_USE_EMBEDDINGS", "1")
+    _embed_with(
+        monkeypatch, memory_module, lambda text: [1.0, 0.0] if text in {"needle", "query"} else [0.0, 1.0]
+    )
+    session_id = memory_module.save_session("p", "a", "r")
+    memory_module.save_facts(session_id, ["needle"])
+    assert memory_module.get_relevant_facts("query", limit=1) == ["needle"]
+
+    # Newer facts are picked up incrementally; the old match is still found
+    memory_module.save_facts(session_id, [f"filler {i}" for i in range(250)])
+    assert memory_module.get_relevant_facts("query", limit=1) == ["needle"]
+    assert len(memory_module.get_relevant_facts("query", limit=5)) == 5
+
+
+def test_fact_ann_index_is_persisted_and_updated_incrementally(memory_module, monkeypatch):
+    import importlib
+
+    monkeypatch.setenv("MEMORY_USE_EMBEDDINGS", "1")
+    monkeypatch.setenv("MEMORY_ANN_MIN_FACTS", "40")
+    monkeypatch.setenv("MEMORY_ANN_NLIST", "4")
+    monkeypatch.setenv("MEMORY_ANN_NPROBE", "4")
+    axes = {f"fact {i}": [1.0 if j == i % 4 else 0.0 for j in range(4)] for i in range(60)}
+    axes["query"] = [0.0, 0.0, 1.0, 0.1]
+    axes["late"] = [0.0, 0.0, 1.0, 0.1]
+    _embed_with(monkeypatch, memory_module, axes.get)
+    session_id = memory_module.save_session("p", "a", "r")
+    memory_module.save_facts(session_id, [f"fact {i}" for i in range(60)])
+
+    # Crossing MEMORY_ANN_MIN_FACTS trains and stores the IVF centroids
+    assert memory_module.get_relevant_facts("query", limit=1) == ["fact 58"]
+    conn = sqlite3.connect(memory_module.DB_PATH)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM fact_index_centroids").fetchone()[0] == 4
+        assert conn.execute("SELECT COUNT(*) FROM embeddings WHERE list_id IS NULL").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+    # New facts get their bucket at save time
+    memory_module.save_facts(session_id, ["late"])
+    conn = sqlite3.connect(memory_module.DB_PATH)
+    try:
+        row = conn.execute(
+            "SELECT e.list_id FROM embeddings e JOIN facts f ON f.id = e.fact_id WHERE f.fact = 'late'"
+        ).fetchone()
+    finally:
+        conn.close()
+    assert row[0] is not None
+
+    # A fresh process loads the stored centroids instead of retraining
+    reloaded = importlib.reload(memory_module)
+    _embed_with(monkeypatch, reloaded, axes.get)
+    monkeypatch.setattr(reloaded, "train_centroids", lambda *args, **kwargs: pytest.fail("retrained"))
+    assert reloaded.get_relevant_facts("query", limit=1) == ["late"]
+
+
+def test_rebuild_fact_index(memory_module, monkeypatch):
+    monkeypatch.setenv("MEMORY_USE_EMBEDDINGS", "1")
+    _embed_with(monkeypatch, memory_module, lambda text: [1.0, float(len(text))])
+    session_id = memory_module.save_session("p", "a", "r")
+    memory_module.save_facts(session_id, ["a", "bb", "ccc", "dddd"])
+
+    assert memory_module.rebuild_fact_index(nlist=2) == {2: 2}
+    assert memory_module.get_relevant_facts("dddd", limit=1) == ["dddd"]
+
+
+def test_embeddings_are_batched_cached_and_computed_outside_the_write_lock(memory_module, monkeypatch):
+    monkeypatch.setenv("MEMORY_USE_EMBEDDINGS", "1")
+    batches = []
+
+    def embed_texts(texts, model):
+        batches.append(list(texts))
+        # Another writer must not be blocked while facts are being embedded
+        conn = sqlite3.connect(memory_module.DB_PATH, timeout=0)
+        try:
+            with conn:
+                conn.execute("INSERT INTO preferences (key, value) VALUES (?, 'x')", (f"k{len(batches)}",))
+        finally:
+            conn.close()
+        return [[1.0, float(len(text))] for text in texts]
+
+    monkeypatch.setattr(memory_module, "_embed_texts", embed_texts)
+    session_id = memory_module.save_session("p", "a", "r")
+    memory_module.save_facts(session_id, ["alpha", "beta", "alpha"])
+    memory_module.get_relevant_facts("alpha", limit=1)
+    memory_module.get_relevant_facts("alpha", limit=1)
+    memory_module.get_relevant_facts("gamma", limit=1)
+
+    assert batches == [["alpha", "beta"], ["gamma"]]
+
+
+def test_keyword_retrieval_uses_full_text_index(memory_module):
+    session_id = memory_module.save_session("p", "a", "r")
+    memory_module.save_facts(session_id, ["Quantized models run faster on CPUs"])
+    memory_module.save_facts(session_id, [f"filler note {i}" for i in range(300)])
+    memory_module.save_facts(session_id, ["Quantization is mentioned in passing, with models"])
+
+    # Stemmed match over the whole history, not just the newest 200 facts
+    assert memory_module.get_relevant_facts("quantize model cpu", limit=1) == ["Quantized models run faster on CPUs"]
+    assert memory_module.get_relevant_facts('"; DROP TABLE facts; --') == []
+
+
+def test_search_memory_tracks_inserts_and_deletes(memory_module):
+    session_id = memory_module.save_session("p", "a", "r")
+    memory_module.add_message("user", "tell me about sqlite pragmas", session_id=session_id)
+    memory_module.save_summary(session_id, "Discussed sqlite tuning")
+    assert sorted(memory_module.search_memory("sqlite")) == [
+        ("messages", "tell me about sqlite pragmas"),
+        ("summaries", "Discussed sqlite tuning"),
+    ]
+
+    with memory_module._cursor() as c:
+        c.execute("DELETE FROM messages")
+    assert memory_module.search_memory("sqlite", sources=("messages",)) == []
+
+
+def test_hybrid_search_fuses_vector_and_keyword_rankings(memory_module, monkeypatch):
+    monkeypatch.setenv("MEMORY_USE_EMBEDDINGS", "1")
+    monkeypatch.setenv("MEMORY_HYBRID_SEARCH", "1")
+    vectors = {"gpu drivers": [1.0, 0.0], "cpu threads": [0.7, 0.7], "cpu": [1.0, 0.1]}
+    _embed_with(monkeypatch, memory_module, vectors.get)
+    session_id = memory_module.save_session("p", "a", "r")
+    memory_module.save_facts(session_id, ["gpu drivers", "cpu threads"])
+
+    # The keyword match outranks the slightly closer vector match once fused
+    assert memory_module.get_relevant_facts("cpu", limit=2) == ["cpu threads", "gpu drivers"]
+    assert memory_module.reciprocal_rank_fusion([[1, 2], [2, 3]]) == [2, 1, 3]
+
+
+def test_read_cache_serves_curator_turns_without_queries(memory_module, monkeypatch):
+    loads = []
+    for name in ("_load_recent_messages", "_load_preferences", "_load_latest_summary"):
+        original = getattr(memory_module, name)
+        monkeypatch.setattr(
+            memory_module, name, lambda *args, _name=name, _original=original: loads.append(_name) or _original(*args)
+        )
+    memory_module.set_preference("tone", "brief")
+
+    def curator_turn(i):
+        history = memory_module.get_recent_messages(6)
+        prefs = memory_module.get_all_preferences()
+        memory_module.add_message("user", f"question {i}")
+        memory_module.add_message("assistant", f"answer {i}")
+        return history, prefs
+
+    curator_turn(0)
+    loads.clear()
+    history, prefs = curator_turn(1)
+    prefs["tone"] = "mutated"
+    history, prefs = curator_turn(2)
+
+    assert loads == []
+    assert prefs == {"tone": "brief"}
+    assert [m["content"] for m in history][-2:] == ["question 1", "answer 1"]
+    assert len(memory_module.get_recent_messages(6)) == 6
+
+
+def test_load_between_insert_and_write_through_does_not_duplicate(memory_module, monkeypatch):
+    memory_module.add_message("user", "first")
+    update = memory_module._read_cache.update
+
+    def update_after_concurrent_load(source, apply):
+        # Another thread misses the cache after the insert commits and
+        # stores a window that already holds the new message
+        memory_module.get_recent_messages(6)
+        update(source, apply)
+
+    monkeypatch.setattr(memory_module._read_cache, "update", update_after_concurrent_load)
+    memory_module.add_message("assistant", "second")
+
+    assert [m["content"] for m in memory_module.get_recent_messages(6)] == ["first", "second"]
+
+
+def test_read_cache_sees_writers_and_other_processes(memory_module):
+    assert memory_module.get_latest_summary() == ""
+    assert memory_module.get_preference("tone") == ""
+
+    memory_module.save_summary(1, "first summary")
+    memory_module.set_preference("tone", "brief")
+    assert memory_module.get_latest_summary() == "first summary"
+    assert memory_module.get_preference("tone") == "brief"
+
+    # A write from another connection (e.g. the CLI next to the API)
+    conn = sqlite3.connect(memory_module.DB_PATH)
+    try:
+        with conn:
+            conn.execute("UPDATE preferences SET value = 'verbose' WHERE key = 'tone'")
+    finally:
+        conn.close()
+    assert memory_module.get_all_preferences() == {"tone": "verbose"}
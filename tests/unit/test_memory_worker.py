@@ -0,0 +1,109 @@
+import importlib
+import sqlite3
+
+import pytest
+
+from src import memory_worker
+
+
+@pytest.fixture
+def memory_module(tmp_path, monkeypatch):
+    monkeypatch.setenv("COUNCIL_ENABLE_PERSISTENCE", "true")
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    import src.memory as memory
+    memory = importlib.reload(memory)
+    memory.init_db()
+    return memory
+
+
+@pytest.fixture
+def handled(monkeypatch):
+    calls = []
+    monkeypatch.setattr(memory_worker, "_handlers", {"record": calls.append})
+    return calls
+
+
+def _job_rows(memory_module):
+    conn = sqlite3.connect(memory_module.DB_PATH)
+    try:
+        return conn.execute("SELECT kind, status, attempts FROM memory_jobs ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_jobs_run_in_order_and_are_deleted(memory_module, handled):
+    memory_module.enqueue_memory_job("record", {"n": 1})
+    memory_module.enqueue_memory_job("record", {"n": 2})
+
+    assert memory_worker.MemoryWorker().run_pending() == 2
+    assert handled == [{"n": 1}, {"n": 2}]
+    assert _job_rows(memory_module) == []
+
+
+def test_llm_jobs_wait_while_a_deliberation_is_in_flight(memory_module, monkeypatch, handled):
+    monkeypatch.setattr(memory_worker, "_llm_kinds", {"generate"})
+    memory_worker._handlers["generate"] = handled.append
+    memory_module.enqueue_memory_job("generate", {"n": 1})
+    memory_module.enqueue_memory_job("record", {"n": 2})
+    busy = [True]
+    worker = memory_worker.MemoryWorker(is_busy=lambda: busy[0])
+
+    assert worker.run_pending() == 1
+    assert handled == [{"n": 2}]
+    assert _job_rows(memory_module) == [("generate", "pending", 0)]
+
+    busy[0] = False
+    assert worker.run_pending() == 1
+    assert handled == [{"n": 2}, {"n": 1}]
+
+
+def test_failed_jobs_are_retried_then_kept(memory_module, monkeypatch):
+    monkeypatch.setenv("MEMORY_JOB_MAX_ATTEMPTS", "2")
+    monkeypatch.setattr(memory_worker, "_handlers", {"boom": lambda payload: 1 / 0})
+    memory_module.enqueue_memory_job("boom", {})
+
+    assert memory_worker.MemoryWorker().run_pending() == 2
+    assert _job_rows(memory_module) == [("boom", "failed", 2)]
+
+
+def test_job_of_crashed_worker_resumes_after_lease(memory_module, handled):
+    memory_module.enqueue_memory_job("record", {"n": 1})
+    # Claimed by a worker that then died without finishing
+    assert memory_module.claim_memory_job(lease_seconds=600)[1] == "record"
+    assert memory_module.claim_memory_job(lease_seconds=600) is None
+
+    assert memory_module.claim_memory_job(lease_seconds=-1)[3] == 2
+
+
+def test_background_worker_drains_submitted_jobs(memory_module, monkeypatch, handled):
+    monkeypatch.setattr(memory_worker, "_worker", None)
+    try:
+        assert memory_worker.submit("record", {"n": 1}) is True
+        assert memory_worker.get_worker().drain(timeout=5)
+    finally:
+        memory_worker._worker.stop(timeout=5)
+    assert handled == [{"n": 1}]
+    assert _job_rows(memory_module) == []
+
+
+def test_full_queue_runs_jobs_inline(memory_module, monkeypatch, handled):
+    monkeypatch.setenv("MEMORY_QUEUE_MAX", "0")
+
+    assert memory_worker.submit("record", {"n": 1}) is False
+    assert handled == [{"n": 1}]
+    assert _job_rows(memory_module) == []
+
+
+def test_council_queues_snapshot_after_saving_session(memory_module, monkeypatch):
+    from src import council
+
+    submitted = []
+    monkeypatch.setattr(memory_worker, "submit", lambda kind, payload: submitted.append((kind, payload)))
+    monkeypatch.setattr(council, "save_session", memory_module.save_session)
+    monkeypatch.setattr(council, "add_message", memory_module.add_message)
+
+    council._persist_session({"prompt": "p", "final_answer": "a", "reasoning_summary": "r"})
+
+    assert [kind for kind, _ in submitted] == ["snapshot"]
+    assert submitted[0][1]["final_answer"] == "a"
+    assert len(memory_module.get_recent_messages(5)) == 2
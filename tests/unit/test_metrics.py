@@ -0,0 +1,89 @@
+import json
+
+from src import council, metrics
+from src.metrics import StageClock, load_runs, run_metrics
+
+
+def test_stage_clock_combines_timing_with_ollama_stats():
+    clock = StageClock("Researcher")
+    clock.start()
+    clock.token()
+    clock.finish()
+    usage = [{
+        "prompt_eval_count": 100,
+        "eval_count": 50,
+        "prompt_eval_duration": 500_000_000,
+        "eval_duration": 2_000_000_000,
+        "load_duration": 0,
+    }]
+
+    metrics = clock.to_dict(usage)
+
+    assert metrics["stage"] == "Researcher"
+    assert metrics["tokens_per_sec"] == 25.0
+    assert metrics["prompt_tokens_per_sec"] == 200.0
+    assert metrics["ttft_s"] is not None
+    assert metrics["queue_wait_s"] >= 0
+    assert metrics["cached"] is False
+
+
+def test_non_streaming_ttft_falls_back_to_ollama_durations():
+    clock = StageClock("Judge")
+    clock.start()
+    clock.finish()
+
+    metrics = clock.to_dict([{"prompt_eval_duration": 250_000_000, "load_duration": 250_000_000}])
+
+    assert metrics["ttft_s"] == 0.5
+
+
+def test_run_metrics_names_slowest_stage():
+    stages = [
+        {"stage": "A", "total_s": 1.0, "prompt_eval_count": 1, "eval_count": 2},
+        {"stage": "B", "total_s": 3.0, "prompt_eval_count": 3, "eval_count": 4},
+    ]
+
+    metrics = run_metrics("council", stages, 4.0)
+
+    assert metrics["slowest_stage"] == "B"
+    assert metrics["eval_count"] == 6
+
+
+def test_council_run_returns_and_records_metrics(monkeypatch, tmp_path):
+    path = tmp_path / "runs.jsonl"
+    monkeypatch.setenv("COUNCIL_METRICS_PATH", str(path))
+    monkeypatch.setattr(council, "get_latest_summary", lambda *args, **kwargs: "")
+    monkeypatch.setattr(council, "get_relevant_facts", lambda *args, **kwargs: [])
+    monkeypatch.setattr(council, "get_all_preferences", lambda *args, **kwargs: {})
+    monkeypatch.setattr(council, "ENABLE_PERSISTENCE", False)
+
+    def fake_completion(messages, *args, usage=None, **kwargs):
+        usage.append({"prompt_eval_count": 10, "eval_count": 5, "eval_duration": 1_000_000_000})
+        return "Final Answer:\n1. a\n2. b\n3. c\n4. d\nRationale: ok"
+
+    monkeypatch.setattr(council, "ollama_completion", fake_completion)
+
+    result = council.run_council_sync("Test prompt")
+
+    stages = [stage["stage"] for stage in result["metrics"]["stages"]]
+    assert stages == ["Curator", "Researcher", "Critic", "Planner", "Judge"]
+    assert result["metrics"]["eval_count"] == 25
+    assert result["metrics"]["stages"][1]["tokens_per_sec"] == 5.0
+    assert load_runs() == [json.loads(path.read_text().splitlines()[0])]
+    assert load_runs()[0]["kind"] == "council"
+
+
+def test_metrics_file_is_rotated_and_read_from_the_tail(monkeypatch, tmp_path):
+    path = tmp_path / "runs.jsonl"
+    monkeypatch.setenv("COUNCIL_METRICS_PATH", str(path))
+    monkeypatch.setenv("COUNCIL_METRICS_MAX_MB", str(1000 / 1024 / 1024))
+    # Small blocks so runs straddle block boundaries
+    monkeypatch.setattr(metrics, "_TAIL_CHUNK", 7)
+
+    for i in range(40):
+        metrics.record_run({"kind": "council" if i % 2 else "curator", "i": i, "stages": []})
+
+    assert path.stat().st_size < 1100
+    assert path.with_name("runs.jsonl.1").exists()
+    assert [run["i"] for run in load_runs(limit=3, kind="council")] == [35, 37, 39]
+    assert [run["i"] for run in load_runs()] == list(range(load_runs()[0]["i"], 40))
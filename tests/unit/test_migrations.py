@@ -0,0 +1,97 @@
+import sqlite3
+
+from src import embeddings
+from src.migrations import SCHEMA_VERSION, migrate, schema_version
+
+
+def _indexes(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+
+
+def test_fresh_database_is_migrated_to_latest(tmp_path):
+    conn = sqlite3.connect(tmp_path / "memory.db")
+
+    assert migrate(conn) == SCHEMA_VERSION
+    assert {"idx_embeddings_fact_id", "idx_messages_timestamp"}.issubset(_indexes(conn))
+    # Re-running is a no-op
+    assert migrate(conn) == SCHEMA_VERSION
+
+
+def test_legacy_database_is_upgraded_in_place(tmp_path):
+    conn = sqlite3.connect(tmp_path / "memory.db")
+    # Schema as created by init_db before migrations existed (user_version 0)
+    conn.execute("CREATE TABLE facts (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id INTEGER, timestamp TEXT, fact TEXT)")
+    conn.execute("CREATE TABLE embeddings (fact_id INTEGER, vector TEXT)")
+    conn.execute("INSERT INTO facts (session_id, timestamp, fact) VALUES (1, '2024-01-01', 'kept')")
+    conn.execute("INSERT INTO embeddings (fact_id, vector) VALUES (1, '[0.1]')")
+    conn.commit()
+    assert schema_version(conn) == 0
+
+    migrate(conn)
+
+    assert schema_version(conn) == SCHEMA_VERSION
+    assert conn.execute("SELECT fact FROM facts").fetchall() == [("kept",)]
+    plan = " ".join(
+        row[-1]
+        for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT f.id FROM facts f JOIN embeddings e ON e.fact_id = f.id "
+            "ORDER BY f.id DESC LIMIT 10"
+        )
+    )
+    assert "idx_embeddings_fact_id" in plan
+
+
+def test_migrate_stops_at_target(tmp_path):
+    conn = sqlite3.connect(tmp_path / "memory.db")
+
+    assert migrate(conn, target=1) == 1
+    assert "idx_messages_timestamp" not in _indexes(conn)
+
+
+def test_json_embeddings_are_packed_to_float32(tmp_path):
+    conn = sqlite3.connect(tmp_path / "memory.db")
+    migrate(conn, target=2)
+    conn.execute("INSERT INTO embeddings (fact_id, vector) VALUES (1, '[0.5, 0.25]')")
+    conn.execute("INSERT INTO embeddings (fact_id, vector) VALUES (2, 'not json')")
+    conn.commit()
+
+    migrate(conn)
+
+    rows = conn.execute("SELECT fact_id, vector, dtype FROM embeddings").fetchall()
+    assert len(rows) == 1
+    fact_id, blob, dtype = rows[0]
+    assert (fact_id, dtype) == (1, "float32")
+    assert list(embeddings.decode(blob)) == [0.5, 0.25]
+    assert "idx_embeddings_fact_id" in _indexes(conn)
+
+
+def test_full_text_index_covers_rows_written_before_it(tmp_path):
+    conn = sqlite3.connect(tmp_path / "memory.db")
+    migrate(conn, target=4)
+    conn.execute("INSERT INTO facts (session_id, timestamp, fact) VALUES (1, '', 'older fact about llamas')")
+    conn.execute("INSERT INTO summaries (session_id, timestamp, summary) VALUES (1, '', 'llamas summary')")
+    conn.commit()
+
+    migrate(conn)
+
+    assert conn.execute("SELECT fact FROM facts_fts WHERE facts_fts MATCH 'llama'").fetchall() == [
+        ("older fact about llamas",)
+    ]
+    assert conn.execute("SELECT COUNT(*) FROM summaries_fts WHERE summaries_fts MATCH 'llamas'").fetchone()[0] == 1
+
+
+def test_summaries_index_follows_updates_and_deletes_one_duplicate(tmp_path):
+    conn = sqlite3.connect(tmp_path / "memory.db")
+    migrate(conn)
+    for _ in range(2):
+        conn.execute("INSERT INTO summaries (session_id, timestamp, summary) VALUES (1, '', 'llamas summary')")
+    conn.execute("INSERT INTO summaries (session_id, timestamp, summary) VALUES (1, '', 'alpacas summary')")
+
+    def matches(term):
+        return conn.execute("SELECT COUNT(*) FROM summaries_fts WHERE summaries_fts MATCH ?", (term,)).fetchone()[0]
+
+    conn.execute("DELETE FROM summaries WHERE rowid = 1")
+    assert matches("llamas") == 1
+
+    conn.execute("UPDATE summaries SET summary = 'vicunas summary' WHERE summary = 'alpacas summary'")
+    assert (matches("alpacas"), matches("vicunas")) == (0, 1)
@@ -0,0 +1,73 @@
+from src import council
+from src.model_router import ModelRouter
+
+
+def test_roles_map_to_configured_models_and_options(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL", "ollama/phi3:mini")
+    monkeypatch.setenv("COUNCIL_MODEL_JUDGE", "llama3:8b")
+    monkeypatch.setenv("COUNCIL_MODEL_OPTIONS_JUDGE", '{"num_ctx": 8192}')
+
+    router = ModelRouter.from_env()
+
+    assert router.route("judge").completion_kwargs() == {"model": "llama3:8b", "num_ctx": 8192}
+    assert router.route("curator").completion_kwargs() == {"model": "phi3:mini"}
+
+
+def test_supported_options_drop_fields_the_client_does_not_have(monkeypatch, capsys):
+    monkeypatch.setenv("COUNCIL_MODEL_OPTIONS_JUDGE", '{"num_ctx": 8192, "num_batch": 8}')
+
+    route = ModelRouter.from_env().route("judge")
+
+    assert route.supported_options({"model", "num_ctx", "temperature"}) == {"num_ctx": 8192}
+    assert "num_batch" in capsys.readouterr().out
+    # Raw Ollama calls still get every option
+    assert route.completion_kwargs()["num_batch"] == 8
+
+
+def test_client_kwargs_let_options_override_defaults_but_not_the_model(monkeypatch):
+    monkeypatch.setenv("COUNCIL_MODEL_JUDGE", "llama3:8b")
+    monkeypatch.setenv("COUNCIL_MODEL_OPTIONS_JUDGE", '{"model": "other", "timeout": 30, "num_batch": 8}')
+    defaults = {"model": "phi3", "base_url": "http://ollama:11434", "timeout": 600}
+
+    kwargs = ModelRouter.from_env().route("judge").client_kwargs(defaults, {"model", "base_url", "timeout"})
+
+    assert kwargs == {"model": "llama3:8b", "base_url": "http://ollama:11434", "timeout": 30}
+
+
+def test_plan_unloads_a_model_only_when_the_run_is_done_with_it():
+    router = ModelRouter({"curator": "mini", "judge": "big", "memory_snapshot": "mini"}, default="phi3")
+    roles = ["curator", "researcher", "critic", "planner", "judge", "memory_snapshot"]
+
+    planned = router.plan(roles)
+
+    # "mini" is needed again for the snapshot, "phi3" and "big" are not
+    assert [route.keep_alive for route in planned] == [None, None, None, "0", "0", None]
+    assert [route.model for route in planned] == ["mini", "phi3", "phi3", "phi3", "big", "mini"]
+    assert all(route.keep_alive is None for route in ModelRouter(grouping=False).plan(roles))
+
+
+def test_council_stages_use_routed_models(monkeypatch):
+    monkeypatch.setenv("COUNCIL_MODEL_CURATOR", "phi3:mini")
+    monkeypatch.setenv("COUNCIL_MODEL_JUDGE", "llama3:8b")
+    monkeypatch.setattr(council, "_load_memory_context", lambda prompt: {})
+    monkeypatch.setattr(council, "shared_prefix", lambda prompt, context: "")
+    monkeypatch.setattr(council, "record_run", lambda metrics: None)
+    monkeypatch.setattr(council, "ENABLE_PERSISTENCE", False)
+    calls = []
+
+    def fake_completion(messages, **kwargs):
+        calls.append((kwargs["model"], kwargs.get("keep_alive")))
+        return "Final Answer:\n1. a\n2. b\n3. c\n4. d\nRationale: ok"
+
+    monkeypatch.setattr(council, "ollama_completion", fake_completion)
+
+    result = council.run_council_sync("Test prompt")
+
+    assert calls == [
+        ("phi3:mini", "0"),
+        ("phi3", None),
+        ("phi3", None),
+        ("phi3", "0"),
+        ("llama3:8b", None),
+    ]
+    assert result["metrics"]["stages"][-1]["model"] == "llama3:8b"
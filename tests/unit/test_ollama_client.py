@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.ollama_client import (
+    AsyncOllamaClient,
+    OllamaClient,
+    OllamaError,
+    aclose_async_clients,
+    get_async_client,
+)
+
+
+def _client(handler):
+    return OllamaClient("http://ollama.test", transport=httpx.MockTransport(handler))
+
+
+def test_chat_posts_native_payload():
+    seen = []
+
+    def handler(request):
+        seen.append(json.loads(request.content))
+        return httpx.Response(200, json={"message": {"content": "hi"}, "eval_count": 3, "done": True})
+
+    client = _client(handler)
+    data = client.chat([{"role": "user", "content": "ping"}], options={"num_predict": 5}, keep_alive="5m")
+
+    assert data["message"]["content"] == "hi"
+    assert seen[0]["stream"] is False
+    assert seen[0]["options"] == {"num_predict": 5}
+    assert seen[0]["keep_alive"] == "5m"
+
+
+def test_chat_stream_yields_ndjson_chunks():
+    lines = [
+        {"message": {"content": "Hel"}, "done": False},
+        {"message": {"content": "lo"}, "done": False},
+        {"message": {"content": ""}, "done": True, "eval_count": 2},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\n"
+
+    client = _client(lambda request: httpx.Response(200, content=body.encode("utf-8")))
+    chunks = list(client.chat_stream([{"role": "user", "content": "ping"}]))
+
+    assert [c["message"]["content"] for c in chunks] == ["Hel", "lo", ""]
+    assert chunks[-1]["eval_count"] == 2
+
+
+def test_chat_stream_closed_before_iterating_releases_the_response():
+    closed = []
+
+    class Body(httpx.SyncByteStream):
+        def __iter__(self):
+            yield b'{"message": {"content": "Hel"}, "done": false}\n'
+
+        def close(self):
+            closed.append(True)
+
+    client = _client(lambda request: httpx.Response(200, stream=Body()))
+    stream = client.chat_stream([{"role": "user", "content": "ping"}])
+    stream.close()
+
+    assert closed == [True]
+
+
+def test_http_errors_raise_ollama_error():
+    client = _client(lambda request: httpx.Response(404, json={"error": "model 'x' not found"}))
+    with pytest.raises(OllamaError, match="not found"):
+        client.chat([{"role": "user", "content": "ping"}], model="x")
+    with pytest.raises(OllamaError, match="not found"):
+        client.chat_stream([{"role": "user", "content": "ping"}], model="x")
+
+
+def test_embed_returns_vector():
+    client = _client(lambda request: httpx.Response(200, json={"embedding": [0.1, 0.2]}))
+    assert client.embed("fact") == [0.1, 0.2]
+
+
+def test_embed_batch_uses_one_request():
+    seen = []
+
+    def handler(request):
+        seen.append((request.url.path, json.loads(request.content)))
+        return httpx.Response(200, json={"embeddings": [[0.1], [0.2]]})
+
+    assert _client(handler).embed_batch(["a", "b"], model="m") == [[0.1], [0.2]]
+    assert seen == [("/api/embed", {"model": "m", "input": ["a", "b"]})]
+
+
+def test_embed_batch_falls_back_without_batch_endpoint():
+    def handler(request):
+        if request.url.path == "/api/embed":
+            return httpx.Response(404, text="404 page not found")
+        return httpx.Response(200, json={"embedding": [len(json.loads(request.content)["prompt"])]})
+
+    assert _client(handler).embed_batch(["a", "bb"]) == [[1], [2]]
+
+
+def test_async_client_chat_and_stream():
+    lines = [{"message": {"content": "a"}}, {"message": {"content": "b"}, "done": True}]
+    body = "\n".join(json.dumps(line) for line in lines).encode("utf-8")
+
+    async def handler(request):
+        payload = json.loads(request.content)
+        if payload["stream"]:
+            return httpx.Response(200, content=body)
+        return httpx.Response(200, json={"message": {"content": "whole"}})
+
+    async def scenario():
+        client = AsyncOllamaClient("http://ollama.test", transport=httpx.MockTransport(handler))
+        try:
+            data = await client.chat([{"role": "user", "content": "ping"}])
+            stream = await client.chat_stream([{"role": "user", "content": "ping"}])
+            chunks = [chunk["message"]["content"] async for chunk in stream]
+        finally:
+            await client.aclose()
+        return data, chunks
+
+    data, chunks = asyncio.run(scenario())
+    assert data["message"]["content"] == "whole"
+    assert chunks == ["a", "b"]
+
+
+def test_get_async_client_is_shared_per_loop():
+    async def scenario():
+        first = get_async_client("http://ollama.test")
+        second = get_async_client("http://ollama.test/")
+        await aclose_async_clients()
+        return first is second
+
+    assert asyncio.run(scenario())
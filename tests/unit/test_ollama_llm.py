@@ -10,8 +10,107 @@ def test_ollama_completion_wraps_errors(monkeypatch):
         raise ValueError("boom")
 
     monkeypatch.setattr(
-        ollama_llm, "litellm", SimpleNamespace(completion=raise_error)
+        ollama_llm, "get_client", lambda host=None: SimpleNamespace(chat=raise_error)
     )
 
     with pytest.raises(RuntimeError, match="Ollama completion failed"):
         ollama_llm.ollama_completion([{"role": "user", "content": "ping"}])
+
+
+def test_ollama_completion_maps_kwargs_to_options(monkeypatch):
+    captured = {}
+
+    def fake_chat(messages, **kwargs):
+        captured.update(kwargs)
+        return {"message": {"role": "assistant", "content": "pong"}}
+
+    monkeypatch.setattr(
+        ollama_llm, "get_client", lambda host=None: SimpleNamespace(chat=fake_chat)
+    )
+
+    result = ollama_llm.ollama_completion(
+        [{"role": "user", "content": "ping"}],
+        model="ollama/phi3",
+        max_tokens=12,
+        temperature=0.1,
+    )
+
+    assert result == "pong"
+    assert captured["model"] == "phi3"
+    assert captured["options"] == {"temperature": 0.1, "num_predict": 12}
+
+
+def test_ollama_completion_records_usage_and_keep_alive(monkeypatch):
+    captured = {}
+
+    def fake_chat(messages, **kwargs):
+        captured.update(kwargs)
+        return {
+            "message": {"role": "assistant", "content": "pong"},
+            "prompt_eval_count": 7,
+            "eval_count": 3,
+        }
+
+    monkeypatch.setenv("OLLAMA_KEEP_ALIVE", "30m")
+    monkeypatch.setattr(
+        ollama_llm, "get_client", lambda host=None: SimpleNamespace(chat=fake_chat)
+    )
+    usage = []
+    messages = [
+        {"role": "system", "content": "shared"},
+        {"role": "user", "content": "ping"},
+    ]
+
+    ollama_llm.ollama_completion(messages, usage=usage)
+
+    assert captured["keep_alive"] == "30m"
+    assert "usage" not in captured["options"]
+    assert usage[0]["prefix"] == "shared"
+    assert usage[0]["prompt_eval_count"] == 7
+    assert usage[0]["eval_count"] == 3
+
+
+def test_closing_stream_early_closes_ollama_response(monkeypatch):
+    closed = []
+    # Held elsewhere (like a pooled connection), so garbage collection cannot close it
+    responses = []
+
+    def fake_chat_stream(messages, **kwargs):
+        def chunks():
+            try:
+                while True:
+                    yield {"message": {"content": "tok"}}
+            finally:
+                closed.append(True)
+        responses.append(chunks())
+        return responses[-1]
+
+    monkeypatch.setattr(
+        ollama_llm, "get_client", lambda host=None: SimpleNamespace(chat_stream=fake_chat_stream)
+    )
+
+    stream = ollama_llm.ollama_completion([{"role": "user", "content": "ping"}], stream=True)
+    assert next(stream) == "tok"
+    stream.close()
+
+    assert closed == [True]
+
+
+def test_closing_stream_before_first_chunk_closes_ollama_response(monkeypatch):
+    class FakeStream:
+        closed = False
+
+        def __iter__(self):
+            return iter([{"message": {"content": "tok"}}])
+
+        def close(self):
+            self.closed = True
+
+    response = FakeStream()
+    monkeypatch.setattr(
+        ollama_llm, "get_client", lambda host=None: SimpleNamespace(chat_stream=lambda messages, **kwargs: response)
+    )
+
+    ollama_llm.ollama_completion([{"role": "user", "content": "ping"}], stream=True).close()
+
+    assert response.closed
@@ -1,4 +1,7 @@
+import asyncio
+
 from src import council
+from src.cancellation import CancellationToken
 
 
 def _stub_memory(monkeypatch):
@@ -47,3 +50,193 @@ def test_run_council_sync_calls_agents_in_order(monkeypatch):
     assert result["agents"][1]["output"] == "Researcher response."
     assert result["agents"][2]["output"] == "Critic response."
     assert result["agents"][3]["output"] == "Planner response."
+
+
+def _fake_async_stream(responses, calls):
+    async def fake_completion_async(messages, stream=False, **kwargs):
+        calls.append(messages[-1]["content"])
+        text = responses[len(calls) - 1]
+
+        async def chunks():
+            for word in text.split(" "):
+                yield word + " "
+
+        return chunks() if stream else text
+
+    return fake_completion_async
+
+
+def test_run_council_async_matches_sync_pipeline(monkeypatch):
+    _stub_memory(monkeypatch)
+    calls = []
+    responses = [
+        "Researcher response.",
+        "Critic response.",
+        "Planner response.",
+        "Final Answer:\n1. One\n2. Two\n3. Three\n4. Four\nRationale: ok",
+    ]
+    monkeypatch.setattr(council, "ollama_completion_async", _fake_async_stream(responses, calls))
+
+    result = asyncio.run(council.run_council_async("Test prompt", skip_curator=True))
+
+    assert len(calls) == 4
+    assert "Researcher response." in calls[1]
+    assert [agent["name"] for agent in result["agents"]] == [
+        "Curator",
+        "Researcher",
+        "Critic",
+        "Planner",
+        "Judge",
+    ]
+    assert result["final_answer"].startswith("1. One")
+    assert result["reasoning_summary"] == "ok"
+
+
+def test_astream_council_emits_token_events_per_agent(monkeypatch):
+    _stub_memory(monkeypatch)
+    responses = ["Curator says hi", "R out", "C out", "P out", "Final Answer: done Rationale: ok"]
+    monkeypatch.setattr(council, "ollama_completion_async", _fake_async_stream(responses, []))
+
+    async def collect():
+        return [event async for event in council.astream_council("Test prompt")]
+
+    events = asyncio.run(collect())
+
+    boundaries = [(e["type"], e["agent"]) for e in events if e["type"] in {"agent", "agent_done"}]
+    assert boundaries[:2] == [("agent", "Curator"), ("agent_done", "Curator")]
+    assert boundaries[-2:] == [("agent", "Judge"), ("agent_done", "Judge")]
+    curator_tokens = [e["content"] for e in events if e["type"] == "content" and e["agent"] == "Curator"]
+    assert curator_tokens == ["Curator ", "says ", "hi "]
+    assert events[-1]["type"] == "result"
+    assert events[-1]["result"]["agents"][1]["output"] == "R out "
+
+
+def test_run_council_async_reports_failing_stage(monkeypatch):
+    _stub_memory(monkeypatch)
+
+    async def failing_completion_async(messages, *args, **kwargs):
+        if "Critic agent" in messages[-1]["content"]:
+            raise RuntimeError("boom")
+
+        async def chunks():
+            yield "ok"
+
+        return chunks()
+
+    monkeypatch.setattr(council, "ollama_completion_async", failing_completion_async)
+
+    result = asyncio.run(council.run_council_async("Test prompt", skip_curator=True))
+
+    assert result == {"error": "Critic failed: boom"}
+
+
+def test_parallel_mode_fans_out_critic_personas(monkeypatch):
+    _stub_memory(monkeypatch)
+    monkeypatch.setenv("COUNCIL_EXECUTION_MODE", "parallel")
+    monkeypatch.setenv("COUNCIL_CRITIC_PERSONAS", "contrarian,rigor")
+    calls = []
+
+    def fake_completion(messages, *args, **kwargs):
+        suffix = messages[-1]["content"]
+        calls.append(suffix)
+        if "Critic agent" in suffix:
+            return "rigor critique" if "correctness" in suffix else "contrarian critique"
+        if "Planner agent" in suffix:
+            return "plan"
+        if "Judge" in suffix:
+            return "Final Answer:\n1. a\n2. b\n3. c\n4. d\nRationale: ok"
+        return "research"
+
+    monkeypatch.setattr(council, "ollama_completion", fake_completion)
+
+    result = council.run_council_sync("Test prompt", skip_curator=True)
+
+    assert len(calls) == 5
+    critic_output = result["agents"][2]["output"]
+    assert "[contrarian critic]\ncontrarian critique" in critic_output
+    assert "[rigor critic]\nrigor critique" in critic_output
+    planner_call = next(call for call in calls if "Planner agent" in call)
+    assert "rigor critique" in planner_call
+
+
+def test_astream_council_parallel_critics_emit_persona_events(monkeypatch):
+    _stub_memory(monkeypatch)
+    monkeypatch.setenv("COUNCIL_EXECUTION_MODE", "parallel")
+    monkeypatch.setenv("COUNCIL_CRITIC_PERSONAS", "contrarian,rigor")
+    responses = ["R out", "C1 out", "C2 out", "P out", "Final Answer: done Rationale: ok"]
+    monkeypatch.setattr(council, "ollama_completion_async", _fake_async_stream(responses, []))
+
+    async def collect():
+        return [event async for event in council.astream_council("Test prompt", skip_curator=True)]
+
+    events = asyncio.run(collect())
+
+    started = [e["agent"] for e in events if e["type"] == "agent"]
+    assert started == ["Researcher", "Critic (contrarian)", "Critic (rigor)", "Planner", "Judge"]
+    result = events[-1]["result"]
+    assert result["agents"][2]["name"] == "Critic"
+    assert "[rigor critic]" in result["agents"][2]["output"]
+
+
+def test_deadline_degrades_to_judge_synthesis(monkeypatch):
+    _stub_memory(monkeypatch)
+    now = [0.0]
+    token = CancellationToken(budget_s=100, reserve_s=40, clock=lambda: now[0])
+    calls = []
+    responses = [
+        "Researcher response.",
+        "Critic response cut short.",
+        "Final Answer:\n1. One\n2. Two\n3. Three\n4. Four\nRationale: partial",
+    ]
+    fake_stream = _fake_async_stream(responses, calls)
+
+    async def slow_completion(messages, stream=False, **kwargs):
+        # Each request takes 30s of the 100s budget
+        now[0] += 30
+        return await fake_stream(messages, stream=stream, **kwargs)
+
+    monkeypatch.setattr(council, "ollama_completion_async", slow_completion)
+
+    result = asyncio.run(council.run_council_async("Test prompt", skip_curator=True, token=token))
+
+    assert result["interrupted"] == {"Critic": "truncated", "Planner": "skipped"}
+    assert [agent["name"] for agent in result["agents"]] == ["Curator", "Researcher", "Critic", "Judge"]
+    assert result["agents"][2]["output"] == "Critic "
+    assert council._NOT_REACHED in calls[2]
+    assert result["final_answer"].startswith("1. One")
+    assert result["metrics"]["stop_reason"] == "deadline"
+
+
+def test_run_with_a_truncated_judge_is_not_persisted(monkeypatch):
+    _stub_memory(monkeypatch)
+    monkeypatch.setattr(council, "ENABLE_PERSISTENCE", True)
+    persisted = []
+    monkeypatch.setattr(council, "_persist_session", persisted.append)
+    now = [0.0]
+    token = CancellationToken(budget_s=100, reserve_s=40, clock=lambda: now[0])
+    responses = ["Researcher response.", "Critic response.", "Final Answer:\n1. One\n2. Two"]
+    fake_stream = _fake_async_stream(responses, [])
+
+    async def slow_completion(messages, stream=False, **kwargs):
+        # The third request (the Judge) starts past the deadline
+        now[0] += 35
+        return await fake_stream(messages, stream=stream, **kwargs)
+
+    monkeypatch.setattr(council, "ollama_completion_async", slow_completion)
+
+    result = asyncio.run(council.run_council_async("Test prompt", skip_curator=True, token=token))
+
+    assert result["interrupted"]["Judge"] == "truncated"
+    assert persisted == []
+
+
+def test_cancelled_run_returns_error_without_calls(monkeypatch):
+    _stub_memory(monkeypatch)
+    token = CancellationToken()
+    token.cancel()
+    monkeypatch.setattr(council, "ollama_completion", lambda *args, **kwargs: 1 / 0)
+
+    result = council.run_council_sync("Test prompt", skip_curator=True, token=token)
+
+    assert result["error"] == "Council stopped (cancelled) before any stage produced output"
+    assert set(result["interrupted"]) == {"Researcher", "Critic", "Planner", "Judge"}
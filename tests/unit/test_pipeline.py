@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from src.agents import Agent
+from src.cancellation import CancellationToken
+from src.pipeline import Pipeline, PipelineRun, StageAgent, StageError, StageSpec
+
+
+def _stages():
+    return [
+        StageSpec(name="A", role="first", build_prompt=lambda outputs: "prompt a", max_tokens=10),
+        StageSpec(
+            name="B",
+            role="second",
+            build_prompt=lambda outputs: f"after {outputs['A']}",
+            depends_on=("A",),
+            postprocess=str.upper,
+        ),
+    ]
+
+
+def test_pipeline_runs_stages_in_order_with_spec_options():
+    calls = []
+
+    def completion(messages, **kwargs):
+        calls.append((messages, kwargs))
+        return f"out{len(calls)}"
+
+    run = PipelineRun(prefix="shared")
+    outputs = Pipeline(_stages()).run(run, completion)
+
+    assert outputs == {"A": "out1", "B": "OUT2"}
+    assert calls[0][0][0] == {"role": "system", "content": "shared"}
+    assert calls[0][1]["max_tokens"] == 10
+    assert calls[1][0][1]["content"] == "after out1"
+    assert [metrics["stage"] for metrics in run.metrics] == ["A", "B"]
+    assert isinstance(StageAgent(_stages()[0], completion, run), Agent)
+
+
+def test_pipeline_rejects_missing_dependency():
+    with pytest.raises(ValueError, match="missing output"):
+        Pipeline(_stages()[1:]).run(PipelineRun(), lambda messages, **kwargs: "x")
+
+
+def test_stage_failure_names_stage_and_retries_before_output():
+    attempts = []
+
+    def flaky(messages, **kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("transient")
+        return "ok"
+
+    outputs = Pipeline(_stages(), retries=1).run(PipelineRun(), flaky)
+    assert outputs["A"] == "ok"
+
+    def broken(messages, **kwargs):
+        raise RuntimeError("boom")
+
+    with pytest.raises(StageError, match="A failed: boom"):
+        Pipeline(_stages(), retries=2).run(PipelineRun(), broken)
+
+
+def test_async_stream_is_closed_when_consumer_cancels():
+    closed = []
+
+    async def completion(messages, stream=False, **kwargs):
+        async def chunks():
+            try:
+                while True:
+                    yield "tok"
+                    await asyncio.sleep(0)
+            finally:
+                closed.append(True)
+
+        return chunks()
+
+    async def consume():
+        events = Pipeline(_stages()).astream(PipelineRun(), completion)
+        async for event in events:
+            if event["type"] == "content":
+                break
+        await events.aclose()
+
+    asyncio.run(consume())
+    assert closed == [True]
+
+
+def test_fan_out_runs_variants_only_in_parallel_mode():
+    spec = StageSpec(
+        name="Critic",
+        role="challenge",
+        build_prompt=lambda outputs: "single",
+        fan_out=lambda outputs: {"x": "variant x", "y": "variant y"},
+    )
+
+    def completion(messages, **kwargs):
+        return messages[-1]["content"].upper()
+
+    sequential = Pipeline([spec]).run(PipelineRun(), completion)
+    parallel = Pipeline([spec], parallel=True, max_concurrency=2).run(PipelineRun(), completion)
+
+    assert sequential == {"Critic": "SINGLE"}
+    assert parallel == {"Critic": "[x]\nVARIANT X\n\n[y]\nVARIANT Y"}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadline_truncates_stage_skips_rest_and_runs_final_stage():
+    clock = _Clock()
+    token = CancellationToken(budget_s=100, reserve_s=20, clock=clock)
+    final = StageSpec(
+        name="C",
+        role="final",
+        build_prompt=lambda outputs: f"summarize {outputs['A']} / {outputs.get('B', 'none')}",
+        depends_on=("A", "B"),
+        final=True,
+    )
+    calls = []
+
+    def completion(messages, stream=False, **kwargs):
+        calls.append((messages[-1]["content"], kwargs.get("timeout")))
+
+        def chunks():
+            if messages[-1]["content"] != "prompt a":
+                yield "verdict"
+                return
+            for chunk in "abcde":
+                clock.now += 30
+                yield chunk
+
+        return chunks()
+
+    run = PipelineRun(token=token)
+    outputs = Pipeline(_stages() + [final]).run(run, completion, stream=True)
+
+    # A stops at the ordinary deadline (80s), B never starts, C uses the reserve
+    assert outputs == {"A": "abc", "C": "verdict"}
+    assert calls[1] == ("summarize abc / none", 10)
+    assert run.interrupted == {"A": "truncated", "B": "skipped"}
+    assert run.stop_reason == "deadline"
+    assert run.metrics[0]["truncated"] is True
+
+
+def test_cancelled_token_stops_every_stage():
+    token = CancellationToken()
+    token.cancel()
+    run = PipelineRun(token=token)
+
+    outputs = Pipeline(_stages()).run(run, lambda messages, **kwargs: pytest.fail("no call expected"))
+
+    assert outputs == {}
+    assert run.interrupted == {"A": "skipped", "B": "skipped"}
+    assert run.stop_reason == "cancelled"
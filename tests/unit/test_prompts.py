@@ -0,0 +1,56 @@
+from src import council
+from src.prompts import prefix_reuse_report, shared_prefix
+
+
+CONTEXT = {
+    "memory_block": "Earlier summary.",
+    "facts_block": "- fact",
+    "preferences_block": "- tone: terse",
+}
+
+
+def test_shared_prefix_contains_context_and_prompt():
+    prefix = shared_prefix("Test prompt", CONTEXT)
+
+    assert prefix == shared_prefix("Test prompt", dict(CONTEXT))
+    for block in CONTEXT.values():
+        assert block in prefix
+    assert prefix.endswith("Prompt: Test prompt")
+
+
+def test_council_agents_share_identical_prefix(monkeypatch):
+    monkeypatch.setattr(council, "get_latest_summary", lambda *args, **kwargs: "Earlier summary.")
+    monkeypatch.setattr(council, "get_relevant_facts", lambda *args, **kwargs: ["fact"])
+    monkeypatch.setattr(council, "get_all_preferences", lambda *args, **kwargs: {})
+    monkeypatch.setattr(council, "ENABLE_PERSISTENCE", False)
+    calls = []
+
+    def fake_completion(messages, *args, **kwargs):
+        calls.append(messages)
+        return "Final Answer:\n1. a\n2. b\n3. c\n4. d\nRationale: ok"
+
+    monkeypatch.setattr(council, "ollama_completion", fake_completion)
+
+    result = council.run_council_sync("Test prompt", skip_curator=True)
+
+    prefixes = {messages[0]["content"] for messages in calls}
+    assert len(calls) == 4
+    assert len(prefixes) == 1
+    assert all(messages[0]["role"] == "system" for messages in calls)
+    assert all("Earlier summary." not in messages[1]["content"] for messages in calls)
+    assert result["prompt_cache"]["calls"] == 0
+
+
+def test_prefix_reuse_report_estimates_saved_tokens():
+    usage = [
+        {"prefix": "p", "prompt_chars": 1000, "prompt_eval_count": 250, "cached": False},
+        {"prefix": "p", "prompt_chars": 1200, "prompt_eval_count": 60, "cached": False},
+        {"prefix": "", "prompt_chars": 100, "prompt_eval_count": 25, "cached": False},
+    ]
+
+    report = prefix_reuse_report(usage)
+
+    assert report["calls"] == 2
+    assert report["prompt_eval_tokens"] == 310
+    assert report["estimated_prompt_tokens"] == 550
+    assert report["estimated_tokens_saved"] == 240
@@ -0,0 +1,29 @@
+from src.read_cache import ReadCache
+
+
+def test_load_racing_a_write_is_not_cached():
+    cache = ReadCache()
+
+    def stale_load():
+        # A writer invalidates while this load is still reading the old value
+        cache.invalidate("prefs")
+        return {"tone": "old"}
+
+    assert cache.get("prefs", None, stale_load) == {"tone": "old"}
+    assert cache.get("prefs", None, lambda: {"tone": "new"}) == {"tone": "new"}
+    assert cache.get("prefs", None, lambda: {"tone": "unused"}) == {"tone": "new"}
+
+
+def test_external_version_change_drops_everything():
+    cache = ReadCache()
+    cache.sync(1)
+    cache.get("a", 1, lambda: "a1")
+    cache.update("a", lambda key, value: value + "!")
+    assert cache.get("a", 1, lambda: "reloaded") == "a1!"
+
+    cache.absorb(2)
+    cache.sync(2)
+    assert cache.get("a", 1, lambda: "reloaded") == "a1!"
+    cache.sync(3)
+    assert cache.get("a", 1, lambda: "reloaded") == "reloaded"
+    assert (cache.hits, cache.misses) == (2, 2)
@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+
+from src import ollama_llm
+from src import response_cache
+from src.response_cache import ResponseCache
+
+MESSAGES = [{"role": "user", "content": "Plan  a\ntest suite"}]
+
+
+def _cache(tmp_path, **kwargs):
+    return ResponseCache(path=str(tmp_path / "cache.db"), **kwargs)
+
+
+def test_exact_hit_ignores_whitespace_and_counts(tmp_path):
+    cache = _cache(tmp_path)
+    assert cache.get("phi3", MESSAGES, 0.7, 100) is None
+    cache.put("phi3", MESSAGES, 0.7, 100, "answer", latency=2.5)
+
+    same_prompt = [{"role": "user", "content": "Plan a test suite "}]
+    assert cache.get("phi3", same_prompt, 0.7, 100) == "answer"
+    assert cache.get("phi3", MESSAGES, 0.7, 200) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["saved_seconds"] == 2.5
+    assert stats["entries"] == 1
+
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, ttl_seconds=10)
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    cache.put("phi3", MESSAGES, 0.7, 100, "answer")
+    now[0] += 11
+    assert cache.get("phi3", MESSAGES, 0.7, 100) is None
+
+
+def test_lru_eviction_by_entry_count(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, max_entries=2)
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+
+    def prompt(text):
+        return [{"role": "user", "content": text}]
+
+    cache.put("phi3", prompt("a"), 0.7, 100, "A")
+    now[0] += 1
+    cache.put("phi3", prompt("b"), 0.7, 100, "B")
+    now[0] += 1
+    assert cache.get("phi3", prompt("a"), 0.7, 100) == "A"  # "b" is now least recent
+    now[0] += 1
+    cache.put("phi3", prompt("c"), 0.7, 100, "C")
+
+    assert cache.get("phi3", prompt("b"), 0.7, 100) is None
+    assert cache.get("phi3", prompt("a"), 0.7, 100) == "A"
+    assert cache.stats()["entries"] == 2
+
+
+def test_semantic_tier_reuses_near_duplicate(tmp_path):
+    vectors = {"alpha": [1.0, 0.0], "alpha!": [0.99, 0.05], "beta": [0.0, 1.0]}
+
+    def embed(text):
+        return vectors[text.split(": ", 1)[1]]
+
+    cache = _cache(tmp_path, semantic_threshold=0.95, embed_fn=embed)
+    cache.put("phi3", [{"role": "user", "content": "alpha"}], 0.7, 100, "cached")
+
+    assert cache.get("phi3", [{"role": "user", "content": "alpha!"}], 0.7, 100) == "cached"
+    assert cache.get("phi3", [{"role": "user", "content": "beta"}], 0.7, 100) is None
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_semantic_tier_stays_within_a_system_prefix_and_embeds_once(tmp_path):
+    embedded = []
+    vectors = {"critique it": [1.0, 0.0], "critique it!": [0.99, 0.05]}
+
+    def embed(text):
+        embedded.append(text)
+        return vectors[text.split(": ", 1)[1]]
+
+    def messages(prefix, suffix):
+        return [{"role": "system", "content": prefix}, {"role": "user", "content": suffix}]
+
+    cache = _cache(tmp_path, semantic_threshold=0.95, embed_fn=embed)
+    lookup = cache.lookup("phi3", messages("session A", "critique it"), 0.7, 100)
+    assert lookup.response is None
+    cache.put("phi3", messages("session A", "critique it"), 0.7, 100, "critique", embedding=lookup.embedding)
+
+    # Only the agent-specific part is embedded, and only once for the miss and the store
+    assert embedded == ["user: critique it"]
+    assert cache.get("phi3", messages("session A", "critique it!"), 0.7, 100) == "critique"
+    assert cache.get("phi3", messages("session B", "critique it!"), 0.7, 100) is None
+
+
+def test_ollama_completion_serves_cache_hits(tmp_path, monkeypatch):
+    cache = _cache(tmp_path)
+    calls = []
+
+    def fake_chat(messages, **kwargs):
+        calls.append(messages)
+        return {"message": {"content": "fresh"}}
+
+    monkeypatch.setattr(ollama_llm, "get_response_cache", lambda: cache)
+    monkeypatch.setattr(ollama_llm, "get_client", lambda host=None: SimpleNamespace(chat=fake_chat))
+
+    first = ollama_llm.ollama_completion(MESSAGES, max_tokens=10, temperature=0.2)
+    second = ollama_llm.ollama_completion(MESSAGES, max_tokens=10, temperature=0.2)
+    streamed = list(ollama_llm.ollama_completion(MESSAGES, stream=True, max_tokens=10, temperature=0.2))
+
+    assert first == second == "fresh"
+    assert streamed == ["fresh"]
+    assert len(calls) == 1
+
+
+def test_lookup_counter_keeps_growing_across_cache_objects(tmp_path):
+    from src.telemetry import CACHE_LOOKUPS
+
+    misses = CACHE_LOOKUPS.labels(result="misses")
+    before = misses.value
+    _cache(tmp_path).get("phi3", MESSAGES, 0.7, 100)
+    # A rebuilt cache starts its own stats at zero; the exported counter does not
+    _cache(tmp_path).get("phi3", MESSAGES, 0.7, 100)
+    assert misses.value == before + 2
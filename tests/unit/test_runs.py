@@ -0,0 +1,116 @@
+import asyncio
+
+from src.admission import AdmissionController
+from src.runs import CANCELLED, FAILED, SUCCEEDED, RunRegistry
+
+
+def _stream(closed, block=None):
+    async def stream(prompt):
+        try:
+            yield {"type": "agent", "agent": "Curator"}
+            if block is not None:
+                await block.wait()
+            yield {"type": "content", "agent": "Curator", "content": prompt}
+            yield {"type": "result", "result": {"final_answer": prompt}}
+        finally:
+            # Stands in for ollama_llm closing the HTTP response
+            closed.append(prompt)
+
+    return stream
+
+
+def test_run_records_events_and_result():
+    closed = []
+
+    async def scenario():
+        registry = RunRegistry(AdmissionController(max_active=1), _stream(closed))
+        run = registry.create("hello")
+        await run.task
+        return run, [event async for event in run.follow(after=1)]
+
+    run, resumed = asyncio.run(scenario())
+
+    assert run.status == SUCCEEDED
+    assert run.result == {"final_answer": "hello"}
+    # Resuming after event 1 replays the rest of the log, ending with "done"
+    assert [event["id"] for event in resumed] == [2, 3]
+    assert resumed[-1] == {"id": 3, "type": "done", "status": SUCCEEDED}
+    assert closed == ["hello"]
+
+
+def test_cancel_closes_stream_and_frees_slot():
+    closed = []
+
+    async def scenario():
+        controller = AdmissionController(max_active=1)
+        registry = RunRegistry(controller, _stream(closed, block=asyncio.Event()))
+        running = registry.create("first")
+        queued = registry.create("second")
+        await asyncio.sleep(0.01)
+
+        registry.cancel(queued.id)
+        await queued.task
+        registry.cancel(running.id)
+        await running.task
+        return controller, running, queued
+
+    controller, running, queued = asyncio.run(scenario())
+
+    assert (running.status, queued.status) == (CANCELLED, CANCELLED)
+    assert closed == ["first"]
+    assert controller.active == 0
+    assert controller.queued == 0
+
+
+def test_failed_stage_marks_run_failed():
+    async def stream(prompt):
+        yield {"type": "result", "result": {"error": "Curator failed"}}
+
+    async def scenario():
+        registry = RunRegistry(AdmissionController(), stream)
+        run = registry.create("p")
+        await run.task
+        return run
+
+    run = asyncio.run(scenario())
+
+    assert (run.status, run.error) == (FAILED, "Curator failed")
+
+
+def test_finished_runs_are_evicted_beyond_limit(monkeypatch):
+    monkeypatch.setenv("COUNCIL_RUNS_KEPT", "2")
+
+    async def scenario():
+        registry = RunRegistry(AdmissionController(), _stream([]))
+        ids = []
+        for prompt in ("a", "b", "c"):
+            run = registry.create(prompt)
+            await run.task
+            ids.append(run.id)
+        return registry, ids
+
+    registry, ids = asyncio.run(scenario())
+
+    assert registry.get(ids[0]) is None
+    assert registry.get(ids[2]) is not None
+
+
+def test_runs_api_lifecycle(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from src.api import main
+
+    registry = RunRegistry(AdmissionController(), _stream([]))
+    monkeypatch.setattr(main, "runs", registry)
+    client = TestClient(main.app)
+
+    created = client.post("/runs", json={"prompt": "hi"})
+    assert created.status_code == 202
+    run_id = created.json()["id"]
+
+    events = client.get(f"/runs/{run_id}/events", headers={"Last-Event-ID": "1"})
+    assert events.text.startswith("id: 2\n")
+    assert '"status": "succeeded"' in events.text
+    assert client.get(f"/runs/{run_id}").json()["result"] == {"final_answer": "hi"}
+    assert client.delete(f"/runs/{run_id}").json()["status"] == SUCCEEDED
+    assert client.get("/runs/missing").status_code == 404
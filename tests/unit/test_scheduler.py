@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.scheduler import HostRotation, execution_mode, merge_bounded, run_bounded
+
+
+def test_execution_mode_defaults_to_sequential(monkeypatch):
+    monkeypatch.delenv("COUNCIL_EXECUTION_MODE", raising=False)
+    assert execution_mode() == "sequential"
+    monkeypatch.setenv("COUNCIL_EXECUTION_MODE", "Parallel")
+    assert execution_mode() == "parallel"
+    monkeypatch.setenv("COUNCIL_EXECUTION_MODE", "bogus")
+    assert execution_mode() == "sequential"
+
+
+def test_run_bounded_respects_limit_and_keeps_order():
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def task(value):
+        def run():
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+            return value
+        return run
+
+    results = run_bounded([task(i) for i in range(6)], limit=2)
+
+    assert results == list(range(6))
+    assert state["peak"] == 2
+
+
+def test_merge_bounded_interleaves_and_propagates_errors():
+    def stream(prefix, count, fail=False):
+        async def events():
+            for i in range(count):
+                await asyncio.sleep(0)
+                yield f"{prefix}{i}"
+            if fail:
+                raise RuntimeError("boom")
+        return events
+
+    async def collect(streams, limit):
+        return [item async for item in merge_bounded(streams, limit)]
+
+    items = asyncio.run(collect([stream("a", 3), stream("b", 3)], limit=2))
+    assert sorted(items) == ["a0", "a1", "a2", "b0", "b1", "b2"]
+    assert items != sorted(items)
+
+    serial = asyncio.run(collect([stream("a", 2), stream("b", 2)], limit=1))
+    assert serial == ["a0", "a1", "b0", "b1"]
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(collect([stream("a", 1, fail=True), stream("b", 5)], limit=2))
+
+
+def test_host_rotation_round_robin(monkeypatch):
+    monkeypatch.setenv("OLLAMA_HOSTS", "http://a:11434, http://b:11434")
+    hosts = HostRotation()
+    assert [hosts.next() for _ in range(3)] == ["http://a:11434", "http://b:11434", "http://a:11434"]
+    monkeypatch.delenv("OLLAMA_HOSTS")
+    assert HostRotation().next() is None
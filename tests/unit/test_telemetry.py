@@ -0,0 +1,86 @@
+import asyncio
+import importlib
+
+from src import telemetry
+from src.telemetry import Counter, Gauge, Histogram, Registry
+
+
+def test_registry_renders_text_exposition_format():
+    registry = Registry()
+    requests = Counter("demo_requests_total", "Requests.", ("route",), registry=registry)
+    in_flight = Gauge("demo_in_flight", "In flight.", registry=registry)
+    latency = Histogram("demo_seconds", "Latency.", buckets=(0.1, 1), registry=registry)
+
+    requests.labels(route='/chat"x').inc()
+    requests.labels(route='/chat"x').inc(2)
+    in_flight.set(3)
+    latency.observe(0.05)
+    latency.observe(5)
+
+    text = registry.render()
+
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{route="/chat\\"x"} 3' in text
+    assert "demo_in_flight 3" in text
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1"} 1' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 2' in text
+    assert "demo_seconds_sum 5.05" in text
+    assert "demo_seconds_count 2" in text
+    assert text.endswith("\n")
+
+
+def test_track_in_flight_counts_async_generator_until_closed():
+    gauge = telemetry.IN_FLIGHT.labels(kind="test")
+
+    @telemetry.track_in_flight("test")
+    async def events():
+        yield 1
+        yield 2
+
+    async def consume():
+        stream = events()
+        await stream.__anext__()
+        during = gauge.value
+        await stream.aclose()
+        return during
+
+    assert asyncio.run(consume()) == 1
+    assert gauge.value == 0
+
+
+def test_memory_operations_observe_sqlite_latency(tmp_path, monkeypatch):
+    monkeypatch.setenv("COUNCIL_ENABLE_PERSISTENCE", "true")
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    import src.memory as memory
+    memory = importlib.reload(memory)
+    memory.init_db()
+    histogram = telemetry.SQLITE_LATENCY.labels(operation="add_message")
+    before = histogram.count
+
+    memory.add_message("user", "hello")
+    monkeypatch.setattr(memory, "ENABLE_PERSISTENCE", False)
+    memory.add_message("user", "ignored")
+
+    assert histogram.count == before + 1
+    assert 'operation="add_message"' in telemetry.REGISTRY.render()
+
+
+def test_llm_errors_are_counted(monkeypatch):
+    from types import SimpleNamespace
+
+    from src import ollama_llm
+
+    def raise_error(*args, **kwargs):
+        raise ValueError("boom")
+
+    monkeypatch.setattr(ollama_llm, "get_client", lambda host=None: SimpleNamespace(chat=raise_error))
+    counter = telemetry.LLM_ERRORS.labels(kind="completion")
+    before = counter.value
+
+    try:
+        ollama_llm.ollama_completion([{"role": "user", "content": "ping"}])
+    except RuntimeError:
+        pass
+
+    assert counter.value == before + 1
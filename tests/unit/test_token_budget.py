@@ -0,0 +1,62 @@
+from src import council, token_budget
+
+
+def _stage(name, tokens_per_sec=10.0, ttft_s=5.0, total_s=60.0, **extra):
+    return {"stage": name, "tokens_per_sec": tokens_per_sec, "ttft_s": ttft_s, "total_s": total_s, **extra}
+
+
+def test_plan_splits_generation_time_by_weight():
+    model = token_budget.ThroughputModel(size=10)
+    model.observe({"stages": [
+        _stage("Curator", total_s=20.0),
+        _stage("Researcher"),
+        _stage("Judge", tokens_per_sec=30.0),
+        # Ignored: cache hits and cut-short calls
+        _stage("Planner", tokens_per_sec=1000.0, cached=True),
+        _stage("Planner", tokens_per_sec=1000.0, truncated=True),
+    ]})
+
+    decision = token_budget.plan({"Researcher": 1.0, "Judge": 3.0}, 120, model, fixed_stages=("Curator",))
+
+    # 120s - 20s Curator - 2 x 5s time to first token = 90s, split 1 : 3 at each stage's rate
+    assert decision["tokens_per_sec"] == {"Researcher": 10.0, "Judge": 30.0}
+    assert decision["generation_s"] == 90.0
+    assert decision["max_tokens"] == {"Researcher": 225, "Judge": 2025}
+
+
+def test_plan_clamps_and_waits_for_measurements(monkeypatch):
+    monkeypatch.setenv("COUNCIL_MIN_TOKENS", "200")
+    model = token_budget.ThroughputModel(size=10)
+
+    assert token_budget.plan({"Judge": 1.0}, 60, model) == {
+        "target_s": 60,
+        "max_tokens": {},
+        "reason": "no throughput measurements yet",
+    }
+
+    model.observe({"stages": [_stage("Judge", ttft_s=100.0)]})
+    assert token_budget.plan({"Judge": 1.0}, 60, model)["max_tokens"] == {"Judge": 200}
+
+
+def test_council_applies_plan_and_records_it(monkeypatch):
+    monkeypatch.setenv("COUNCIL_TARGET_LATENCY_S", "300")
+    model = token_budget.ThroughputModel(size=10)
+    model.observe({"stages": [_stage("Researcher", ttft_s=0.0)]})
+    monkeypatch.setattr(token_budget, "_model", model)
+    monkeypatch.setattr(council, "_load_memory_context", lambda prompt: {})
+    monkeypatch.setattr(council, "shared_prefix", lambda prompt, context: "")
+    monkeypatch.setattr(council, "record_run", lambda metrics: None)
+    monkeypatch.setattr(council, "ENABLE_PERSISTENCE", False)
+    requested = {}
+
+    def fake_completion(messages, **kwargs):
+        requested[len(requested)] = kwargs["max_tokens"]
+        return "Final Answer:\n1. a\n2. b\n3. c\n4. d\nRationale: ok"
+
+    monkeypatch.setattr(council, "ollama_completion", fake_completion)
+
+    result = council.run_council_sync("Test prompt", skip_curator=True)
+
+    # 300s x 10 tokens/s split 1 : 1 : 1 : 1.25 across the four stages
+    assert list(requested.values()) == [705, 705, 705, 882]
+    assert result["metrics"]["token_budget"]["max_tokens"]["Judge"] == 882
@@ -0,0 +1,93 @@
+import numpy as np
+
+from src.vector_index import ExactIndex, IVFIndex, nearest_centroids, normalize_rows, top_k, train_centroids
+
+
+def test_top_k_returns_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.7], dtype=np.float32)
+
+    assert top_k(scores, 2).tolist() == [1, 3]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 0]
+    assert top_k(scores, 0).tolist() == []
+
+
+def test_exact_index_cosine_search_with_weights():
+    index = ExactIndex(2)
+    index.add([10, 11, 12], [np.array([1.0, 0.0]), np.array([0.0, 3.0]), np.array([1.0, 1.0])])
+
+    ids, scores = index.search([2.0, 0.1], k=2)
+    assert ids.tolist() == [10, 12]
+    assert scores[0] > scores[1]
+
+    # Row weights and per-call weights both scale the similarity
+    index = ExactIndex(2)
+    index.add([10, 11], [np.array([1.0, 0.0]), np.array([0.7, 0.7])], weights=[0.1, 1.0])
+    assert index.search([1.0, 0.0], k=1)[0].tolist() == [11]
+    assert index.search([1.0, 0.0], k=1, weights=np.array([100.0, 1.0]))[0].tolist() == [10]
+
+
+def test_exact_index_skips_zero_and_mismatched_vectors_and_grows():
+    index = ExactIndex(3)
+    index.add([1, 2, 3], [np.zeros(3), np.ones(2), np.ones(3)])
+
+    assert index.ids.tolist() == [3]
+    for batch in range(100):
+        index.add([100 + batch], [np.array([1.0, batch, 0.0])])
+    assert len(index) == 101
+    assert index.matrix.shape == (101, 3)
+    assert np.allclose(np.linalg.norm(index.matrix, axis=1), 1.0)
+    assert index.search([0.0, 0.0, 0.0], k=1)[0].tolist() == []
+    assert index.search([1.0, 0.0], k=1)[0].tolist() == []
+
+
+def _clustered(count, dim, clusters, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=count)
+    return centers[labels] + 0.1 * rng.normal(size=(count, dim))
+
+
+def test_train_centroids_returns_unit_vectors():
+    vectors, _ = normalize_rows(_clustered(500, 8, 5))
+
+    centroids = train_centroids(vectors, 5)
+
+    assert centroids.shape == (5, 8)
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1.0)
+    assert set(nearest_centroids(vectors, centroids).tolist()) <= set(range(5))
+
+
+def test_ivf_full_probe_matches_exact_search():
+    vectors = _clustered(1000, 16, 10)
+    ids = list(range(1000))
+    exact = ExactIndex(16)
+    exact.add(ids, vectors)
+    ivf = IVFIndex(16, train_centroids(exact.matrix, 10), nprobe=10)
+    ivf.add(ids, vectors)
+    query = vectors[123] + 0.05
+
+    assert ivf.search(query, 5)[0].tolist() == exact.search(query, 5)[0].tolist()
+
+
+def test_ivf_partial_probe_has_high_recall_on_clustered_data():
+    vectors = _clustered(2000, 16, 20, seed=1)
+    ids = list(range(2000))
+    exact = ExactIndex(16)
+    exact.add(ids, vectors)
+    ivf = IVFIndex(16, train_centroids(exact.matrix, 20), nprobe=3)
+    ivf.add(ids, vectors)
+
+    hits = 0
+    for row in range(0, 2000, 40):
+        truth = set(exact.search(vectors[row], 5)[0].tolist())
+        hits += len(truth & set(ivf.search(vectors[row], 5)[0].tolist()))
+    assert hits / (50 * 5) >= 0.9
+
+
+def test_ivf_uses_given_bucket_assignments():
+    ivf = IVFIndex(2, np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32), nprobe=1)
+    # Row 7 is stored under bucket 1 even though it is nearer centroid 0
+    ivf.add([7, 8], [np.array([1.0, 0.1]), np.array([1.0, 0.0])], lists=[1, None])
+
+    assert ivf.search([0.0, 1.0], 5)[0].tolist() == [7]
+    assert ivf.search([1.0, 0.0], 5)[0].tolist() == [8]